@@ -1,5 +1,7 @@
 """The BLE Battery Management System integration."""
 
+from functools import partial
+from pathlib import Path
 from types import ModuleType
 from typing import Final
 
@@ -10,19 +12,31 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryError, ConfigEntryNotReady
-from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import config_validation as cv, entity_registry as er
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.importlib import async_import_module
-from homeassistant.helpers.storage import Store
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, LOGGER
-from .coordinator import BTBmsCoordinator
+from .connections import ConnectionRegistry
+from .const import DATA_CONNECTIONS, DOMAIN, LOGGER
+from .coordinator import BTBmsCoordinator, sample_store_key, trend_store_key
+from .history import history_file_name
+from .services import async_setup_services
 
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.BUTTON, Platform.LIGHT,Platform.SELECT]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 type BTBmsConfigEntry = ConfigEntry[BTBmsCoordinator]
 
 
+async def async_setup(hass: HomeAssistant, _config: ConfigType) -> bool:
+    """Set up the integration services and the connection registry."""
+    hass.data.setdefault(DOMAIN, {})[DATA_CONNECTIONS] = ConnectionRegistry(hass)
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> bool:
     """Set up BT Battery Management System from a config entry."""
     LOGGER.debug("Setup of %s", repr(entry))
@@ -36,39 +50,61 @@ async def async_setup_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> boo
     # migrate old entries
     migrate_sensor_entities(hass, entry)
 
-    ble_device: Final[BLEDevice | None] = async_ble_device_from_address(
+    ble_device: BLEDevice | None = async_ble_device_from_address(
         hass, entry.unique_id, True
     )
 
     if ble_device is None:
-        LOGGER.debug("Failed to discover device %s via Bluetooth", entry.unique_id)
-        raise ConfigEntryNotReady(
-            translation_domain=DOMAIN,
-            translation_key="device_not_found",
-            translation_placeholders={
-                "MAC": entry.unique_id,
-            },
-        )
+        if not await Store(hass, 1, sample_store_key(entry.entry_id)).async_load():
+            LOGGER.debug("Failed to discover device %s via Bluetooth", entry.unique_id)
+            raise ConfigEntryNotReady(
+                translation_domain=DOMAIN,
+                translation_key="device_not_found",
+                translation_placeholders={
+                    "MAC": entry.unique_id,
+                },
+            )
+        # show the restored sample, updates connect once the device is seen again
+        LOGGER.debug("Device %s not seen via Bluetooth, using last sample", entry.unique_id)
+        ble_device = BLEDevice(entry.unique_id, entry.title, None, -127)
 
     plugin: ModuleType = await async_import_module(hass, entry.data["type"])
 
-    store = Store(hass, 1, f"bms_{entry.entry_id}")
-    bms_instance = plugin.BMS(ble_device, store)
+    connections: Final[ConnectionRegistry] = hass.data[DOMAIN][DATA_CONNECTIONS]
+    bms_instance = await connections.async_acquire(
+        entry.entry_id,
+        ble_device,
+        lambda: plugin.BMS(ble_device, Store(hass, 1, f"bms_{entry.entry_id}")),
+    )
+    # also on failed setups, the connection outlives the entry for a quick reload
+    entry.async_on_unload(partial(connections.release, ble_device.address))
     coordinator = BTBmsCoordinator(hass, ble_device, bms_instance, entry)
+    await coordinator.async_open_history()
+    await coordinator.async_load_trends()
 
+    if await coordinator.async_restore_sample():
+        # start entities with the last known values, query the device in background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_first_refresh_{entry.unique_id}"
+        )
+    else:
+        # Query the device the first time, initialise coordinator.data
+        await coordinator.async_config_entry_first_refresh()
 
-    # Query the device the first time, initialise coordinator.data
-    await coordinator.async_config_entry_first_refresh()
-
-    # Insert the coordinator in the global registry
-    hass.data.setdefault(DOMAIN, {})
     entry.runtime_data = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: BTBmsConfigEntry) -> None:
+    """Apply changed options, reload the entry only if required."""
+    if not entry.runtime_data.async_update_options(entry.options):
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok: Final[bool] = await hass.config_entries.async_unload_platforms(
@@ -79,7 +115,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> bo
     return unload_ok
 
 
-
+async def async_remove_entry(hass: HomeAssistant, entry: BTBmsConfigEntry) -> None:
+    """Close the connection and remove persisted data of a config entry."""
+    if entry.unique_id is not None:
+        await hass.data[DOMAIN][DATA_CONNECTIONS].async_close(entry.unique_id)
+    await Store(hass, 1, sample_store_key(entry.entry_id)).async_remove()
+    await Store(hass, 1, trend_store_key(entry.entry_id)).async_remove()
+    await hass.async_add_executor_job(
+        Path(hass.config.path(STORAGE_DIR, history_file_name(entry.entry_id))).unlink,
+        True,
+    )
 
 
 def migrate_sensor_entities(
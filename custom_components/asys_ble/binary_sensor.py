@@ -8,14 +8,14 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorEntityDescription,
 )
-from homeassistant.const import ATTR_BATTERY_CHARGING, EntityCategory
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import BTBmsConfigEntry
-from .const import ATTR_PROBLEM, DOMAIN
+from .const import DOMAIN
 from .coordinator import BTBmsCoordinator
 
 PARALLEL_UPDATES = 0
@@ -81,10 +81,10 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in Home Assistant."""
 
     bms: BTBmsCoordinator = config_entry.runtime_data
-    for descr in BINARY_SENSOR_TYPES:
-        async_add_entities(
-            [BMSBinarySensor(bms, descr, format_mac(config_entry.unique_id))]
-        )
+    mac: str = format_mac(config_entry.unique_id)
+    async_add_entities(
+        BMSBinarySensor(bms, descr, mac) for descr in BINARY_SENSOR_TYPES
+    )
 
 
 class BMSBinarySensor(CoordinatorEntity[BTBmsCoordinator], BinarySensorEntity):  # type: ignore[reportIncompatibleMethodOverride]
@@ -105,6 +105,11 @@ class BMSBinarySensor(CoordinatorEntity[BTBmsCoordinator], BinarySensorEntity):
         self.entity_description: BmsBinaryEntityDescription = descr  # type: ignore[reportIncompatibleVariableOverride]
         super().__init__(bms)
 
+    @property
+    def assumed_state(self) -> bool:
+        """Return True while the value is restored from the previous run."""
+        return self.coordinator.restored
+
     @property
     def is_on(self) -> bool | None:  # type: ignore[reportIncompatibleVariableOverride]
         """Handle updated data from the coordinator."""
@@ -115,7 +120,8 @@ class BMSBinarySensor(CoordinatorEntity[BTBmsCoordinator], BinarySensorEntity):
         if self.entity_description.key == "underload_protection_state" :
             return  "underload_protection_state" in self.coordinator.data
         else :
-            return super().available
+            # restored values stay available until the device is reached
+            return super().available or self.coordinator.restored
 
 
 
@@ -0,0 +1,79 @@
+"""Connection circuit breaker for the BLE Battery Management System integration."""
+
+from enum import StrEnum
+from random import uniform
+from time import monotonic
+from typing import Any, Final
+
+from .const import BREAKER_BASE_DELAY, BREAKER_FAILURE_THRESHOLD, BREAKER_MAX_DELAY
+
+
+class BreakerState(StrEnum):
+    """State of the connection circuit breaker."""
+
+    CLOSED = "closed"  # connection attempts allowed
+    OPEN = "open"  # connection attempts suspended until backoff expires
+    HALF_OPEN = "half_open"  # single trial attempt allowed
+
+
+class ConnectionBreaker:
+    """Circuit breaker with exponential backoff and jitter for device connections."""
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_FAILURE_THRESHOLD,
+        base_delay: float = BREAKER_BASE_DELAY,
+        max_delay: float = BREAKER_MAX_DELAY,
+    ) -> None:
+        """Initialize a closed circuit breaker."""
+        self._threshold: Final[int] = threshold
+        self._base_delay: Final[float] = base_delay
+        self._max_delay: Final[float] = max_delay
+        self._state: BreakerState = BreakerState.CLOSED
+        self._failures: int = 0  # consecutive failures
+        self._trips: int = 0  # consecutive openings, determines backoff
+        self._retry_at: float = 0.0
+
+    @property
+    def state(self) -> BreakerState:
+        """Return the current breaker state."""
+        return self._state
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until the next connection attempt is allowed."""
+        return max(0.0, self._retry_at - monotonic())
+
+    def allow(self) -> bool:
+        """Return True if a connection attempt may be made now."""
+        if self._state == BreakerState.OPEN and not self.retry_in:
+            self._state = BreakerState.HALF_OPEN
+        return self._state != BreakerState.OPEN
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful attempt."""
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._trips = 0
+
+    def record_failure(self) -> None:
+        """Count a failed attempt and open the breaker if required."""
+        self._failures += 1
+        if (
+            self._state == BreakerState.HALF_OPEN
+            or self._failures >= self._threshold
+        ):
+            delay: Final[float] = min(
+                self._max_delay, self._base_delay * 2**self._trips
+            )
+            self._trips += 1
+            self._retry_at = monotonic() + uniform(delay / 2, delay)  # noqa: S311
+            self._state = BreakerState.OPEN
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return breaker status for diagnostics."""
+        return {
+            "state": self._state,
+            "failures": self._failures,
+            "retry_in": round(self.retry_in, 1),
+        }
@@ -1,8 +1,5 @@
 """Support for asys_BLE binary sensors."""
 
-from homeassistant.components.binary_sensor import (
-    BinarySensorDeviceClass,
-)
 from homeassistant.components.button import (
     ButtonEntity,
     ButtonEntityDescription, ButtonDeviceClass,
@@ -43,10 +40,8 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in Home Assistant."""
 
     bms: BTBmsCoordinator = config_entry.runtime_data
-    for descr in BUTTON_TYPES:
-        async_add_entities(
-            [BMSButtonEntity(bms, descr, format_mac(config_entry.unique_id))]
-        )
+    mac: str = format_mac(config_entry.unique_id)
+    async_add_entities(BMSButtonEntity(bms, descr, mac) for descr in BUTTON_TYPES)
 
 
 class BMSButtonEntity(CoordinatorEntity[BTBmsCoordinator],
@@ -70,7 +70,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 LOGGER.error("Invalid asys plugin %s", asys_type)
         return None
 
-    def async_get_options_flow(config_entry):
+    @staticmethod
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> AsysBleOptionsFlowHandler:
         return AsysBleOptionsFlowHandler(config_entry)
 
     async def async_step_bluetooth(
@@ -0,0 +1,77 @@
+"""Connections of the BLE Battery Management System integration kept across reloads."""
+
+from collections.abc import Callable
+from datetime import datetime
+from functools import partial
+from typing import Final
+
+from bleak.backends.device import BLEDevice
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import CONNECTION_GRACE, LOGGER
+from .plugins.basebms import BaseBMS
+
+
+class ConnectionRegistry:
+    """BMS instances by MAC address, kept connected for a while after an unload.
+
+    A reload of the config entry, e.g. for an option change, reattaches to the
+    connected and associated BMS instead of connecting and associating again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry, closing all connections when Home Assistant stops."""
+        self._hass: Final[HomeAssistant] = hass
+        self._devices: Final[dict[str, tuple[str, BaseBMS]]] = {}  # MAC -> entry ID, BMS
+        self._pending: Final[dict[str, CALLBACK_TYPE]] = {}  # MAC -> cancel delayed close
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+
+    async def async_acquire(
+        self, entry_id: str, ble_device: BLEDevice, factory: Callable[[], BaseBMS]
+    ) -> BaseBMS:
+        """Return the BMS of a config entry, the one kept from a previous setup if any."""
+        mac: Final[str] = ble_device.address
+        self._cancel(mac)
+        if (held := self._devices.get(mac)) is not None:
+            if held[0] == entry_id:
+                LOGGER.debug(
+                    "%s: reattaching to BMS, connected: %s", mac, held[1].is_connected
+                )
+                held[1].set_ble_device(ble_device)
+                return held[1]
+            await self.async_close(mac)  # entry was removed and added again
+        bms: Final[BaseBMS] = factory()
+        self._devices[mac] = (entry_id, bms)
+        return bms
+
+    @callback
+    def release(self, mac: str) -> None:
+        """Close the connection after the grace period, unless acquired again."""
+        if mac not in self._devices:
+            return
+        self._cancel(mac)
+        self._pending[mac] = async_call_later(
+            self._hass, CONNECTION_GRACE, partial(self._async_expire, mac)
+        )
+
+    async def async_close(self, mac: str) -> None:
+        """Close the connection of a device now and forget its BMS."""
+        self._cancel(mac)
+        if (held := self._devices.pop(mac, None)) is not None:
+            await held[1].release()
+
+    def _cancel(self, mac: str) -> None:
+        if (cancel := self._pending.pop(mac, None)) is not None:
+            cancel()
+
+    async def _async_expire(self, mac: str, _now: datetime) -> None:
+        self._pending.pop(mac, None)
+        LOGGER.debug("%s: grace period expired, closing connection", mac)
+        await self.async_close(mac)
+
+    async def _async_stop(self, _event: Event) -> None:
+        for mac in list(self._devices):
+            await self.async_close(mac)
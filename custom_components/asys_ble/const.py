@@ -17,9 +17,75 @@ ASYS_DEVICE_TYPES: Final[list[str]] = [
     "preciseo"
 ]  # available ASYS types
 
+OPTIONS_FILTRATION_STATE_MODE: Final[list[str]] = ["OFF", "ON", "AUTO"]
+OPTIONS_FILTRATION_MODE: Final[list[str]] = [
+    "Automatique (Loi d'eau)",
+    "Horloge 72h",
+    "Horloge Usine 1",
+    "Horloge Usine 2",
+    "Horloge Usine 3",
+    "Horloge Personnalisable Eté",
+    "Horloge Personnalisable Hivers",
+]
+
 DOMAIN: Final[str] = "asys_ble"
 LOGGER: Final[logging.Logger] = logging.getLogger(__package__)
 UPDATE_INTERVAL: Final[int] = 30  # [s]
+SAMPLE_SAVE_DELAY: Final[int] = 300  # [s] delay to persist the last sample
+PAIRING_SCAN_INTERVAL: Final[int] = 300  # [s] poll interval while device is unpaired
+BREAKER_FAILURE_THRESHOLD: Final[int] = 3  # [#] consecutive failures to stop connecting
+BREAKER_BASE_DELAY: Final[int] = 30  # [s] initial backoff of the connection breaker
+BREAKER_MAX_DELAY: Final[int] = 1800  # [s] maximum backoff of the connection breaker
+CONTROL_COALESCE_WINDOW: Final[float] = 0.3  # [s] collect control changes before writing
+CONTROL_MIN_SPACING: Final[float] = 1.0  # [s] minimum time between control writes
+COMMAND_REFRESH_DELAY: Final[int] = 2  # [s] refresh delay after the last command
+SCANNER_PRIOR_LATENCY: Final[float] = 3.0  # [s] assumed connect time of unknown scanners
+SCANNER_EWMA_ALPHA: Final[float] = 0.3  # smoothing of scanner connect latency
+GATT_TIMEOUT: Final[float] = 10.0  # [s] timeout of a single read/write outside updates
+CONNECT_TIMEOUT: Final[float] = 30.0  # [s] timeout of a connection outside updates
+UNREADABLE_FAILURES: Final[int] = 3  # [#] failed optional reads to skip a characteristic
+UPDATE_BUDGET_SHARE: Final[float] = 0.8  # share of the poll interval one update may take
+UPDATE_BUDGET_MAX: Final[float] = 60.0  # [s] upper limit of the update budget
+BUDGET_CONNECT_SHARE: Final[float] = 0.5  # max. share of the remaining budget to connect
+BUDGET_ASSOCIATE_SHARE: Final[float] = 0.5  # max. share of the remaining budget to associate
+BUDGET_OPTIONAL_RESERVE: Final[float] = 0.25  # skip optional reads below this budget share
+OFFLINE_COMMAND_TTL: Final[int] = 1800  # [s] validity of commands queued while offline
+EVENT_COMMAND: Final[str] = "asys_ble_command"  # result of a queued command
+DEFAULT_RELEASE_DURATION: Final[int] = 10  # [min] connection release for the vendor app
+FOREIGN_CENTRAL_SILENCE: Final[int] = 30  # [s] no advertisement while our link is free
+FOREIGN_CENTRAL_BACKOFF: Final[int] = 600  # [s] pause polling if another central connected
+CONNECTION_GRACE: Final[int] = 60  # [s] connection kept after unload for a reload to reuse
+DATA_CONNECTIONS: Final[str] = "connections"  # key of the ConnectionRegistry in hass.data
+LATENCY_BUCKETS: Final[tuple[float, ...]] = (  # [s] upper bounds of histogram buckets
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+ALIGN_HISTORY: Final[int] = 32  # [#] polls used to learn the device status refresh
+ALIGN_MIN_CHANGES: Final[int] = 6  # [#] changes within less than a period to align
+ALIGN_MIN_PERIOD: Final[float] = 5.0  # [s] shortest status refresh period considered
+ALIGN_MAX_PERIOD: Final[float] = 600.0  # [s] longest status refresh period considered
+ALIGN_MAX_BRACKET: Final[float] = 0.25  # share of the period the learned phase may span
+ALIGN_MARGIN: Final[float] = 1.0  # [s] poll delay after the expected refresh
+ALIGN_PROBE_EVERY: Final[int] = 4  # [#] aligned polls per probe just before the refresh
+TRACE_BUFFER_SIZE: Final[int] = 500  # [#] spans and events kept for diagnostics
+
+# services
+SERVICE_SET_CONTROL: Final[str] = "set_control"
+ATTR_FILTRATION_MODE: Final[str] = "filtration_mode"
+ATTR_FILTRATION_STATE: Final[str] = "filtration_state"
+ATTR_LIGHT: Final[str] = "light"
+ATTR_LIGHT_COLOR_STEP: Final[str] = "light_color_step"
+SERVICE_RELEASE_CONNECTION: Final[str] = "release_connection"
+ATTR_DURATION: Final[str] = "duration"
+SERVICE_EXPORT_HISTORY: Final[str] = "export_history"
+ATTR_FORMAT: Final[str] = "format"
+SERVICE_REFRESH: Final[str] = "refresh"
+ATTR_MAX_AGE: Final[str] = "max_age"
+ATTR_TIER: Final[str] = "tier"
+TIER_STATUS: Final[str] = "status"  # control and status registers only
+TIER_FULL: Final[str] = "full"  # including device information
+SERVICE_FLEET_REPORT: Final[str] = "fleet_report"
+ATTR_FILE: Final[str] = "file"
+FLEET_REPORT_WORST: Final[int] = 5  # [#] devices listed as the worst of the fleet
 
 # attributes (do not change)
 ATTR_BALANCE_CUR: Final[str] = "balance_current"  # [A]
@@ -38,4 +104,10 @@ ATTR_RUNTIME: Final[str] = "runtime"  # [s]
 ATTR_TEMP_SENSORS: Final[str] = "temperature_sensors"  # [°C]
 DEFAULT_SCAN_INTERVAL_S = 30 # [s]
 DEFAULT_UNDERLOAD_INTENSITY_THRESHOLD = 2  # [A]
-DEFAULT_UNDERLOAD_PERIOD = 120 # [s]
\ No newline at end of file
+DEFAULT_UNDERLOAD_PERIOD = 120 # [s]
+PUMP_VOLTAGE: Final[int] = 230  # [V] assumed supply voltage of the pump
+TREND_MIN_SAMPLES: Final[int] = 24  # [#] operating hours before trends are reported
+TREND_BASELINE_ALPHA: Final[float] = 0.002  # long-term current baseline (~500 h)
+TREND_RECENT_ALPHA: Final[float] = 0.05  # recent current (~20 h)
+# options that cannot be applied to a running device and require a reload
+RELOAD_OPTIONS: Final[frozenset[str]] = frozenset({"history"})
\ No newline at end of file
@@ -1,24 +1,42 @@
 """Home Assistant coordinator for BLE Battery Management System integration."""
 
-from collections import deque
-from datetime import timedelta
+import asyncio
+from collections import Counter, deque
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+from pathlib import Path
 from time import monotonic
-from typing import Final
+from typing import Any, Final
 
 from bleak.backends.device import BLEDevice
 from bleak.exc import BleakError
 from habluetooth import BluetoothServiceInfoBleak
 
-from homeassistant.components.bluetooth import async_last_service_info
+from homeassistant.components.bluetooth import (
+    async_address_present,
+    async_last_service_info,
+    async_scanner_devices_by_address,
+)
 from homeassistant.components.bluetooth.const import DOMAIN as BLUETOOTH_DOMAIN
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH, DeviceInfo
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .breaker import BreakerState, ConnectionBreaker
 from .const import DOMAIN, LOGGER, UPDATE_INTERVAL, DEFAULT_SCAN_INTERVAL_S, DEFAULT_UNDERLOAD_INTENSITY_THRESHOLD, \
-    DEFAULT_UNDERLOAD_PERIOD
-from .plugins.basebms import BaseBMS, BMSsample
+    DEFAULT_UNDERLOAD_PERIOD, COMMAND_REFRESH_DELAY, EVENT_COMMAND, RELOAD_OPTIONS, PAIRING_SCAN_INTERVAL, SAMPLE_SAVE_DELAY, \
+    UPDATE_BUDGET_MAX, UPDATE_BUDGET_SHARE, FOREIGN_CENTRAL_BACKOFF, FOREIGN_CENTRAL_SILENCE, TIER_FULL, \
+    TIER_STATUS, TRACE_BUFFER_SIZE
+from .histogram import LatencyHistogram
+from .history import SampleHistory, history_file_name
+from .phase import PhaseTracker
+from .plugins.basebms import MONOTONIC_KEYS, BaseBMS, BMSsample
+from .scanners import ScannerSelector
+from .trends import PumpTrends
 
 
 class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
@@ -34,7 +52,7 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
         """Initialize BMS data coordinator."""
         assert ble_device.address is not None
         scan_interval = config_entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL_S)
-        LOGGER.debug(f"scan interval : {scan_interval}")
+        LOGGER.debug("scan interval : %s", scan_interval)
         super().__init__(
             hass=hass,
             logger=LOGGER,
@@ -44,9 +62,42 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
             config_entry=config_entry,
         )
         self._device: Final[BaseBMS] = bms_device
+        self._scan_interval: timedelta = timedelta(seconds=scan_interval)
+        self._breaker: Final[ConnectionBreaker] = ConnectionBreaker()
+        self._cmd_refresh_unsub: Callable[[], None] | None = None
+        self._scanners: Final[ScannerSelector] = ScannerSelector()
+        self._sources: dict[str, str] = {}  # BLEDevice id -> scanner source
+        self._hedged: bool = config_entry.options.get("hedged_connect", False)
         self._link_q = deque([False], maxlen=100)  # track BMS update issues
+        self._overruns: deque[dict[str, Any]] = deque(maxlen=20)  # cut update cycles
         self._mac: Final[str] = ble_device.address
         self._stale: bool = False  # indicates no BMS response for significant time
+        self._restored: bool = False  # data is the persisted sample of a previous run
+        self._released_until: float = 0.0  # polling paused to leave the device to others
+        self._link_free_since: float | None = None  # our connection is closed since
+        self._free_window: int = 0  # [min] device left free at the start of each hour
+        self._sample_store: Final[Store[BMSsample]] = Store(
+            hass, 1, sample_store_key(config_entry.entry_id)
+        )
+        self._history: SampleHistory | None = None
+        self._fresh_at: dict[str, float] = {}  # tier -> time of its last sample
+        self._update_tier: str = TIER_FULL  # tier read by the next update
+        self._refresh_task: asyncio.Task[bool] | None = None  # shared on-demand refresh
+        self._refresh_tier: str = TIER_FULL
+        self._phase: Final[PhaseTracker] = PhaseTracker()
+        self._read_time: Final[LatencyHistogram] = LatencyHistogram()  # sample read
+        self._latency: Final[LatencyHistogram] = LatencyHistogram()  # read to state write
+        self._latency_seq: int | None = None  # sequence number of the last recorded sample
+        self._connect_time: Final[LatencyHistogram] = LatencyHistogram()  # new connections
+        self._polls: int = 0  # [#] updates that queried the device
+        self._failures: Final[Counter[str]] = Counter()  # reason -> failed updates
+        self._scanner: str | None = None  # source of the last new connection
+        self._state_writes: int = 0  # [#] entity state writes
+        self._started: Final[float] = monotonic()
+        self._trends: Final[PumpTrends] = PumpTrends()
+        self._trend_store: Final[Store[dict[str, Any]]] = Store(
+            hass, 1, trend_store_key(config_entry.entry_id)
+        )
 
         LOGGER.debug(
             "Initializing coordinator for %s (%s) as %s",
@@ -60,9 +111,15 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
         ):
             LOGGER.debug("%s: advertisement: %s", self.name, service_info.as_dict())
 
-        self._device.set_pump_underload_settings(config_entry.options.get("pump_underload_protection", False),
-                                              config_entry.options.get("underload_intensity_threshold", DEFAULT_UNDERLOAD_INTENSITY_THRESHOLD),
-                                                 config_entry.options.get("underload_period_s", DEFAULT_UNDERLOAD_PERIOD))
+        self._options: dict[str, Any] = dict(config_entry.options)
+        self._apply_options(config_entry.options)
+
+        self._device.set_command_listener(self._async_command_result)
+        # trends only change when the pump runtime advanced
+        self._device.pipeline.register(
+            "trend", self._update_trends, ("runtime", "filtration_mode")
+        )
+        self._device.pipeline.register("persist", self._persist_sample)
 
         # retrieve device information
         device_info: Final[dict[str, str]] = self._device.device_info()
@@ -82,6 +139,158 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
             serial_number=device_info.get("serial_number"),
         )
 
+    @property
+    def bms(self) -> BaseBMS:
+        """Return the BMS device handled by the coordinator."""
+        return self._device
+
+    @property
+    def breaker(self) -> ConnectionBreaker:
+        """Return the connection circuit breaker of the device."""
+        return self._breaker
+
+    @property
+    def scanners(self) -> ScannerSelector:
+        """Return connection statistics per scanner."""
+        return self._scanners
+
+    @property
+    def overruns(self) -> list[dict[str, Any]]:
+        """Return the last update cycles that ran out of budget."""
+        return list(self._overruns)
+
+    def _record_budget(self) -> None:
+        """Record operations that were skipped or aborted by the update budget."""
+        if (budget := self._device.budget) and (budget.overruns or budget.skipped):
+            LOGGER.debug(
+                "%s: update budget of %.1fs exceeded, aborted %s, skipped %s",
+                self.name,
+                budget.total,
+                budget.overruns,
+                budget.skipped,
+            )
+            self._overruns.append(
+                {
+                    "time": datetime.now().isoformat(),
+                    "aborted": budget.overruns,
+                    "skipped": budget.skipped,
+                }
+            )
+
+    @property
+    def release_remaining(self) -> float:
+        """Return seconds until polling resumes after a release of the connection."""
+        return max(0.0, self._released_until - monotonic())
+
+    @property
+    def released(self) -> bool:
+        """Return True while the device is left to other centrals, e.g. the vendor app."""
+        return bool(self.release_remaining) or dt_util.now().minute < self._free_window
+
+    async def async_release(self, duration: float) -> None:
+        """Release the connection and pause polling, a duration of 0 resumes."""
+        self._released_until = monotonic() + duration
+        if not duration:
+            LOGGER.info("%s: polling resumed", self.name)
+            await self.async_request_refresh()
+            return
+        LOGGER.info("%s: connection released for %.0fs", self.name, duration)
+        await self._device.release()
+        self._track_link()
+
+    def _track_link(self) -> None:
+        """Remember since when our connection to the device is closed."""
+        if self._device.is_connected:
+            self._link_free_since = None
+        elif self._link_free_since is None:
+            self._link_free_since = monotonic()
+
+    def _foreign_central(self) -> bool:
+        """Return True if another central likely holds the connection to the device.
+
+        The device stops advertising while connected, so silence although our
+        own connection is closed points to the vendor app or another central.
+        """
+        if self._link_free_since is None or not (
+            service_info := async_last_service_info(
+                self.hass, address=self._mac, connectable=True
+            )
+        ):
+            return False
+        return (
+            monotonic() - max(service_info.time, self._link_free_since)
+            > FOREIGN_CENTRAL_SILENCE
+        )
+
+    def _record_failure(self) -> None:
+        """Count a failed update, back off if the device is held by another central."""
+        if self._foreign_central():
+            LOGGER.info(
+                "%s: device connected to another central, pausing for %ds",
+                self.name,
+                FOREIGN_CENTRAL_BACKOFF,
+            )
+            self._released_until = monotonic() + FOREIGN_CENTRAL_BACKOFF
+            return
+        self._breaker.record_failure()
+
+    @property
+    def restored(self) -> bool:
+        """Return True while data is the last sample persisted by a previous run."""
+        return self._restored
+
+    async def async_restore_sample(self) -> bool:
+        """Load the last persisted sample as initial data, return True on success."""
+        if not (sample := await self._sample_store.async_load()):
+            return False
+        LOGGER.debug("%s: restored last sample %s", self.name, sample)
+        for key in MONOTONIC_KEYS:
+            sample.pop(key, None)  # type: ignore[misc]
+        self.data = sample
+        self._device.pipeline.seed(sample)
+        self._restored = True
+        return True
+
+    async def async_load_trends(self) -> None:
+        """Load the persisted pump trend statistics."""
+        if trends := await self._trend_store.async_load():
+            self._trends.load(trends)
+
+    def _update_trends(self, sample: BMSsample, _previous: BMSsample) -> None:
+        """Pipeline stage to update the pump trends and add them to the sample."""
+        if self._trends.update(sample):
+            self._trend_store.async_delay_save(self._trends.as_dict, SAMPLE_SAVE_DELAY)
+        sample.update(self._trends.values(sample.get("filtration_mode")))
+
+    @property
+    def history(self) -> SampleHistory | None:
+        """Return the sample history, None if it is disabled."""
+        return self._history
+
+    async def async_open_history(self) -> None:
+        """Open the on-disk sample history if enabled in the options."""
+        if not self._options.get("history"):
+            return
+        assert self.config_entry is not None
+        history: Final[SampleHistory] = SampleHistory(
+            Path(
+                self.hass.config.path(
+                    STORAGE_DIR, history_file_name(self.config_entry.entry_id)
+                )
+            )
+        )
+        await self.hass.async_add_executor_job(history.open)
+        LOGGER.debug("%s: sample history with %i records", self.name, len(history))
+        self._history = history
+        self._device.pipeline.register(
+            "history",
+            lambda sample, _previous: history.append(sample, sample.get("timestamp")),
+        )
+
+    def _persist_sample(self, sample: BMSsample, _previous: BMSsample) -> None:
+        """Pipeline stage to save the sample, delayed to limit storage writes."""
+        self._sample_store.async_delay_save(lambda: sample, SAMPLE_SAVE_DELAY)
+
     @property
     def rssi(self) -> int | None:
         """Return RSSI value for target BMS."""
@@ -106,18 +315,193 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
         return int(self._link_q.count(True) * 100 / len(self._link_q))
 
     async def async_shutdown(self) -> None:
-        """Shutdown coordinator and any connection."""
+        """Shutdown coordinator, the connection is left to the connection registry."""
         LOGGER.debug("Shutting down BMS (%s)", self.name)
+        self._device.set_command_listener(None)
+        if self._cmd_refresh_unsub:
+            self._cmd_refresh_unsub()
+            self._cmd_refresh_unsub = None
         await super().async_shutdown()
-        await self._device.disconnect()
+        # the connection registry closes the connection once no reload reattached
+        if self._history:
+            await self.hass.async_add_executor_job(self._history.close)
+            self._history = None
+
+    def _apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply options that can change while the device is running."""
+        self._scan_interval = timedelta(
+            seconds=options.get("scan_interval", DEFAULT_SCAN_INTERVAL_S)
+        )
+        self._hedged = options.get("hedged_connect", False)
+        self._free_window = options.get("free_window", 0)
+        self._device.set_reconnect(options.get("release_between_polls", False))
+        self._device.set_pump_underload_settings(
+            options.get("pump_underload_protection", False),
+            options.get("underload_intensity_threshold", DEFAULT_UNDERLOAD_INTENSITY_THRESHOLD),
+            options.get("underload_period_s", DEFAULT_UNDERLOAD_PERIOD),
+        )
+        self._device.tracer.set_buffer(TRACE_BUFFER_SIZE if options.get("tracing") else 0)
+
+    @property
+    def read_time(self) -> LatencyHistogram:
+        """Return the histogram of the sample read durations."""
+        return self._read_time
+
+    @property
+    def latency(self) -> LatencyHistogram:
+        """Return the histogram of the latencies from sample read to state write."""
+        return self._latency
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, record the latency of a new sample to its states."""
+        with self._device.tracer.span("write_states"):
+            super().async_update_listeners()
+        self._state_writes += len(self._listeners)
+        if (
+            self.data
+            and "read_end" in self.data
+            and (sequence := self.data.get("sequence")) != self._latency_seq
+        ):
+            self._latency_seq = sequence
+            self._latency.record(monotonic() - self.data["read_end"])
+            self._read_time.record(self.data["read_end"] - self.data["read_start"])
+
+    @property
+    def connect_time(self) -> LatencyHistogram:
+        """Return the histogram of the durations of new connections."""
+        return self._connect_time
+
+    @property
+    def polls(self) -> int:
+        """Return the number of updates that queried the device."""
+        return self._polls
+
+    @property
+    def failures(self) -> dict[str, int]:
+        """Return the number of failed updates per reason."""
+        return dict(self._failures)
+
+    @property
+    def scanner(self) -> str | None:
+        """Return the scanner (adapter or proxy) of the last new connection."""
+        return self._scanner
+
+    @property
+    def state_write_rate(self) -> float:
+        """Return the entity state writes per hour, an upper bound of recorder writes."""
+        return self._state_writes * 3600 / max(monotonic() - self._started, 1.0)
+
+    @callback
+    def async_update_options(self, options: Mapping[str, Any]) -> bool:
+        """Apply changed options live, return False if a reload is required."""
+        changed: Final[set[str]] = {
+            key
+            for key in options.keys() | self._options.keys()
+            if options.get(key) != self._options.get(key)
+        }
+        if not changed.isdisjoint(RELOAD_OPTIONS):
+            return False
+        LOGGER.debug("%s: applying options %s", self.name, changed)
+        self._options = dict(options)
+        self._apply_options(options)
+        if not (self.data or {}).get("pairing_state"):
+            self.update_interval = self._scan_interval
+            if self._listeners:  # replace the refresh scheduled with the old interval
+                self._schedule_refresh()
+        return True
+
+    @callback
+    def async_schedule_command_refresh(self) -> None:
+        """Refresh once commands settled, superseding a previously scheduled refresh."""
+        if self._cmd_refresh_unsub:
+            self._cmd_refresh_unsub()
+        self._cmd_refresh_unsub = async_call_later(
+            self.hass, COMMAND_REFRESH_DELAY, self._async_command_refresh
+        )
+
+    @callback
+    def _async_command_result(self, result: str, fields: dict[str, int]) -> None:
+        """Fire an event for a command that was deferred while offline."""
+        self.hass.bus.async_fire(
+            EVENT_COMMAND, {"address": self._mac, "result": result, "fields": fields}
+        )
+
+    def _fresh(self, max_age: float, tier: str) -> bool:
+        """Return True if the data of a tier is at most max_age seconds old."""
+        return (at := self._fresh_at.get(tier)) is not None and monotonic() - at <= max_age
+
+    async def async_refresh_max_age(self, max_age: float, tier: str = TIER_STATUS) -> bool:
+        """Refresh unless the data of a tier is fresh enough, return False on failure.
+
+        Concurrent callers share a single refresh, a full refresh also serves
+        callers requesting the status tier.
+        """
+        while not self._fresh(max_age, tier):
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_tier = tier
+                self._refresh_task = self.hass.async_create_task(
+                    self._async_tier_refresh(tier)
+                )
+            task: asyncio.Task[bool] = self._refresh_task
+            covers: bool = self._refresh_tier in (tier, TIER_FULL)
+            success: bool = await asyncio.shield(task)
+            if covers:
+                return success
+        return True
+
+    async def _async_tier_refresh(self, tier: str) -> bool:
+        """Refresh the data of a tier, return True on success."""
+        self._update_tier = tier
+        try:
+            await self.async_refresh()
+        finally:
+            self._update_tier = TIER_FULL
+        return self.last_update_success and not self.released
+
+    async def _async_command_refresh(self, _now: datetime) -> None:
+        """Run the refresh scheduled after commands."""
+        self._cmd_refresh_unsub = None
+        await self.async_request_refresh()
 
     async def associate(self) -> None:
-        """Shutdown coordinator and any connection."""
-        LOGGER.debug("assosiate")
-        await self._device.associate()
+        """Connect and associate with the device, e.g. once its pairing button was pressed."""
+        LOGGER.debug("%s: associate", self.name)
+        async with self._device.session():
+            pass  # the session connects and associates, raises if association failed
+        await self.async_request_refresh()
+
+
 
 
+    def _select_scanner(self) -> None:
+        """Route the next connection via the scanner with the best track record."""
+        ranked: Final = self._scanners.rank(
+            async_scanner_devices_by_address(self.hass, self._mac, connectable=True)
+        )
+        if not ranked:
+            return
+        self._sources = {
+            str(id(dev.ble_device)): dev.scanner.source for dev in ranked
+        }
+        LOGGER.debug(
+            "%s: connecting via %s", self.name, [dev.scanner.source for dev in ranked]
+        )
+        self._device.set_ble_device(
+            ranked[0].ble_device,
+            ranked[1].ble_device if self._hedged and len(ranked) > 1 else None,
+        )
 
+    def _record_connect(self) -> None:
+        """Update connection and scanner statistics after a connection attempt."""
+        connect_time: Final[float | None] = self._device.connect_time
+        if connect_time is not None:
+            self._connect_time.record(connect_time)
+        if source := self._sources.get(str(id(self._device.ble_device))):
+            self._scanners.record(source, connect_time is not None, connect_time)
+            if connect_time is not None:
+                self._scanner = source
+        self._sources = {}
 
     def _device_stale(self) -> bool:
         if self._link_q[-1]:
@@ -136,25 +520,80 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
 
         return self._stale
 
+    @property
+    def phase(self) -> PhaseTracker:
+        """Return the tracker of the device status refresh."""
+        return self._phase
+
+    def _aligned_interval(self) -> timedelta:
+        """Return the delay of the next poll, just after the next device status refresh."""
+        return timedelta(
+            seconds=self._phase.next_poll(monotonic(), self._scan_interval.total_seconds())
+        )
+
     async def _async_update_data(self) -> BMSsample:
         """Return the latest data from the device."""
 
         LOGGER.debug("%s: BMS data update", self.name)
 
+        if self.released:
+            if self._device.is_connected:
+                await self._device.release()
+            self._track_link()
+            if self.data is None:
+                raise UpdateFailed("connection released for other Bluetooth centrals")
+            return self.data
+
+        self._polls += 1
+        if not self._breaker.allow():
+            self._failures["suspended"] += 1
+            raise UpdateFailed(
+                f"connection suspended after repeated failures, retry in {self._breaker.retry_in:.0f}s"
+            )
+
         if self._device_stale():
-            await self._device.disconnect(reset=True)
+            await self._device.release(reset=True)
+
+        if not self._device.is_connected and not async_address_present(
+            self.hass, self._mac, connectable=True
+        ):
+            # cheap check, avoid occupying a connection slot for an absent device
+            self._breaker.record_failure()
+            self._failures["not_seen"] += 1
+            raise UpdateFailed(f"device not seen via Bluetooth{self._rssi_msg()}")
+
+        if not self._device.is_connected:
+            self._select_scanner()
+        self._track_link()
 
         start: Final[float] = monotonic()
+        status_only: Final[bool] = self._update_tier == TIER_STATUS
         try:
-            if not (bms_data := await self._device.async_update()):
+            if not (
+                bms_data := await self._device.async_update(
+                    min(
+                        self._scan_interval.total_seconds() * UPDATE_BUDGET_SHARE,
+                        UPDATE_BUDGET_MAX,
+                    ),
+                    status_only,
+                )
+            ):
                 LOGGER.debug("%s: no valid data received", self.name)
                 raise UpdateFailed("no valid data received.")
+        except UpdateFailed:
+            self._failures["no_data"] += 1
+            self._record_failure()
+            raise
         except TimeoutError as err:
+            self._failures["timeout"] += 1
+            self._record_failure()
             LOGGER.debug(
                 "%s: BMS communication timed out%s", self.name, self._rssi_msg()
             )
             raise TimeoutError("BMS communication timed out") from err
         except (BleakError, EOFError) as err:
+            self._failures[type(err).__name__] += 1
+            self._record_failure()
             LOGGER.debug(
                 "%s: BMS communication failed%s: %s (%s)",
                 self.name,
@@ -166,11 +605,31 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
                 f"BMS communication failed{self._rssi_msg()}: {err!s} ({type(err).__name__})"
             ) from err
         finally:
+            self._record_connect()
+            self._record_budget()
+            self._track_link()
             self._link_q.extend(
                 [False] * (1 + int((monotonic() - start) / UPDATE_INTERVAL))
             )
 
         self._link_q[-1] = True  # set success
+        self._fresh_at[TIER_STATUS] = bms_data["read_start"]
+        if not status_only and not (
+            (budget := self._device.budget) and budget.skipped
+        ):
+            self._fresh_at[TIER_FULL] = self._fresh_at[TIER_STATUS]
+        if self._breaker.state != BreakerState.CLOSED:
+            LOGGER.info("%s: connection recovered", self.name)
+        self._breaker.record_success()
+        self._restored = False
+        if status := self._device.status:
+            self._phase.observe(*status)
+        # poll slowly while the device waits to be paired
+        self.update_interval = (
+            timedelta(seconds=max(PAIRING_SCAN_INTERVAL, self._scan_interval.total_seconds()))
+            if bms_data.get("pairing_state")
+            else self._aligned_interval()
+        )
         LOGGER.debug("%s: BMS data sample %s", self.name, bms_data)
 
         self.device_info = DeviceInfo(
@@ -189,3 +648,13 @@ class BTBmsCoordinator(DataUpdateCoordinator[BMSsample]):
 
 
         return bms_data
+
+
+def sample_store_key(entry_id: str) -> str:
+    """Return the storage key of the persisted sample of a config entry."""
+    return f"bms_sample_{entry_id}"
+
+
+def trend_store_key(entry_id: str) -> str:
+    """Return the storage key of the pump trends of a config entry."""
+    return f"bms_trends_{entry_id}"
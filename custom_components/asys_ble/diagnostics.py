@@ -1,5 +1,7 @@
 """Provide diagnostics data for a battery management system."""
 
+from base64 import b64encode
+from time import time
 from typing import Any, Final
 
 from homeassistant.components.bluetooth import async_last_service_info
@@ -46,5 +48,27 @@ async def async_get_device_diagnostics(
             "last_update_success": coord.last_update_success,
             "last_exception": coord.last_exception,
             "interval": coord.update_interval,
+            "breaker": coord.breaker.as_dict(),
+            "scanners": coord.scanners.as_dict(),
+            "write_modes": coord.bms.write_modes,
+            "unreadable": coord.bms.unreadable,
+            "pipeline": coord.bms.pipeline.as_dict(),
+            "phase": coord.phase.as_dict(),
+            "polls": coord.polls,
+            "failures": coord.failures,
+            "commands": coord.bms.commands,
+            "connect_time": coord.connect_time.as_dict(),
+            "read_time": coord.read_time.as_dict(),
+            "latency": coord.latency.as_dict(),
+            "trace": coord.bms.tracer.spans(),
+            "data_age": (
+                round(time() - coord.data["timestamp"], 1)
+                if coord.data and "timestamp" in coord.data
+                else None
+            ),
+            "budget_overruns": coord.overruns,
+            "released": coord.released,
+            "release_remaining": coord.release_remaining,
         },
+        "capture": b64encode(coord.bms.capture.dump()).decode("ascii"),
     }
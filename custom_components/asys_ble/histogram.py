@@ -0,0 +1,68 @@
+"""Latency histograms of the BLE Battery Management System integration."""
+
+from bisect import bisect_left
+from typing import Any, Final
+
+from .const import LATENCY_BUCKETS
+
+
+class LatencyHistogram:
+    """Count latencies in fixed buckets, cheap enough to record every sample."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize empty buckets, the last one is unbounded."""
+        self._bounds: Final[tuple[float, ...]] = bounds
+        self._counts: Final[list[int]] = [0] * (len(bounds) + 1)
+        self.count: int = 0
+        self.total: float = 0.0  # [s]
+        self.max: float = 0.0  # [s]
+
+    def record(self, latency: float) -> None:
+        """Add a latency in seconds."""
+        self._counts[bisect_left(self._bounds, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the latencies of a histogram with the same buckets."""
+        if other._bounds != self._bounds:
+            raise ValueError("histogram buckets differ")
+        for idx, count in enumerate(other._counts):
+            self._counts[idx] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float | None:
+        """Return the upper bound of the bucket holding the quantile, None if empty."""
+        if not self.count:
+            return None
+        rank: Final[float] = q * self.count
+        seen: int = 0
+        for idx, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank and count:
+                return self._bounds[idx] if idx < len(self._bounds) else self.max
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics, times in milliseconds."""
+
+        def ms(value: float | None) -> float | None:
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "max_ms": ms(self.max),
+            "buckets": {
+                **{
+                    f"<={ms(bound):g}": count
+                    for bound, count in zip(self._bounds, self._counts, strict=False)
+                },
+                f">{ms(self._bounds[-1]):g}": self._counts[-1],
+            },
+        }
@@ -0,0 +1,197 @@
+"""Memory-mapped circular sample history of the BLE Battery Management System integration."""
+
+import csv
+from collections.abc import Iterator
+import mmap
+import os
+from pathlib import Path
+import struct
+from time import time
+from typing import Any, Final, Literal
+
+from .plugins.basebms import BMSsample
+
+HISTORY_MAGIC: Final[bytes] = b"ASYSHIS"
+HISTORY_VERSION: Final[int] = 1
+HISTORY_CAPACITY: Final[int] = 32768  # [#] records, 1 MiB, > 11 days at 30 s
+
+# magic, version, record size, capacity, next record index, number of records
+_HEADER: Final[struct.Struct] = struct.Struct("<7sBHIII10x")
+# timestamp, water/air temperature [0.1°C], current [0.1A], cycles, runtime,
+# state flags, filtration mode, filtration mode state
+_RECORD: Final[struct.Struct] = struct.Struct("<dhhHIIBBB7x")
+_NO_TEMP: Final[int] = -0x8000  # missing temperature
+_NO_CURRENT: Final[int] = 0xFFFF  # missing current
+
+# bit order of the state flags
+FLAGS: Final[tuple[str, ...]] = (
+    "filtration_state",
+    "filtration_hors_gel_state",
+    "filtration_24_24_state",
+    "surcharge_protection_state",
+    "light_state",
+    "underload_protection_state",
+    "pairing_state",
+)
+# NumPy structured dtype matching a record, exports are the raw records
+_NPY_DESCR: Final[str] = (
+    "[('time', '<f8'), ('water_temperature', '<i2'), ('air_temperature', '<i2'), "
+    "('current', '<u2'), ('cycles', '<u4'), ('runtime', '<u4'), ('flags', 'u1'), "
+    "('filtration_mode', 'u1'), ('filtration_mode_state', 'u1'), ('', '|V7')]"
+)
+
+
+def history_file_name(entry_id: str) -> str:
+    """Return the file name of the history of a config entry."""
+    return f"asys_ble_history_{entry_id}.bin"
+
+
+class SampleHistory:
+    """Fixed-size ring of fixed-width sample records in a memory-mapped file.
+
+    Blocking methods (open, close, export) must run in the executor; appending
+    only writes to the mapped memory.
+    """
+
+    def __init__(self, path: Path, capacity: int = HISTORY_CAPACITY) -> None:
+        """Initialize the history, the file is mapped by open()."""
+        self._path: Final[Path] = path
+        self._capacity: Final[int] = capacity
+        self._mm: mmap.mmap | None = None
+        self._head: int = 0  # index of the next record
+        self._count: int = 0
+
+    def open(self) -> None:
+        """Map the history file, create or reset it if it does not match."""
+        size: Final[int] = _HEADER.size + self._capacity * _RECORD.size
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd: Final[int] = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        magic, version, rec_size, capacity, head, count = _HEADER.unpack_from(self._mm)
+        if (magic, version, rec_size, capacity) == (
+            HISTORY_MAGIC,
+            HISTORY_VERSION,
+            _RECORD.size,
+            self._capacity,
+        ) and max(head, count) <= self._capacity:
+            self._head, self._count = head % self._capacity, count
+        else:
+            self._head = self._count = 0
+            self._write_header()
+
+    def close(self) -> None:
+        """Flush and unmap the history file."""
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+
+    def __len__(self) -> int:
+        """Return the number of stored records."""
+        return self._count
+
+    def _write_header(self) -> None:
+        assert self._mm is not None
+        _HEADER.pack_into(
+            self._mm,
+            0,
+            HISTORY_MAGIC,
+            HISTORY_VERSION,
+            _RECORD.size,
+            self._capacity,
+            self._head,
+            self._count,
+        )
+
+    def append(self, sample: BMSsample, timestamp: float | None = None) -> None:
+        """Store a sample as the newest record, overwriting the oldest one."""
+        if self._mm is None:
+            return
+
+        def temp(key: Literal["water_temperature", "air_temperature"]) -> int:
+            value: Final[int | float | None] = sample.get(key)
+            return _NO_TEMP if value is None else round(value * 10)
+
+        _RECORD.pack_into(
+            self._mm,
+            _HEADER.size + self._head * _RECORD.size,
+            time() if timestamp is None else timestamp,
+            temp("water_temperature"),
+            temp("air_temperature"),
+            _NO_CURRENT if "current" not in sample else round(sample["current"] * 10),
+            sample.get("cycles", 0),
+            sample.get("runtime", 0),
+            sum(1 << bit for bit, key in enumerate(FLAGS) if sample.get(key)),
+            sample.get("filtration_mode", 0),
+            sample.get("filtration_mode_state", 0),
+        )
+        self._head = (self._head + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+        self._write_header()
+
+    def _chunks(self) -> list[memoryview]:
+        """Return views of the raw records in chronological order (no copy)."""
+        if self._mm is None or not self._count:
+            return []
+        records: Final[memoryview] = memoryview(self._mm)[_HEADER.size :]
+        start: Final[int] = (self._head - self._count) % self._capacity
+        if start + self._count <= self._capacity:
+            return [records[start * _RECORD.size : (start + self._count) * _RECORD.size]]
+        return [
+            records[start * _RECORD.size : self._capacity * _RECORD.size],
+            records[: self._head * _RECORD.size],
+        ]
+
+    def records(self) -> Iterator[dict[str, Any]]:
+        """Yield the decoded records, oldest first."""
+        for chunk in self._chunks():
+            for ts, water, air, current, cycles, runtime, flags, mode, state in (
+                _RECORD.iter_unpack(chunk)
+            ):
+                yield {
+                    "time": ts,
+                    "water_temperature": None if water == _NO_TEMP else water / 10,
+                    "air_temperature": None if air == _NO_TEMP else air / 10,
+                    "current": None if current == _NO_CURRENT else current / 10,
+                    "cycles": cycles,
+                    "runtime": runtime,
+                    **{key: bool(flags >> bit & 1) for bit, key in enumerate(FLAGS)},
+                    "filtration_mode": mode,
+                    "filtration_mode_state": state,
+                }
+
+    def export_csv(self, path: Path) -> int:
+        """Write the decoded records as CSV, return the number of records."""
+        count: int = 0
+        with path.open("w", newline="", encoding="utf-8") as file:
+            writer: Final = csv.writer(file)
+            for count, record in enumerate(self.records(), 1):
+                if count == 1:
+                    writer.writerow(record.keys())
+                writer.writerow("" if value is None else value for value in record.values())
+        return count
+
+    def export_npy(self, path: Path) -> int:
+        """Write the raw records as NumPy structured array, return the number of records.
+
+        Values are stored unscaled: temperatures and current in tenths,
+        missing values as -32768 and 65535, states as bit flags (see FLAGS).
+        """
+        chunks: Final[list[memoryview]] = self._chunks()
+        count: Final[int] = sum(len(chunk) for chunk in chunks) // _RECORD.size
+        header: bytes = (
+            f"{{'descr': {_NPY_DESCR}, 'fortran_order': False, 'shape': ({count},), }}"
+        ).encode("latin1")
+        # pad to 64 byte alignment including magic, version and length fields
+        header += b" " * (-(len(header) + 11) % 64) + b"\n"
+        with path.open("wb") as file:
+            file.write(b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header)
+            for chunk in chunks:
+                file.write(chunk)
+        return count
@@ -42,10 +42,8 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in Home Assistant."""
 
     bms: BTBmsCoordinator = config_entry.runtime_data
-    for descr in LIGHT_TYPES:
-        async_add_entities(
-            [AsicLightEntity(bms, descr, format_mac(config_entry.unique_id))]
-        )
+    mac: str = format_mac(config_entry.unique_id)
+    async_add_entities(AsicLightEntity(bms, descr, mac) for descr in LIGHT_TYPES)
 
 
 class AsicLightEntity(CoordinatorEntity[BTBmsCoordinator],
@@ -90,6 +88,4 @@ class AsicLightEntity(CoordinatorEntity[BTBmsCoordinator],
     @property
     def is_on(self) -> bool | None:  # type: ignore[reportIncompatibleVariableOverride]
         """Handle updated data from the coordinator."""
-        LOGGER.debug(
-            f"light is on : {bool(self.coordinator.data.get('light_state'))}   {self.coordinator.data.get('light_state', False)}")
         return bool(self.coordinator.data.get(self.entity_description.key, False))
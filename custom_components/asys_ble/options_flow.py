@@ -1,3 +1,5 @@
+from typing import Any
+
 from homeassistant import config_entries
 import voluptuous as vol
 
@@ -8,20 +10,22 @@ class AsysBleOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry):
         self.config_entry = config_entry
 
-    async def async_step_init(self, user_input=None):
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
         if user_input is not None:
-            # Enregistre les nouvelles options
-            result = self.async_create_entry(title="", data=user_input)
-
-            # Rechargement du config_entry avec les nouvelles options
-            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
-
-            return result
+            # Enregistre les nouvelles options, appliquées par l'update listener
+            return self.async_create_entry(title="", data=user_input)
 
         cur_scan_interval = self.config_entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL_S)
         cur_pump_underload_protection = self.config_entry.options.get("pump_underload_protection", False)
         cur_underload_intensity_threshold = self.config_entry.options.get("underload_intensity_threshold", DEFAULT_UNDERLOAD_INTENSITY_THRESHOLD)
         cur_underload_period_s = self.config_entry.options.get("underload_period_s", DEFAULT_UNDERLOAD_PERIOD)
+        cur_hedged_connect = self.config_entry.options.get("hedged_connect", False)
+        cur_release_between_polls = self.config_entry.options.get("release_between_polls", False)
+        cur_free_window = self.config_entry.options.get("free_window", 0)
+        cur_history = self.config_entry.options.get("history", False)
+        cur_tracing = self.config_entry.options.get("tracing", False)
 
         return self.async_show_form(
             step_id="init",
@@ -30,5 +34,10 @@ class AsysBleOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional("pump_underload_protection", default=cur_pump_underload_protection): bool,
                 vol.Optional("underload_intensity_threshold", default=cur_underload_intensity_threshold): int,
                 vol.Optional("underload_period_s", default=cur_underload_period_s): int,
+                vol.Optional("hedged_connect", default=cur_hedged_connect): bool,
+                vol.Optional("release_between_polls", default=cur_release_between_polls): bool,
+                vol.Optional("free_window", default=cur_free_window): vol.All(int, vol.Range(min=0, max=59)),
+                vol.Optional("history", default=cur_history): bool,
+                vol.Optional("tracing", default=cur_tracing): bool,
             }),
         )
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""Poll alignment to the status refresh of the BLE Battery Management System."""
+
+from collections import deque
+from math import ceil, log
+from typing import Any, Final
+
+from .const import (
+    ALIGN_HISTORY,
+    ALIGN_MARGIN,
+    ALIGN_MAX_BRACKET,
+    ALIGN_MAX_PERIOD,
+    ALIGN_MIN_CHANGES,
+    ALIGN_MIN_PERIOD,
+    ALIGN_PROBE_EVERY,
+)
+
+_GOLDEN: Final[float] = 0.618034  # dither sequence of poll delays while learning
+_COARSE_STEP: Final[float] = 0.005  # relative step of the period search
+_FINE_STEP: Final[float] = 0.0005  # relative step of the period tracking
+_FINE_RANGE: Final[int] = 20  # [#] fine steps searched around the period
+
+
+class PhaseTracker:
+    """Learn period and phase of the device status refresh from polled status blocks.
+
+    A poll that reads a changed status block proves a refresh since the
+    previous poll, an unchanged block proves there was none. The period is the
+    one all of these intervals agree on, the phase bracket is where they
+    agree. Polls are placed just after the bracket, into it while it is wide,
+    and now and then just before it to keep it tight. Intervals age out, so
+    drift is followed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without any observations."""
+        self._last: tuple[float, bytes] | None = None  # time and status of last poll
+        # poll intervals: start, end and whether the status changed
+        self._polls: Final[deque[tuple[float, float, bool]]] = deque(maxlen=ALIGN_HISTORY)
+        self._period: float | None = None  # [s]
+        self._bracket: tuple[float, float] = (0.0, 0.0)  # [s] refresh phase modulo period
+        self._planned: float | None = None  # expected refresh before the next poll
+        self._count: int = 0  # [#] polls scheduled
+        self._probing: bool = False  # next poll is scheduled just before a refresh
+        self._credit: float = 0.0  # [s] aligned delays beyond the poll interval
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def period(self) -> float | None:
+        """Return the status refresh period of the device, None if unknown."""
+        return self._period
+
+    def observe(self, time: float, status: bytes) -> None:
+        """Add a polled status block and the (monotonic) time it was read."""
+        if self._last is None:
+            self._last = (time, status)
+            return
+        last_time, last_status = self._last
+        if time <= last_time:
+            return  # already observed
+        changed: Final[bool] = status != last_status
+        if self._planned is not None and time >= self._planned:
+            if changed:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._planned = None
+        self._polls.append((last_time, time, changed))
+        self._last = (time, status)
+        self._estimate()
+
+    def _score(self, period: float) -> tuple[int, float, float, float] | None:
+        """Return disagreement (<= 0), width and bounds of the best phase bracket.
+
+        None if too few intervals are shorter than the period to tell the phase.
+        """
+        events: list[tuple[float, int]] = []
+        positives: int = 0
+        conflicts: int = 0
+        for lo, hi, changed in self._polls:
+            if hi - lo >= period:
+                conflicts += not changed  # a refresh is certain within a period
+                continue
+            weight = 1 if changed else -1
+            positives += changed
+            start, end = lo % period, hi % period
+            if start <= end:
+                events += [(start, weight), (end, -weight)]
+            else:
+                events += [(start, weight), (period, -weight), (0.0, weight), (end, -weight)]
+        if positives < ALIGN_MIN_CHANGES:
+            return None
+        events.sort(key=lambda event: (event[0], -event[1]))
+        best: tuple[int, float, float, float] = (-positives - conflicts, 0.0, 0.0, 0.0)
+        cover: int = -conflicts
+        for pos, (start, delta) in enumerate(events[:-1]):
+            cover += delta
+            end = events[pos + 1][0]
+            if end > start and (cover - positives, end - start) > best[:2]:
+                best = (cover - positives, end - start, start, end)
+        return best
+
+    def _estimate(self) -> None:
+        """Estimate period and phase bracket from the recent poll intervals."""
+        candidates: list[float]
+        if self._period is None:
+            unchanged: Final[list[float]] = [
+                hi - lo for lo, hi, changed in self._polls if not changed
+            ]
+            if len(self._polls) < ALIGN_HISTORY or not unchanged:
+                return  # too few polls or every poll sees a change, refreshes are faster
+            # the period is longer than every interval without change
+            low: Final[float] = max(ALIGN_MIN_PERIOD, *unchanged)
+            steps: Final[int] = max(0, ceil(log(ALIGN_MAX_PERIOD / low) / _COARSE_STEP))
+            candidates = [low * (1 + _COARSE_STEP) ** idx for idx in range(steps + 1)]
+        else:
+            candidates = [
+                self._period * (1 + _FINE_STEP * idx)
+                for idx in range(-_FINE_RANGE, _FINE_RANGE + 1)
+            ]
+        # all intervals agree on the true period, with the widest bracket
+        scores: Final[list[tuple[tuple[int, float, float, float], float]]] = [
+            (score, period)
+            for period in candidates
+            if (score := self._score(period)) is not None
+        ]
+        if not scores:
+            return  # keep the estimate until polls tell more
+        (disagreement, _, start, end), period = max(scores, key=lambda item: item[0][:2])
+        if disagreement:
+            self._period = None  # refresh pattern changed, learn again
+            return
+        if self._period is None and end - start > period * ALIGN_MAX_BRACKET:
+            return  # ambiguous, learn from more polls
+        self._period = period
+        self._bracket = (start, end)
+
+    def next_poll(self, now: float, interval: float) -> float:
+        """Return the delay of the next poll, just after a refresh once learned.
+
+        Aligned delays are within half a device period of the interval. Probes
+        take an extra poll, only while aligned delays saved one, so the poll
+        rate does not increase. While learning, delays are dithered around
+        the interval.
+        """
+        self._count += 1
+        if self._period is None:
+            return interval * (0.75 + 0.5 * (self._count * _GOLDEN % 1))
+        start, end = self._bracket
+        phase: float = end
+        lead: float = interval
+        if self._probing:
+            lead = 0.0  # follow the probe right after the refresh
+            self._probing = False
+        elif end - start > 2 * ALIGN_MARGIN:
+            phase = (start + end) / 2  # bisect a wide bracket
+        elif not self._count % ALIGN_PROBE_EVERY and self._credit >= interval:
+            # expect no change, the following poll keeps the bracket tight
+            phase = start - 2 * ALIGN_MARGIN
+            self._probing = True
+        # the refresh closest to the regular poll, the poll rate stays the same
+        refresh: float = round((now + lead - phase) / self._period) * self._period + phase
+        while refresh + ALIGN_MARGIN <= now:
+            refresh += self._period
+        self._planned = None if self._probing else refresh
+        delay: Final[float] = refresh + ALIGN_MARGIN - now
+        # polls saved against the regular interval pay for probes
+        self._credit = min(self._credit + delay - interval, ALIGN_PROBE_EVERY * interval)
+        return delay
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the alignment state for diagnostics."""
+        return {
+            "period": round(self._period, 3) if self._period else None,
+            "bracket": [round(value, 2) for value in self._bracket],
+            "polls": len(self._polls),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -1,22 +1,85 @@
 """Base class defintion for battery management systems (BMS)."""
 
-from datetime import datetime
 import asyncio
+from collections import Counter
+from time import monotonic, time
+import importlib
 import logging
+import sys
 from abc import ABC, abstractmethod
-from typing import Final, TypedDict
+from types import ModuleType
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any, ClassVar, Final, Self, TypedDict
 
-from Crypto.Cipher import AES
 from bleak import BleakClient
+from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.exc import BleakError
-from bleak_retry_connector import establish_connection
 from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
 from homeassistant.components.bluetooth.match import ble_device_matches
 from homeassistant.helpers.storage import Store
 from homeassistant.loader import BluetoothMatcherOptional
 
-from custom_components.asys_ble.const import DEFAULT_UNDERLOAD_PERIOD, DEFAULT_UNDERLOAD_INTENSITY_THRESHOLD
+from custom_components.asys_ble.const import (
+    BUDGET_ASSOCIATE_SHARE,
+    BUDGET_CONNECT_SHARE,
+    BUDGET_OPTIONAL_RESERVE,
+    CONNECT_TIMEOUT,
+    CONTROL_COALESCE_WINDOW,
+    CONTROL_MIN_SPACING,
+    DEFAULT_UNDERLOAD_INTENSITY_THRESHOLD,
+    DEFAULT_UNDERLOAD_PERIOD,
+    GATT_TIMEOUT,
+    OFFLINE_COMMAND_TTL,
+    OPTIONS_FILTRATION_STATE_MODE,
+    PUMP_VOLTAGE,
+    UNREADABLE_FAILURES,
+)
+
+from .budget import UpdateBudget
+from .capture import FrameCapture, FrameKind
+from .pipeline import SamplePipeline
+from .tracing import Tracer
+
+
+async def _async_import(name: str) -> ModuleType:
+    """Import a module on first use without blocking the event loop."""
+    if (module := sys.modules.get(name)) is not None:
+        return module
+    return await asyncio.get_running_loop().run_in_executor(
+        None, importlib.import_module, name
+    )
+
+
+# byte offsets in the control register
+CTRL_FILTRATION_MODE: Final[int] = 0
+CTRL_FILTRATION_STATE: Final[int] = 1
+CTRL_LIGHT: Final[int] = 2
+CTRL_LIGHT_COLOR: Final[int] = 3  # writing 1 steps to the next color
+CTRL_TRIGGERS: Final[frozenset[int]] = frozenset({CTRL_LIGHT_COLOR})  # not mergeable
+CTRL_FIELDS: Final[dict[int, str]] = {
+    CTRL_FILTRATION_MODE: "filtration_mode",
+    CTRL_FILTRATION_STATE: "filtration_state",
+    CTRL_LIGHT: "light",
+    CTRL_LIGHT_COLOR: "light_color_step",
+}
+
+
+SAMPLE_LIMITS: Final[dict[str, tuple[float, float]]] = {
+    "water_temperature": (0, 80),  # [°C] probe errors decode as large values
+    "air_temperature": (-40, 80),  # [°C] below zero in frost protection weather
+}
+# sample stamps of this run only, meaningless after a restart
+MONOTONIC_KEYS: Final[frozenset[str]] = frozenset({"read_start", "read_end"})
+# standard device information characteristics, readable without association
+DEVICE_INFO_CHARS: Final[dict[str, str]] = {
+    "model": "00002a24-0000-1000-8000-00805f9b34fb",
+    "serial_number": "00002a25-0000-1000-8000-00805f9b34fb",
+    "sw_version": "00002a26-0000-1000-8000-00805f9b34fb",
+    "hw_version": "00002a27-0000-1000-8000-00805f9b34fb",
+    "manufacturer": "00002a00-0000-1000-8000-00805f9b34fb",
+}
 
 
 class BMSsample(TypedDict, total=False):
@@ -43,6 +106,32 @@ class BMSsample(TypedDict, total=False):
     sw_version:str
     serial_number: str
     underload_protection_state: bool
+    pump_energy: float  # [Wh]
+    current_trend: float  # [mA/h] drift of the pump current over runtime
+    pump_health: float  # [%] recent pump current relative to its baseline
+    sequence: int  # [#] number of the sample since start
+    read_start: float  # [s] monotonic time the sample read started
+    read_end: float  # [s] monotonic time the sample was read
+    timestamp: float  # [s] wall clock time (UNIX epoch) the sample was read
+
+
+def _filtration_state(option: str) -> int:
+    """Return control register value of a filtration state, unknown means AUTO."""
+    return (
+        OPTIONS_FILTRATION_STATE_MODE.index(option)
+        if option in OPTIONS_FILTRATION_STATE_MODE
+        else 2
+    )
+
+
+def _apply_control(data: BMSsample, changes: dict[int, int]) -> None:
+    """Update a sample with written control register changes."""
+    if CTRL_FILTRATION_MODE in changes:
+        data["filtration_mode"] = changes[CTRL_FILTRATION_MODE]
+    if CTRL_FILTRATION_STATE in changes:
+        data["filtration_mode_state"] = changes[CTRL_FILTRATION_STATE]
+    if CTRL_LIGHT in changes:
+        data["light_state"] = changes[CTRL_LIGHT] != 0
 
 
 class AdvertisementPattern(TypedDict, total=False):
@@ -62,7 +151,10 @@ class BaseBMS(ABC):
     CHARACTERISTIC_SYSTEM_SHAREDKEY_UUID = "3BEF0202-F30A-DF90-4A4C-74B6EB69184F"
     CHARACTERISTIC_SYSTEM_ENCRYPTKEY_UUID = "3BEF0203-F30A-DF90-4A4C-74B6EB69184F"
     CHARACTERISTIC_SYSTEM_RANDOMKEY_UUID = "3BEF0201-F30A-DF90-4A4C-74B6EB69184F"
-
+    CONTROL_UUID: str = ""  # control register, set by plugin
+    STATUS_UUID: str = ""  # status block, set by plugin
+    # write mode (True: with response) learned per model, seeds devices of that model
+    _model_write_modes: ClassVar[dict[str, dict[str, bool]]] = {}
 
 
     def __init__(
@@ -83,30 +175,60 @@ class BaseBMS(ABC):
 
         """
 
-        self._ble_device: Final[BLEDevice] = ble_device
-        self._reconnect: Final[bool] = reconnect
+        self._ble_device: BLEDevice = ble_device
+        self._ble_device_alt: BLEDevice | None = None  # raced against _ble_device
+        self._connect_time: float | None = None  # [s] duration of last new connection
+        self._budget: UpdateBudget | None = None  # deadline of the running update
+        self._last_budget: UpdateBudget | None = None
+        self._status_only: bool = False  # running update skips optional reads
+        self._status: tuple[float, bytes] | None = None  # read time, last status block
+        self._reconnect: bool = reconnect
         self.name: Final[str] = self._ble_device.name or "undefined"
         self._log: Final[logging.Logger] = logging.getLogger(
             f"{logger_name.replace('.plugins', '')}::{self.name}:"
             f"{self._ble_device.address[-5:].replace(':', '')})"
         )
+        self._tracer: Final[Tracer] = Tracer(self._log)
         self._store = store
-        self._inv_wr_mode: bool | None = None  # invert write mode (WNR <-> W)
+        self._store_data: dict[str, Any] | None = None  # cached content of store
+        self._chars: dict[str, BleakGATTCharacteristic] = {}  # UUID -> handle table
+        self._write_modes: dict[str, bool] = {}  # UUID -> write with response
+        self._unreadable: dict[str, int] = {}  # UUID -> failed reads while associated
+        self._pairing: bool = False  # last update failed to associate
 
         self._log.debug(
             "initializing %s, BT address: %s", self.device_id(), ble_device.address
         )
+        # placeholder until connected, connections come from establish_connection;
+        # by address, a device without backend details (replay) is fine too
         self._client: BleakClient = BleakClient(
-            self._ble_device,
+            self._ble_device.address,
             disconnected_callback=self._on_disconnect,
         )
         self._data: bytearray = bytearray()
         # self._data_control: bytearray = bytearray()
         self._data_event: Final[asyncio.Event] = asyncio.Event()
+        self._capture: Final[FrameCapture] = FrameCapture()
+        # pending control register changes with the futures waiting for them
+        self._ctrl_batches: list[tuple[dict[int, int], list[asyncio.Future[bool]]]] = []
+        self._ctrl_task: asyncio.Task[None] | None = None
+        self._ctrl_last_write: float = 0.0
+        self._commands: Counter[str] = Counter()  # result -> control writes
+        self._session_lock: Final[asyncio.Lock] = asyncio.Lock()
+        self._lock_owner: asyncio.Task[Any] | None = None  # task holding the session lock
+        self._associated: bool = False  # encryption key written on current connection
+        # receives (result, fields) of commands deferred while offline
+        self._command_listener: Callable[[str, dict[str, int]], None] | None = None
         self.is_pump_underload_protection_enabled = False
         self.underload_intensity_threshold = DEFAULT_UNDERLOAD_INTENSITY_THRESHOLD
         self.underload_period_s = DEFAULT_UNDERLOAD_PERIOD
-        self.underload_seen_datetime = None
+        self._underload_since: float | None = None  # read start of first low current
+        self._sequence: int = 0  # [#] samples read
+        self._pipeline: Final[SamplePipeline] = SamplePipeline()
+        self._pipeline.register("validate", self._validate, SAMPLE_LIMITS)
+        self._pipeline.register("carry", self._carry_device_info)
+        self._pipeline.register("derive", self._derive_energy)
+        self._pipeline.register("detect", self._detect_underload)
 
     @staticmethod
     @abstractmethod
@@ -141,16 +263,331 @@ class BaseBMS(ABC):
 
 
     def set_pump_underload_settings(self,is_pump_underload_protection_enabled: bool,underload_intensity_threshold: int,underload_period_s: int) -> None:
-        self._log.debug(f"set_pump_underload_settings {is_pump_underload_protection_enabled} {underload_intensity_threshold} {underload_period_s}")
+        self._log.debug(
+            "set_pump_underload_settings %s %s %s",
+            is_pump_underload_protection_enabled,
+            underload_intensity_threshold,
+            underload_period_s,
+        )
         self.is_pump_underload_protection_enabled = is_pump_underload_protection_enabled
         self.underload_intensity_threshold = underload_intensity_threshold
         self.underload_period_s = underload_period_s
 
+    def set_reconnect(self, reconnect: bool) -> None:
+        """Set whether the connection is released after each update."""
+        self._reconnect = reconnect
+
+    @property
+    def capture(self) -> FrameCapture:
+        """Return the raw GATT frame capture of this BMS."""
+        return self._capture
+
+    async def _async_load_store(self) -> dict[str, Any]:
+        """Return the persisted data of the BMS, loaded from storage once."""
+        if self._store_data is None:
+            self._store_data = await self._store.async_load() or {}
+        return self._store_data
+
+    async def _async_save_store(self, **sections: Any) -> None:
+        """Update sections of the persisted data and write it to storage."""
+        store_data: Final[dict[str, Any]] = await self._async_load_store()
+        if all(store_data.get(key) == value for key, value in sections.items()):
+            return
+        store_data.update(sections)
+        await self._store.async_save(store_data)
+
+    def _char(self, char: str) -> BleakGATTCharacteristic | str:
+        """Return the resolved characteristic for a UUID, if known."""
+        return self._chars.get(char.lower(), char)
+
+    async def _async_resolve_chars(self) -> None:
+        """Build the handle table of the connected device and validate the cache."""
+        self._chars = {
+            char.uuid.lower(): char
+            for service in self._client.services
+            for char in service.characteristics
+        }
+        handles: Final[dict[str, int]] = {
+            uuid: char.handle for uuid, char in self._chars.items()
+        }
+        gatt: Final[dict[str, Any]] = (await self._async_load_store()).get("gatt", {})
+        if not handles:
+            await self._async_clear_gatt_cache()
+            raise BleakError("GATT service discovery failed")
+        if gatt.get("handles") and gatt["handles"] != handles:
+            self._log.debug("GATT handle table changed, refreshing service cache")
+            await self._async_clear_gatt_cache()
+            raise BleakError("GATT services changed")
+        self._write_modes = dict(gatt.get("write", {}))
+        self._unreadable = dict(gatt.get("unreadable", {}))
+        await self._async_save_store(
+            gatt={
+                "handles": handles,
+                "fw": gatt.get("fw"),
+                # copies, the cached store data must not follow later learning
+                "write": dict(self._write_modes),
+                "unreadable": dict(self._unreadable),
+            }
+        )
+
+    async def _async_clear_gatt_cache(self) -> None:
+        """Drop cached services and the persisted handle table."""
+        self._chars = {}
+        self._write_modes = {}
+        self._unreadable = {}
+        if hasattr(self._client, "clear_cache"):
+            await self._client.clear_cache()
+        await self._async_save_store(gatt={})
+
+    async def _async_check_firmware(self, data: BMSsample) -> None:
+        """Invalidate the GATT cache if the firmware version changed."""
+        if not (fw := data.get("sw_version")):
+            return
+        gatt: Final[dict[str, Any]] = (await self._async_load_store()).get("gatt", {})
+        if gatt.get("fw") not in (None, fw):
+            self._log.info("firmware changed to %s, invalidating GATT cache", fw)
+            await self._async_clear_gatt_cache()
+            await self.disconnect()
+            return
+        await self._async_save_store(gatt=gatt | {"fw": fw})
+
+    def _op_timeout(self, share: float = 1.0, timeout: float = GATT_TIMEOUT) -> float:
+        """Return the timeout for the next operation from the update budget, if any."""
+        return self._budget.remaining(share) if self._budget else timeout
+
+    @asynccontextmanager
+    async def _deadline(
+        self,
+        operation: str,
+        share: float = 1.0,
+        target: str = "",
+        timeout: float = GATT_TIMEOUT,
+    ) -> AsyncIterator[None]:
+        """Bound an operation by the update budget, trace it and record overruns.
+
+        Outside of updates, the operation is bound by its own timeout.
+        """
+        try:
+            with self._tracer.span(operation, target):
+                async with asyncio.timeout(self._op_timeout(share, timeout)):
+                    yield
+        except TimeoutError:
+            if self._budget:
+                self._budget.overruns.append(f"{operation} {target}".rstrip())
+            raise
+
+    async def _read(self, char: str, redact: bool = False) -> bytearray:
+        """Read a characteristic and record the raw frame (zeroed if redacted)."""
+        start: Final[float] = monotonic()
+        async with self._deadline("read", target=char):
+            data: Final[bytearray] = await self._client.read_gatt_char(self._char(char))
+        self._capture.record(FrameKind.READ, char, bytes(len(data)) if redact else data)
+        if char == self.STATUS_UUID:
+            self._status = (start, bytes(data))
+        return data
+
+    async def _read_optional(self, char: str) -> bytearray | None:
+        """Read a characteristic if the budget allows, return None on failure.
+
+        Characteristics the device does not offer, or that failed repeatedly
+        while associated, are skipped until the GATT cache is invalidated,
+        i.e. the firmware changed.
+        """
+        if self._status_only:
+            return None
+        uuid: Final[str] = char.lower()
+        if (self._chars and uuid not in self._chars) or self._unreadable.get(
+            uuid, 0
+        ) >= UNREADABLE_FAILURES:
+            return None
+        if self._budget and not self._budget.allows_optional():
+            self._budget.skipped.append(char)
+            return None
+        try:
+            value: Final[bytearray] = await self._read(char)
+        except BleakError as err:
+            self._log.debug("optional read of %s failed: %s", char, err)
+            if self._associated:  # not a missing association or a lost link
+                await self._async_learn_readable(uuid, False)
+            return None
+        except TimeoutError:
+            self._log.debug("optional read of %s timed out", char)
+            return None
+        await self._async_learn_readable(uuid, True)
+        return value
+
+    async def _async_read_device_info(self, data: BMSsample) -> None:
+        """Read the optional device information fields."""
+        for key, char in DEVICE_INFO_CHARS.items():
+            if (value := await self._read_optional(char)) is not None:
+                data[key] = value.decode("utf-8")  # type: ignore[literal-required]
+
+    @staticmethod
+    def _decode_control(data: BMSsample, value: bytearray) -> None:
+        """Decode the control register into a sample."""
+        data["light_state"] = value[CTRL_LIGHT] != 0
+        data["filtration_mode_state"] = value[CTRL_FILTRATION_STATE]
+        data["filtration_mode"] = value[CTRL_FILTRATION_MODE]
+
+    @staticmethod
+    def _decode_status(data: BMSsample, value: bytearray) -> None:
+        """Decode the status block into a sample."""
+        data["water_temperature"] = value[14]
+        data["air_temperature"] = int.from_bytes(value[16:17], signed=True)
+        data["current"] = value[12] / 10
+        data["cycles"] = int.from_bytes(value[8:12], byteorder="little", signed=False)
+        data["runtime"] = int.from_bytes(value[4:8], byteorder="little", signed=False)
+        data["filtration_hors_gel_state"] = bool(value[0])
+        data["filtration_24_24_state"] = bool(value[1])
+        data["filtration_state"] = bool(value[2])
+        data["surcharge_protection_state"] = bool(value[3])
+
+    async def _write(
+        self,
+        char: str,
+        data: bytes | bytearray,
+        response: bool | None = None,
+        redact: bool = False,
+        verify: Callable[[bytes], bool] | None = None,
+    ) -> None:
+        """Write a characteristic and record the raw frame (zeroed if redacted).
+
+        Without explicit response mode, the fastest mode that proved reliable for
+        the characteristic is used. Write without response is only adopted after
+        verify accepted the value read back, errors fall back to the other mode.
+        """
+        modes: list[bool] = self._write_modes_supported(char)
+        if response is not None:
+            modes = [response]
+        elif (learned := self._learned_write_mode(char)) in modes:
+            modes.sort(key=lambda mode: mode != learned)
+        elif verify is None:
+            modes = [True] if True in modes else modes  # cannot probe safely
+
+        for idx, mode in enumerate(modes):
+            self._capture.record(
+                FrameKind.WRITE, char, bytes(len(data)) if redact else data
+            )
+            try:
+                async with self._deadline("write", target=char):
+                    await self._client.write_gatt_char(self._char(char), data, mode)
+                if (
+                    response is None
+                    and not mode
+                    and char.lower() not in self._write_modes
+                    and verify is not None
+                    and not verify(bytes(await self._read(char)))
+                ):
+                    raise BleakError("write without response not applied")
+            except BleakError as err:
+                if idx == len(modes) - 1:
+                    raise
+                self._log.debug(
+                    "write %s %s response failed (%s), falling back",
+                    char,
+                    "with" if mode else "without",
+                    err,
+                )
+                continue
+            if response is None:
+                await self._async_learn_write_mode(char, mode)
+            return
+
+    @property
+    def tracer(self) -> Tracer:
+        """Return the tracer of the operations of this BMS."""
+        return self._tracer
+
+    @property
+    def status(self) -> tuple[float, bytes] | None:
+        """Return the (monotonic) request time and content of the last status block read."""
+        return self._status
+
+    @property
+    def write_modes(self) -> dict[str, bool]:
+        """Return the learned write mode (True: with response) per characteristic."""
+        return dict(self._write_modes)
+
+    def _write_modes_supported(self, char: str) -> list[bool]:
+        """Return the write modes (True: with response) of a characteristic, fastest first."""
+        if isinstance(resolved := self._char(char), str):
+            return [True]  # properties unknown, use acknowledged writes
+        return [
+            mode
+            for mode, prop in ((False, "write-without-response"), (True, "write"))
+            if prop in resolved.properties
+        ] or [True]
+
+    def _learned_write_mode(self, char: str) -> bool | None:
+        """Return the write mode learned for this device, else for its model."""
+        return self._write_modes.get(
+            char.lower(),
+            BaseBMS._model_write_modes.get(type(self).__module__, {}).get(char.lower()),
+        )
+
+    async def _async_learn_write_mode(self, char: str, response: bool) -> None:
+        """Remember a working write mode for the device and its model."""
+        if self._write_modes.get(char.lower()) == response:
+            return
+        self._log.debug(
+            "using write %s response for %s", "with" if response else "without", char
+        )
+        self._write_modes[char.lower()] = response
+        BaseBMS._model_write_modes.setdefault(type(self).__module__, {})[
+            char.lower()
+        ] = response
+        await self._async_save_write_modes()
+
+    async def _async_save_write_modes(self) -> None:
+        """Persist the learned write modes with the GATT cache."""
+        gatt: Final[dict[str, Any]] = (await self._async_load_store()).get("gatt", {})
+        await self._async_save_store(gatt=gatt | {"write": dict(self._write_modes)})
+
+    @property
+    def unreadable(self) -> dict[str, int]:
+        """Return the failed reads while associated per optional characteristic."""
+        return dict(self._unreadable)
+
+    async def _async_learn_readable(self, uuid: str, readable: bool) -> None:
+        """Count consecutive failed reads of an optional characteristic."""
+        failures: Final[int] = 0 if readable else self._unreadable.get(uuid, 0) + 1
+        if self._unreadable.get(uuid, 0) == failures:
+            return
+        if failures:
+            self._unreadable[uuid] = failures
+        else:
+            del self._unreadable[uuid]
+        if failures == UNREADABLE_FAILURES:
+            self._log.info("%s is not readable, skipping it with this firmware", uuid)
+        gatt: Final[dict[str, Any]] = (await self._async_load_store()).get("gatt", {})
+        await self._async_save_store(gatt=gatt | {"unreadable": dict(self._unreadable)})
+
+    def _notification_handler(
+        self, sender: BleakGATTCharacteristic, data: bytearray
+    ) -> None:
+        """Record notification data and signal its arrival."""
+        self._capture.record(FrameKind.NOTIFY, sender.uuid, data)
+        self._data += data
+        self._data_event.set()
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True if a connection to the BMS is established."""
+        return self._client.is_connected
+
+    def _log_pairing_error(self, err: BleakError) -> None:
+        """Log a failed association, repeated failures only at debug level."""
+        self._log.log(
+            logging.DEBUG if self._pairing else logging.WARNING,
+            "association failed, device not paired? (%s)",
+            err,
+        )
 
     def _on_disconnect(self, _client: BleakClient) -> None:
         """Disconnect callback function."""
 
         self._log.debug("disconnected from BMS")
+        self._associated = False
 
     async def _init_connection(self) -> None:
         # reset any stale data from BMS
@@ -158,22 +595,88 @@ class BaseBMS(ABC):
         self._data_event.clear()
 
 
+    @property
+    def ble_device(self) -> BLEDevice:
+        """Return the Bleak device used for the current or next connection."""
+        return self._ble_device
+
+    @property
+    def connect_time(self) -> float | None:
+        """Return duration of the last update's connect, None if link was reused."""
+        return self._connect_time
+
+    def set_ble_device(
+        self, ble_device: BLEDevice, alternative: BLEDevice | None = None
+    ) -> None:
+        """Set the path used to connect, optionally racing an alternative path."""
+        self._ble_device = ble_device
+        self._ble_device_alt = alternative
+
+    async def _establish(self, brc: ModuleType, device: BLEDevice) -> BleakClient:
+        client: Final[BleakClient] = await brc.establish_connection(
+            client_class=brc.BleakClientWithServiceCache,
+            device=device,
+            name=device.address,
+            disconnected_callback=self._on_disconnect,
+            use_services_cache=True,
+        )
+        return client
+
+    async def _establish_hedged(
+        self, brc: ModuleType, devices: list[BLEDevice]
+    ) -> tuple[BleakClient, BLEDevice]:
+        """Race connection attempts via several paths, keep the first that succeeds."""
+        tasks: Final[dict[asyncio.Task[BleakClient], BLEDevice]] = {
+            asyncio.create_task(self._establish(brc, device)): device
+            for device in devices
+        }
+        pending: set[asyncio.Task[BleakClient]] = set(tasks)
+        winner: asyncio.Task[BleakClient] | None = None
+        error: BaseException | None = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if (err := task.exception()) is not None:
+                        error = err
+                    elif winner is None:
+                        winner = task
+        finally:
+            for task in pending:
+                task.cancel()
+        for task in tasks:
+            # close surplus connections that succeeded concurrently
+            if task is not winner and task.done() and not task.cancelled() and not task.exception():
+                await task.result().disconnect()
+        if winner is None:
+            assert error is not None
+            raise error
+        return winner.result(), tasks[winner]
+
     async def _connect(self) -> None:
         """Connect to the BMS ."""
 
+        self._connect_time = None
         if self._client.is_connected:
             self._log.debug("BMS already connected")
             return
 
         self._log.debug("connecting BMS")
-        self._client = await establish_connection(
-            client_class=BleakClient,
-            device=self._ble_device,
-            name=self._ble_device.address,
-            disconnected_callback=self._on_disconnect,
-        )
+        brc: Final[ModuleType] = await _async_import("bleak_retry_connector")
+        start: Final[float] = monotonic()
+        async with self._deadline("connect", BUDGET_CONNECT_SHARE, timeout=CONNECT_TIMEOUT):
+            if self._ble_device_alt is None:
+                self._client = await self._establish(brc, self._ble_device)
+            else:
+                self._client, self._ble_device = await self._establish_hedged(
+                    brc, [self._ble_device, self._ble_device_alt]
+                )
+        self._connect_time = monotonic() - start
 
         try:
+            await self._async_resolve_chars()
             await self._init_connection()
         except Exception as err:
             self._log.info(
@@ -182,8 +685,6 @@ class BaseBMS(ABC):
             await self.disconnect()
             raise
 
-
-
     async def disconnect(self, reset: bool = False) -> None:
         """Disconnect the BMS, includes stoping notifications."""
 
@@ -191,11 +692,30 @@ class BaseBMS(ABC):
             self._log.debug("disconnecting BMS")
             try:
                 self._data_event.clear()
-                if reset:
-                    self._inv_wr_mode = None  # reset write mode
+                self._associated = False
                 await self._client.disconnect()
             except BleakError:
                 self._log.warning("disconnect failed!")
+        if reset and self._write_modes:
+            self._write_modes = {}  # probe write modes again
+            await self._async_save_write_modes()
+
+    async def release(self, reset: bool = False) -> None:
+        """Disconnect the BMS once queued control writes, the running update or session completed."""
+        if self._ctrl_task is not None and not self._ctrl_task.done():
+            await asyncio.wait([self._ctrl_task])
+        async with self._exclusive():
+            await self.disconnect(reset)
+
+    @asynccontextmanager
+    async def _exclusive(self) -> AsyncIterator[None]:
+        """Hold the link for one task: an update, a session or a control write."""
+        async with self._session_lock:
+            self._lock_owner = asyncio.current_task()
+            try:
+                yield
+            finally:
+                self._lock_owner = None
 
     async def _wait_event(self) -> None:
         """Wait for data event and clear it."""
@@ -206,56 +726,378 @@ class BaseBMS(ABC):
     async def _async_update(self) -> BMSsample:
         """Return a dictionary of BMS values (keys need to come from the SENSOR_TYPES list)."""
 
-    async def async_update(self) -> BMSsample:
+    @property
+    def budget(self) -> UpdateBudget | None:
+        """Return the deadline budget of the last update."""
+        return self._last_budget
+
+    async def async_update(
+        self, budget: float | None = None, status_only: bool = False
+    ) -> BMSsample:
         """Retrieve updated values from the BMS using method of the subclass.
 
         Args:
-            raw (bool): if true, the raw data from the BMS is returned without
-                any calculations or missing values added
+            budget (float): total seconds the update may take, optional reads
+                are dropped when running low
+            status_only (bool): skip optional reads, e.g. device information
 
         Returns:
             BMSsample: dictionary with BMS values
 
         """
-        await self._connect()
-
-        data: BMSsample = await self._async_update()
-
-        if self._reconnect:
-            # disconnect after data update to force reconnect next time (slow!)
-            await self.disconnect()
+        async with self._exclusive():
+            self._budget = (
+                UpdateBudget(budget, budget * BUDGET_OPTIONAL_RESERVE) if budget else None
+            )
+            self._status_only = status_only
+            try:
+                with self._tracer.span("update"):
+                    await self._connect()
+                    data: BMSsample = await self._pipeline.run(self._async_read_sample)
+            finally:
+                self._last_budget, self._budget = self._budget, None
+                self._status_only = False
+            self._pairing = data.get("pairing_state", False)
+            await self._async_check_firmware(data)
+
+            if self._reconnect:
+                # disconnect after data update to force reconnect next time (slow!)
+                await self.disconnect()
 
         return data
 
     @property
-    def client(self):
+    def client(self) -> BleakClient:
+        """Return the Bleak client of the current or last connection."""
         return self._client
 
+    def set_command_listener(
+        self, listener: Callable[[str, dict[str, int]], None] | None
+    ) -> None:
+        """Set the callback reporting results of commands deferred while offline."""
+        self._command_listener = listener
+
+    async def _async_defer_control(self, changes: dict[int, int]) -> None:
+        """Persist control changes to be applied on the next connection."""
+        pending: Final[dict[str, Any]] = dict(
+            (await self._async_load_store()).get("pending", {})
+        )
+        expires: Final[float] = time() + OFFLINE_COMMAND_TTL
+        for idx, value in changes.items():
+            pending[str(idx)] = {"value": value, "expires": expires}
+        self._log.debug("device offline, deferring control changes %s", changes)
+        self._commands["deferred"] += 1
+        await self._async_save_store(pending=pending)
+
+    async def _async_apply_deferred(self, data: BMSsample | None = None) -> None:
+        """Write control changes deferred while offline, drop expired ones."""
+        pending: Final[dict[str, Any]] = (await self._async_load_store()).get(
+            "pending", {}
+        )
+        if not pending:
+            return
+        now: Final[float] = time()
+        changes: Final[dict[int, int]] = {
+            int(idx): cmd["value"]
+            for idx, cmd in pending.items()
+            if cmd["expires"] > now
+        }
+        if expired := {
+            CTRL_FIELDS[int(idx)]: cmd["value"]
+            for idx, cmd in pending.items()
+            if cmd["expires"] <= now
+        }:
+            self._log.info("deferred control changes expired: %s", expired)
+            self._notify_command("expired", expired)
+        if changes:
+            try:
+                written: bool = await self._set_control(changes)
+            except (BleakError, TimeoutError, EOFError) as err:
+                self._log.warning("failed to apply deferred control changes: %s", err)
+                written = False
+            if not written:
+                # keep the changes with their expiry for the next connection
+                await self._async_save_store(
+                    pending={
+                        idx: cmd for idx, cmd in pending.items() if cmd["expires"] > now
+                    }
+                )
+                return
+            self._notify_command(
+                "applied", {CTRL_FIELDS[idx]: value for idx, value in changes.items()}
+            )
+            if data is not None:
+                _apply_control(data, changes)
+        await self._async_save_store(pending={})
+
+    @property
+    def commands(self) -> dict[str, int]:
+        """Return the number of control writes per result."""
+        return dict(self._commands)
+
+    def _notify_command(self, result: str, fields: dict[str, int]) -> None:
+        self._commands[result] += 1  # deferred commands applied or expired
+        if self._command_listener:
+            self._command_listener(result, fields)
+
+    async def _set_control(self, changes: dict[int, int]) -> bool:
+        """Queue control register changes and wait until they are written.
+
+        Changes arriving within the coalescing window are merged into a
+        single read-modify-write, later values of a field win. While the
+        device is disconnected, changes are deferred to the next connection.
+
+        Returns:
+            bool: True if written, False if deferred
 
-    def set_underload_state(self,data: BMSsample):
+        """
+        if not self._client.is_connected:
+            await self._async_defer_control(changes)
+            return False
+
+        if self._lock_owner is asyncio.current_task():
+            # caller holds the link (update or session), the writer would wait for it
+            await asyncio.sleep(max(0.0, self._ctrl_last_write + CONTROL_MIN_SPACING - monotonic()))
+            try:
+                await self._write_control(changes)
+            except Exception:
+                self._commands["failed"] += 1
+                raise
+            finally:
+                self._ctrl_last_write = monotonic()
+            self._commands["written"] += 1
+            return True
+
+        if (
+            not self._ctrl_batches
+            or not CTRL_TRIGGERS.isdisjoint(self._ctrl_batches[-1][0].keys() & changes.keys())
+        ):
+            self._ctrl_batches.append(({}, []))
+        fields, waiters = self._ctrl_batches[-1]
+        fields.update(changes)
+        waiter: Final[asyncio.Future[bool]] = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        if self._ctrl_task is None or self._ctrl_task.done():
+            self._ctrl_task = asyncio.create_task(self._control_writer())
+        return await waiter
+
+    async def _write_control(self, fields: dict[int, int]) -> None:
+        """Read-modify-write the control register, verify the fields that were set.
+
+        Commands do not spend the budget of an update, each operation is
+        bound by the GATT timeout.
+        """
+        budget: Final[UpdateBudget | None] = self._budget
+        self._budget = None
+        try:
+            control: Final[bytearray] = await self._read(self.CONTROL_UUID)
+            for idx, value in fields.items():
+                control[idx] = value
+            self._tracer.event("write_control", control=control)
+            # triggers are reset by the device and must fire once: frames with a
+            # trigger are not probed, a failed probe would write them again
+            expected: Final[bytes] = bytes(control)
+            verify: Final[Callable[[bytes], bool] | None] = (
+                (
+                    lambda value: all(
+                        len(value) > idx and value[idx] == expected[idx] for idx in fields
+                    )
+                )
+                if CTRL_TRIGGERS.isdisjoint(fields)
+                else None
+            )
+            await self._write(self.CONTROL_UUID, control, verify=verify)
+        finally:
+            self._budget = budget
+
+    async def _control_writer(self) -> None:
+        """Write queued control changes, respecting the minimum write spacing.
+
+        Each batch holds the link like an update, so writes never interleave
+        with a poll or a release. Waiters always get a result: True if
+        written, False if deferred because the link was lost meanwhile, or
+        the error of the write.
+        """
+        try:
+            while self._ctrl_batches:
+                await asyncio.sleep(
+                    max(
+                        CONTROL_COALESCE_WINDOW,
+                        self._ctrl_last_write + CONTROL_MIN_SPACING - monotonic(),
+                    )
+                )
+                async with self._exclusive():
+                    fields, waiters = self._ctrl_batches.pop(0)
+                    try:
+                        written: bool = self._client.is_connected
+                        if written:
+                            await self._write_control(fields)
+                        else:
+                            await self._async_defer_control(fields)
+                    except asyncio.CancelledError:
+                        for waiter in waiters:
+                            waiter.cancel()
+                        raise
+                    except Exception as err:  # noqa: BLE001 - passed to the waiters
+                        self._commands["failed"] += 1
+                        for waiter in waiters:
+                            if not waiter.done():
+                                waiter.set_exception(err)
+                    else:
+                        if written:
+                            self._commands["written"] += 1
+                        for waiter in waiters:
+                            if not waiter.done():
+                                waiter.set_result(written)
+                    finally:
+                        self._ctrl_last_write = monotonic()
+        except asyncio.CancelledError:
+            for _fields, waiters in self._ctrl_batches:
+                for waiter in waiters:
+                    waiter.cancel()
+            self._ctrl_batches.clear()
+            raise
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Self]:
+        """Hold one connection and association for a batch of operations.
+
+        Usage: async with bms.session(): ...
+        """
+        async with self._exclusive():
+            await self._connect()
+            if not self._associated:
+                await self._associate_asic()
+            if not self._associated:
+                raise BleakError("association failed")
+            await self._async_apply_deferred()
+            try:
+                yield self
+            finally:
+                if self._reconnect:
+                    await self.disconnect()
+
+    async def set_control(
+        self,
+        filtration_mode: int | None = None,
+        filtration_state: str | None = None,
+        light: bool | None = None,
+        light_color_step: bool = False,
+    ) -> bool:
+        """Set any combination of control register fields with a single write.
+
+        Returns:
+            bool: True if written, False if deferred until the next connection
+
+        """
+        changes: Final[dict[int, int]] = {}
+        if filtration_mode is not None:
+            changes[CTRL_FILTRATION_MODE] = filtration_mode
+        if filtration_state is not None:
+            changes[CTRL_FILTRATION_STATE] = _filtration_state(filtration_state)
+        if light is not None:
+            changes[CTRL_LIGHT] = int(light)
+        if light_color_step:
+            changes[CTRL_LIGHT_COLOR] = 1
+        return await self._set_control(changes) if changes else True
+
+    async def turn_on_off_light(self, light_state: bool = False) -> None:
+        """Switch the light on or off."""
+        await self._set_control({CTRL_LIGHT: int(light_state)})
+
+    async def change_light_color(self) -> None:
+        """Step the light to the next color."""
+        await self._set_control({CTRL_LIGHT_COLOR: 1})
+
+    async def set_filtration_mode_state(self, option: str) -> None:
+        """Set filtration state (OFF, ON or AUTO)."""
+        await self._set_control({CTRL_FILTRATION_STATE: _filtration_state(option)})
+
+    async def set_filtration_mode(self, option: int) -> None:
+        """Set the filtration program by index."""
+        await self._set_control({CTRL_FILTRATION_MODE: option})
+
+
+    @property
+    def pipeline(self) -> SamplePipeline:
+        """Return the processing pipeline of the samples of this BMS."""
+        return self._pipeline
+
+    def stream(self) -> AsyncIterator[BMSsample]:
+        """Return an iterator over all samples passing the pipeline."""
+        return self._pipeline.stream()
+
+    async def _async_read_sample(self) -> BMSsample:
+        """Read a sample with the plugin, stamp it with its number and read times."""
+        start: Final[float] = monotonic()
+        data: Final[BMSsample] = await self._async_update()
+        if data:
+            self._sequence += 1
+            data["sequence"] = self._sequence
+            data["read_start"] = start
+            data["read_end"] = monotonic()
+            data["timestamp"] = time()
+            if self._associated:
+                # before the stages, streams and history see the sample
+                await self._async_apply_deferred(data)
+        return data
+
+    def _validate(self, data: BMSsample, _previous: BMSsample) -> None:
+        """Drop decoded values outside of their physical range."""
+        for key, (low, high) in SAMPLE_LIMITS.items():
+            if key in data and not low <= data[key] <= high:  # type: ignore[literal-required]
+                self._log.debug("implausible %s: %s", key, data.pop(key))  # type: ignore[misc]
+
+    def _carry_device_info(self, data: BMSsample, previous: BMSsample) -> None:
+        """Keep device information of the previous sample if it was not read."""
+        for key in DEVICE_INFO_CHARS.keys() - data.keys():
+            if key in previous:
+                data[key] = previous[key]  # type: ignore[literal-required]
+
+    def _derive_energy(self, data: BMSsample, previous: BMSsample) -> None:
+        """Integrate the pump energy from its current between sample reads."""
+        if (energy := previous.get("pump_energy")) is None:
+            return  # not seeded with the last known value yet
+        if (last := previous.get("read_start")) is not None and "current" in data:
+            energy += data["current"] * PUMP_VOLTAGE * (data["read_start"] - last) / 3600  # [Wh]
+        data["pump_energy"] = energy
+
+    def _detect_underload(self, data: BMSsample, previous: BMSsample) -> None:
+        """Flag a filtration pump running below its current threshold for too long."""
+        if "current" not in data or data.get("pairing_state"):
+            return
         if self.is_pump_underload_protection_enabled:
             data["underload_protection_state"] = False
-            if data["filtration_state"] and data["current"] < self.underload_intensity_threshold:
-                if self.underload_seen_datetime is None:
-                    self.underload_seen_datetime = datetime.now()
-                elif abs(datetime.now() - self.underload_seen_datetime).total_seconds() > self.underload_period_s:
-                    self._log.error(f"alert")
+            if data.get("filtration_state") and data["current"] < self.underload_intensity_threshold:
+                if self._underload_since is None:
+                    self._underload_since = data["read_start"]
+                elif data["read_start"] - self._underload_since > self.underload_period_s:
+                    if not previous.get("underload_protection_state"):
+                        self._log.warning(
+                            "pump current %s A below %s A for more than %s s",
+                            data["current"],
+                            self.underload_intensity_threshold,
+                            self.underload_period_s,
+                        )
                     data["underload_protection_state"] = True
             else:
-                self.underload_seen_datetime = None
+                self._underload_since = None
         else:
-            self.underload_seen_datetime = None
+            self._underload_since = None
 
     async def _associate_asic(self) -> None:
+        """Associate with the controller, bounded by the update budget."""
+        async with self._deadline("associate", BUDGET_ASSOCIATE_SHARE):
+            await self._associate()
 
-        random_key = await self.client.read_gatt_char(self.CHARACTERISTIC_SYSTEM_RANDOMKEY_UUID)
-        self._log.debug(f"random key {random_key.hex()}")
+    async def _associate(self) -> None:
 
-        shared_key = await  self.client.read_gatt_char(self.CHARACTERISTIC_SYSTEM_SHAREDKEY_UUID)
-        self._log.debug(f"shared key {shared_key.hex()}")
+        # key material is redacted like in captures, the spans time the reads
+        random_key = await self._read(self.CHARACTERISTIC_SYSTEM_RANDOMKEY_UUID, redact=True)
+        shared_key = await self._read(self.CHARACTERISTIC_SYSTEM_SHAREDKEY_UUID, redact=True)
         if all(b == 0 for b in shared_key):
             self._log.debug("asic not in pairing mode")
-            saved_data = await self._store.async_load()
+            saved_data = await self._async_load_store()
             if saved_data:
                 decoded_data = saved_data.get("last_data")
                 if decoded_data:
@@ -272,9 +1114,7 @@ class BaseBMS(ABC):
                 self._log.error("No saved data found in storage. Abort.")
                 return
 
-        decoded_shared_key = shared_key.hex()
-        self._log.debug(f"save shared key to store {decoded_shared_key}")
-        await self._store.async_save({"last_data": decoded_shared_key})
+        await self._async_save_store(last_data=shared_key.hex())
 
         secret = bytearray([
             0x11, 0x41, 0xa8, 0x05,
@@ -286,13 +1126,15 @@ class BaseBMS(ABC):
         shared_key.reverse()
         random_key.reverse()
 
-        cipher = AES.new(secret, AES.MODE_ECB)
+        aes: Final[ModuleType] = await _async_import("Crypto.Cipher.AES")
+        cipher = aes.new(secret, aes.MODE_ECB)
         encrypt_key = cipher.encrypt(shared_key + random_key)
         self.encrypt_key_barray = bytearray(encrypt_key)
         self.encrypt_key_barray.reverse()
 
-        self._log.debug(f"encrypt key {self.encrypt_key_barray.hex()}")
-
-        await  self.client.write_gatt_char(self.CHARACTERISTIC_SYSTEM_ENCRYPTKEY_UUID, self.encrypt_key_barray, True)
+        await self._write(
+            self.CHARACTERISTIC_SYSTEM_ENCRYPTKEY_UUID, self.encrypt_key_barray, True, redact=True
+        )
+        self._associated = True
 
 
@@ -0,0 +1,35 @@
+"""Deadline budget for a BMS update cycle."""
+
+from time import monotonic
+from typing import Final
+
+
+class UpdateBudget:
+    """Total time budget of one update cycle, shared by all its operations."""
+
+    def __init__(self, total: float, reserve: float) -> None:
+        """Start the budget.
+
+        Args:
+            total (float): seconds available for the whole cycle
+            reserve (float): optional operations are skipped below this remainder
+
+        """
+        self._total: Final[float] = total
+        self._reserve: Final[float] = reserve
+        self._deadline: Final[float] = monotonic() + total
+        self.skipped: Final[list[str]] = []  # optional operations not attempted
+        self.overruns: Final[list[str]] = []  # operations aborted by the deadline
+
+    @property
+    def total(self) -> float:
+        """Return the total budget in seconds."""
+        return self._total
+
+    def remaining(self, share: float = 1.0) -> float:
+        """Return a share of the remaining time (at least a minimal slice)."""
+        return max(0.01, (self._deadline - monotonic()) * share)
+
+    def allows_optional(self) -> bool:
+        """Return True if enough time is left for optional operations."""
+        return self._deadline - monotonic() > self._reserve
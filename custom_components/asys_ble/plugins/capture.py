@@ -0,0 +1,195 @@
+"""Raw GATT frame capture and replay for BMS plugins."""
+
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from enum import IntEnum
+import struct
+from time import monotonic, time
+from typing import Any, Final, NamedTuple
+from uuid import UUID
+
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+
+CAPTURE_MAGIC: Final[bytes] = b"ASYSCAP"
+CAPTURE_VERSION: Final[int] = 1
+CAPTURE_MAXLEN: Final[int] = 512  # [#] frames kept in memory per device
+
+_HEADER: Final[struct.Struct] = struct.Struct("<7sBdB")  # magic, version, t0, #UUIDs
+_FRAME: Final[struct.Struct] = struct.Struct("<IBBH")  # dt [ms], kind, UUID index, len
+
+
+class FrameKind(IntEnum):
+    """Direction of a captured GATT frame."""
+
+    READ = 0
+    WRITE = 1
+    NOTIFY = 2
+
+
+class Frame(NamedTuple):
+    """Single captured GATT frame."""
+
+    timestamp: float  # [s] wall clock
+    kind: FrameKind
+    char: str  # characteristic UUID (lower case)
+    data: bytes
+
+
+class FrameCapture:
+    """Bounded ring buffer of raw GATT frames."""
+
+    def __init__(self, maxlen: int = CAPTURE_MAXLEN) -> None:
+        """Initialize an empty capture buffer."""
+        self._frames: Final[deque[Frame]] = deque(maxlen=maxlen)
+        # wall clock is only sampled once, frames use the monotonic clock
+        self._t0: Final[float] = time() - monotonic()
+
+    def record(self, kind: FrameKind, char: str, data: bytes | bytearray) -> None:
+        """Append a frame to the buffer, dropping the oldest one if full."""
+        self._frames.append(
+            Frame(self._t0 + monotonic(), kind, char.lower(), bytes(data))
+        )
+
+    def clear(self) -> None:
+        """Remove all frames."""
+        self._frames.clear()
+
+    def dump(self) -> bytes:
+        """Return the buffer content in capture file format."""
+        return dumps(self._frames)
+
+    def __iter__(self) -> Iterator[Frame]:
+        """Iterate over frames, oldest first."""
+        return iter(self._frames)
+
+    def __len__(self) -> int:
+        """Return number of buffered frames."""
+        return len(self._frames)
+
+
+def dumps(frames: Iterable[Frame]) -> bytes:
+    """Serialize frames into the compact capture file format.
+
+    Layout: header, table of 128-bit characteristic UUIDs, then per frame
+    a fixed 8 byte record (time offset, kind, UUID index, length) + payload.
+    """
+    frames = list(frames)
+    t0: Final[float] = frames[0].timestamp if frames else 0.0
+    uuids: Final[dict[str, int]] = {}
+    for frame in frames:
+        uuids.setdefault(frame.char, len(uuids))
+    if len(uuids) > 0xFF:
+        raise ValueError("too many characteristics in capture")
+
+    out = bytearray(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, t0, len(uuids)))
+    for char in uuids:
+        out += UUID(char).bytes
+    for frame in frames:
+        out += _FRAME.pack(
+            round((frame.timestamp - t0) * 1000),
+            frame.kind,
+            uuids[frame.char],
+            len(frame.data),
+        )
+        out += frame.data
+    return bytes(out)
+
+
+def loads(raw: bytes) -> list[Frame]:
+    """Deserialize a capture file into a list of frames."""
+    magic, version, t0, uuid_cnt = _HEADER.unpack_from(raw)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        raise ValueError("not a supported capture file")
+
+    pos: int = _HEADER.size
+    uuids: Final[list[str]] = []
+    for _ in range(uuid_cnt):
+        uuids.append(str(UUID(bytes=raw[pos : pos + 16])))
+        pos += 16
+
+    frames: Final[list[Frame]] = []
+    while pos < len(raw):
+        dt_ms, kind, idx, length = _FRAME.unpack_from(raw, pos)
+        pos += _FRAME.size
+        frames.append(
+            Frame(t0 + dt_ms / 1000, FrameKind(kind), uuids[idx], raw[pos : pos + length])
+        )
+        pos += length
+    return frames
+
+
+class ReplayClient:
+    """Minimal stand-in for a BleakClient that serves reads from a capture."""
+
+    def __init__(self, frames: Iterable[Frame]) -> None:
+        """Queue captured reads per characteristic."""
+        self._reads: Final[dict[str, deque[bytes]]] = defaultdict(deque)
+        self.writes: Final[list[tuple[str, bytes]]] = []
+        for frame in frames:
+            if frame.kind == FrameKind.READ:
+                self._reads[frame.char].append(frame.data)
+
+    @property
+    def is_connected(self) -> bool:
+        """Replay client is always connected."""
+        return True
+
+    def pending(self, char: str) -> int:
+        """Return number of remaining reads for a characteristic."""
+        return len(self._reads.get(char.lower(), ()))
+
+    async def read_gatt_char(self, char: Any, **_kwargs: Any) -> bytearray:
+        """Return the next captured value of a characteristic."""
+        uuid: Final[str] = str(getattr(char, "uuid", char)).lower()
+        if uuid not in self._reads:
+            # never captured, behave like a characteristic the device lacks
+            raise BleakError(f"characteristic {uuid} not in capture")
+        if not self._reads[uuid]:
+            raise EOFError(f"capture exhausted for {uuid}")
+        return bytearray(self._reads[uuid].popleft())
+
+    async def write_gatt_char(
+        self, char: Any, data: bytes | bytearray, *_args: Any, **_kwargs: Any
+    ) -> None:
+        """Record writes, the capture is not modified."""
+        self.writes.append((str(getattr(char, "uuid", char)).lower(), bytes(data)))
+
+    async def disconnect(self) -> bool:
+        """Nothing to disconnect."""
+        return True
+
+
+class _ReplayStore:
+    """In-memory replacement of the persistent store used by a BMS."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, Any] | None = None
+
+    async def async_load(self) -> dict[str, Any] | None:
+        return self._data
+
+    async def async_save(self, data: dict[str, Any]) -> None:
+        self._data = data
+
+    def async_delay_save(self, data_func: Any, _delay: float = 0) -> None:
+        self._data = data_func()
+
+
+async def replay(bms_class: Any, frames: Iterable[Frame]) -> list[Any]:
+    """Feed a capture through the decoder of a BMS class at full speed.
+
+    Returns the list of decoded samples, one per complete update cycle.
+    """
+    client: Final[ReplayClient] = ReplayClient(frames)
+    bms = bms_class(
+        BLEDevice("00:00:00:00:00:00", "replay", None, -127), _ReplayStore()
+    )
+    bms._client = client  # noqa: SLF001  # pylint: disable=protected-access
+    samples: Final[list[Any]] = []
+    while client.pending(bms_class.STATUS_UUID):
+        try:
+            samples.append(await bms._async_update())  # noqa: SLF001  # pylint: disable=protected-access
+        except EOFError:
+            break
+    return samples
@@ -0,0 +1,132 @@
+"""Processing pipeline for the samples of a BMS."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from .basebms import BMSsample
+
+STREAM_QUEUE_SIZE: Final[int] = 8  # [#] samples buffered per stream consumer
+_REMOVED: Final = object()  # marks a value removed by a stage
+
+
+@dataclass(slots=True)
+class Stage:
+    """Single processing step, modifies the sample in place."""
+
+    name: str
+    fn: "Callable[[BMSsample, BMSsample], None] | None"  # (sample, previous sample)
+    inputs: frozenset[str] | None = None  # skip while unchanged, None: always run
+    runs: int = 0
+    skips: int = 0
+    duration: float = 0.0  # [s] of the last run
+    key: tuple[Any, ...] | None = field(default=None, repr=False)
+    outputs: dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+class SamplePipeline:
+    """Pass each decoded sample through registered stages and publish the result."""
+
+    def __init__(self) -> None:
+        """Initialize an empty pipeline."""
+        self._decode: Final[Stage] = Stage("decode", None)
+        self._stages: Final[list[Stage]] = []
+        self._previous: BMSsample = {}
+        self._streams: Final[set[asyncio.Queue[BMSsample]]] = set()
+
+    def register(
+        self,
+        name: str,
+        fn: "Callable[[BMSsample, BMSsample], None]",
+        inputs: Iterable[str] | None = None,
+    ) -> None:
+        """Append a stage, a stage of the same name is replaced in place.
+
+        Args:
+            name (str): name of the stage, used for statistics
+            fn (Callable): called with the sample and the previous sample
+            inputs (Iterable[str] | None): sample keys the stage depends on, the
+                stage is skipped and its last outputs reapplied while they are
+                unchanged, None to always run the stage
+
+        """
+        stage: Final[Stage] = Stage(
+            name, fn, frozenset(inputs) if inputs is not None else None
+        )
+        for idx, registered in enumerate(self._stages):
+            if registered.name == name:
+                self._stages[idx] = stage
+                return
+        self._stages.append(stage)
+
+    def seed(self, values: "BMSsample") -> None:
+        """Provide values of a previous sample, e.g. restored after a restart."""
+        self._previous = self._previous | values
+
+    async def run(self, decode: "Callable[[], Awaitable[BMSsample]]") -> "BMSsample":
+        """Acquire a sample and pass it through all stages."""
+        start: Final[float] = perf_counter()
+        sample: Final[BMSsample] = await decode()
+        self._decode.duration = perf_counter() - start
+        self._decode.runs += 1
+        if not sample:
+            return sample
+        for stage in self._stages:
+            self._run_stage(stage, sample)
+        self._previous = sample
+        for queue in self._streams:
+            if queue.full():
+                queue.get_nowait()  # drop the oldest sample for slow consumers
+            queue.put_nowait(sample)
+        return sample
+
+    def _run_stage(self, stage: Stage, sample: "BMSsample") -> None:
+        """Run a stage or reapply its outputs if its inputs did not change."""
+        assert stage.fn is not None
+        key: tuple[Any, ...] | None = None
+        if stage.inputs is not None:
+            key = tuple(sample.get(name) for name in sorted(stage.inputs))
+            if key == stage.key:
+                stage.skips += 1
+                for name, value in stage.outputs.items():
+                    if value is _REMOVED:
+                        sample.pop(name, None)  # type: ignore[misc]
+                    else:
+                        sample[name] = value  # type: ignore[literal-required]
+                return
+        before: Final[dict[str, Any]] = dict(sample) if key is not None else {}
+        start: Final[float] = perf_counter()
+        stage.fn(sample, self._previous)
+        stage.duration = perf_counter() - start
+        stage.runs += 1
+        if key is not None:
+            stage.key = key
+            stage.outputs = {
+                name: sample.get(name, _REMOVED)
+                for name in before.keys() | sample.keys()
+                if before.get(name, _REMOVED) != sample.get(name, _REMOVED)
+            }
+
+    async def stream(self) -> "AsyncIterator[BMSsample]":
+        """Yield every processed sample, slow consumers skip the oldest ones."""
+        queue: Final[asyncio.Queue[BMSsample]] = asyncio.Queue(STREAM_QUEUE_SIZE)
+        self._streams.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._streams.discard(queue)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return statistics per stage for diagnostics."""
+        return {
+            stage.name: {
+                "runs": stage.runs,
+                "skips": stage.skips,
+                "duration_ms": round(stage.duration * 1000, 3),
+            }
+            for stage in (self._decode, *self._stages)
+        }
@@ -0,0 +1,77 @@
+"""Level-gated tracing of BMS operations."""
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+import logging
+from time import monotonic, time
+from typing import Any, Final
+
+_NO_SPAN: Final[AbstractContextManager[None]] = nullcontext()
+
+
+class Tracer:
+    """Record spans and events of a BMS, free unless debug logging or the buffer is on.
+
+    Callers pass raw values, they are only formatted when a span or event is
+    recorded, bytes as hex.
+    """
+
+    def __init__(self, logger: logging.Logger) -> None:
+        """Initialize the tracer, logging to the logger of the BMS."""
+        self._log: Final[logging.Logger] = logger
+        self._spans: deque[dict[str, Any]] | None = None
+
+    def set_buffer(self, size: int) -> None:
+        """Keep the last spans and events in memory, 0 disables the buffer."""
+        self._spans = deque(self._spans or (), maxlen=size) if size else None
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if spans and events are recorded."""
+        return self._spans is not None or self._log.isEnabledFor(logging.DEBUG)
+
+    def span(self, name: str, target: str = "") -> AbstractContextManager[None]:
+        """Return a context timing an operation, a shared no-op while disabled."""
+        if self._spans is None and not self._log.isEnabledFor(logging.DEBUG):
+            return _NO_SPAN
+        return self._span(name, target)
+
+    @contextmanager
+    def _span(self, name: str, target: str) -> Iterator[None]:
+        start: Final[float] = monotonic()
+        error: str = ""
+        try:
+            yield
+        except BaseException as err:
+            error = type(err).__name__
+            raise
+        finally:
+            duration: float = monotonic() - start
+            self._log.debug("span %s %s: %.1f ms %s", name, target, duration * 1000, error)
+            if self._spans is not None:
+                self._spans.append(
+                    {
+                        "span": name,
+                        "target": target,
+                        "time": round(time() - duration, 3),
+                        "duration_ms": round(duration * 1000, 2),
+                    }
+                    | ({"error": error} if error else {})
+                )
+
+    def event(self, name: str, **fields: Any) -> None:
+        """Record a point in time with its fields."""
+        if self._spans is None and not self._log.isEnabledFor(logging.DEBUG):
+            return
+        values: Final[dict[str, Any]] = {
+            key: value.hex() if isinstance(value, bytes | bytearray) else value
+            for key, value in fields.items()
+        }
+        self._log.debug("event %s %s", name, values)
+        if self._spans is not None:
+            self._spans.append({"event": name, "time": round(time(), 3)} | values)
+
+    def spans(self) -> list[dict[str, Any]]:
+        """Return the buffered spans and events, oldest first."""
+        return list(self._spans or ())
@@ -0,0 +1,95 @@
+"""Fleet-wide performance report of the BLE Battery Management System integration."""
+
+from collections import Counter
+from datetime import UTC, datetime
+from time import time
+from typing import Any, Final
+
+from homeassistant.config_entries import ConfigEntry
+
+from .const import FLEET_REPORT_WORST
+from .coordinator import BTBmsCoordinator
+from .histogram import LatencyHistogram
+
+
+def _device_report(entry: ConfigEntry, coord: BTBmsCoordinator) -> dict[str, Any]:
+    """Return the performance figures of a single device."""
+    return {
+        "title": entry.title,
+        "address": coord.name,
+        "link_quality": coord.link_quality,
+        "rssi": coord.rssi,
+        "breaker": coord.breaker.state,
+        "polls": coord.polls,
+        "failures": coord.failures,
+        "connect_time": coord.connect_time.as_dict(),
+        "read_time": coord.read_time.as_dict(),
+        "latency": coord.latency.as_dict(),
+        "scanner": coord.scanner,
+        "scanners": coord.scanners.as_dict(),
+        "commands": coord.bms.commands,
+        "state_writes_per_hour": round(coord.state_write_rate, 1),
+        "data_age": (
+            round(time() - coord.data["timestamp"], 1)
+            if coord.data and "timestamp" in coord.data
+            else None
+        ),
+    }
+
+
+def fleet_report(entries: list[ConfigEntry]) -> dict[str, Any]:
+    """Return a report over all loaded devices, with totals per scanner.
+
+    Per-device figures are those of the diagnostics, the fleet section merges
+    the latency histograms, counts failures and commands and ranks the
+    devices by link quality.
+    """
+    devices: Final[list[dict[str, Any]]] = []
+    connect_time: Final[LatencyHistogram] = LatencyHistogram()
+    read_time: Final[LatencyHistogram] = LatencyHistogram()
+    failures: Final[Counter[str]] = Counter()
+    commands: Final[Counter[str]] = Counter()
+    scanners: Final[dict[str, dict[str, Any]]] = {}
+    for entry in entries:
+        coord: BTBmsCoordinator = entry.runtime_data
+        devices.append(_device_report(entry, coord))
+        connect_time.merge(coord.connect_time)
+        read_time.merge(coord.read_time)
+        failures.update(coord.failures)
+        commands.update(coord.bms.commands)
+        for source, stats in coord.scanners.as_dict().items():
+            total = scanners.setdefault(
+                source, {"attempts": 0, "successes": 0, "devices": [], "assigned": []}
+            )
+            total["attempts"] += stats["attempts"]
+            total["successes"] += stats["successes"]
+            total["devices"].append(coord.name)
+            if coord.scanner == source:
+                total["assigned"].append(coord.name)
+    for total in scanners.values():
+        total["success_rate"] = (
+            round(total["successes"] / total["attempts"], 2) if total["attempts"] else None
+        )
+
+    return {
+        "generated": datetime.now(UTC).isoformat(),
+        "fleet": {
+            "devices": len(devices),
+            "polls": sum(device["polls"] for device in devices),
+            "failures": dict(failures),
+            "commands": dict(commands),
+            "connect_time": connect_time.as_dict(),
+            "read_time": read_time.as_dict(),
+            "state_writes_per_hour": round(
+                sum(device["state_writes_per_hour"] for device in devices), 1
+            ),
+            "worst_link_quality": [
+                device["address"]
+                for device in sorted(devices, key=lambda device: device["link_quality"])[
+                    :FLEET_REPORT_WORST
+                ]
+            ],
+        },
+        "scanners": scanners,
+        "devices": devices,
+    }
@@ -0,0 +1,68 @@
+"""Per-scanner connection statistics for the BLE Battery Management System integration."""
+
+from dataclasses import dataclass
+from typing import Any, Final
+
+from homeassistant.components.bluetooth import BluetoothScannerDevice
+
+from .const import SCANNER_EWMA_ALPHA, SCANNER_PRIOR_LATENCY
+
+
+@dataclass
+class ScannerStats:
+    """Connection statistics of a single scanner (adapter or proxy)."""
+
+    attempts: int = 0
+    successes: int = 0
+    latency: float = SCANNER_PRIOR_LATENCY  # [s] EWMA of successful connects
+
+    @property
+    def success_rate(self) -> float:
+        """Return success rate, smoothed towards 50% for few attempts."""
+        return (self.successes + 1) / (self.attempts + 2)
+
+    @property
+    def cost(self) -> float:
+        """Return expected time to obtain a connection via this scanner."""
+        return self.latency / self.success_rate
+
+
+class ScannerSelector:
+    """Learn which scanner connects a device fastest and most reliably."""
+
+    def __init__(self) -> None:
+        """Initialize without any statistics."""
+        self._stats: Final[dict[str, ScannerStats]] = {}
+
+    def record(self, source: str, success: bool, latency: float | None = None) -> None:
+        """Record the outcome of a connection attempt via a scanner."""
+        stats: Final[ScannerStats] = self._stats.setdefault(source, ScannerStats())
+        stats.attempts += 1
+        if success:
+            stats.successes += 1
+            if latency is not None:
+                stats.latency += SCANNER_EWMA_ALPHA * (latency - stats.latency)
+
+    def rank(
+        self, candidates: list[BluetoothScannerDevice]
+    ) -> list[BluetoothScannerDevice]:
+        """Return candidates ordered by expected connection cost, RSSI breaks ties."""
+        return sorted(
+            candidates,
+            key=lambda dev: (
+                self._stats.get(dev.scanner.source, ScannerStats()).cost,
+                -dev.advertisement.rssi,
+            ),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return statistics per scanner source for diagnostics."""
+        return {
+            source: {
+                "attempts": stats.attempts,
+                "successes": stats.successes,
+                "success_rate": round(stats.success_rate, 2),
+                "latency": round(stats.latency, 2),
+            }
+            for source, stats in self._stats.items()
+        }
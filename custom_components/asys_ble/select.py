@@ -1,5 +1,4 @@
 """Support for asys_BLE binary sensors."""
-import asyncio
 
 from homeassistant.components.select import (
     SelectEntity,
@@ -11,13 +10,10 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import BTBmsConfigEntry
 from .const import (
-    DOMAIN, LOGGER,
+    DOMAIN, LOGGER, OPTIONS_FILTRATION_MODE, OPTIONS_FILTRATION_STATE_MODE,
 )
 from .coordinator import BTBmsCoordinator
 
-OPTIONS_FILTRATION_STATE_MODE = ["OFF", "ON", "AUTO"]
-OPTIONS_FILTRATION_MODE =["Automatique (Loi d'eau)","Horloge 72h","Horloge Usine 1","Horloge Usine 2","Horloge Usine 3","Horloge Personnalisable Eté","Horloge Personnalisable Hivers"]
-
 
 
 class AsysSelectEntityDescription(SelectEntityDescription):
@@ -47,11 +43,12 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in Home Assistant."""
 
     bms: BTBmsCoordinator = config_entry.runtime_data
+    mac: str = format_mac(config_entry.unique_id)
     async_add_entities(
-        [AsysSelectFiltrationModeStateEntity(bms, filtrationStateModeEntityDescription, format_mac(config_entry.unique_id))]
-    )
-    async_add_entities(
-        [AsysSelectFiltrationModeEntity(bms, filtrationModeEntityDescription, format_mac(config_entry.unique_id))]
+        [
+            AsysSelectFiltrationModeStateEntity(bms, filtrationStateModeEntityDescription, mac),
+            AsysSelectFiltrationModeEntity(bms, filtrationModeEntityDescription, mac),
+        ]
     )
 
 
@@ -90,10 +87,9 @@ class AsysSelectFiltrationModeStateEntity(CoordinatorEntity[BTBmsCoordinator],
             self.coordinator.data["filtration_mode_state"] = 1
         else:
             self.coordinator.data["filtration_mode_state"] = 2
-        #update select state sleep 2second and finally update all ohers entities
+        # update select state and finally update all others entities once commands settled
         self.async_write_ha_state()
-        await asyncio.sleep(2)
-        await self.coordinator.async_request_refresh()
+        self.coordinator.async_schedule_command_refresh()
 
 
     @property
@@ -102,8 +98,6 @@ class AsysSelectFiltrationModeStateEntity(CoordinatorEntity[BTBmsCoordinator],
 
     @property
     def current_option(self) -> str | None:
-        LOGGER.debug(
-            f"filtration_mode_state current_option : : {self.coordinator.data.get("filtration_mode_state", 0)}")
         if self.coordinator.data.get("filtration_mode_state", 0) == 0:
             return "OFF"
         elif self.coordinator.data.get("filtration_mode_state", 0) == 1:
@@ -145,13 +139,11 @@ class AsysSelectFiltrationModeEntity(CoordinatorEntity[BTBmsCoordinator],
             index = OPTIONS_FILTRATION_MODE.index(option)
             await self.coordinator._device.set_filtration_mode(index)
             self.coordinator.data["filtration_mode"] = index
-            # update select state sleep 2second and finally update all ohers entities
+            # update select state and finally update all others entities once commands settled
             self.async_write_ha_state()
-            await asyncio.sleep(2)
-            await self.coordinator.async_request_refresh()
+            self.coordinator.async_schedule_command_refresh()
         except ValueError:
-            LOGGER.error(
-                f"filtration_mode unable to parse value")
+            LOGGER.error("filtration_mode unable to parse value %s", option)
 
 
 
@@ -161,6 +153,4 @@ class AsysSelectFiltrationModeEntity(CoordinatorEntity[BTBmsCoordinator],
 
     @property
     def current_option(self) -> str | None:
-        LOGGER.debug(
-            f"filtration_mode current_option : : {self.coordinator.data.get("filtration_mode", 0)}")
         return OPTIONS_FILTRATION_MODE[self.coordinator.data.get("filtration_mode", 0)]
@@ -2,22 +2,18 @@
 
 from collections.abc import Callable
 from datetime import datetime
-from typing import Final, cast
+from typing import Final
 
 from custom_components.asys_ble.plugins.basebms import  BMSsample
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription,RestoreEntity
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
-    ATTR_BATTERY_LEVEL,
     ATTR_TEMPERATURE,
-    ATTR_VOLTAGE,
     PERCENTAGE,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
     EntityCategory,
     UnitOfElectricCurrent,
-    UnitOfElectricPotential,
     UnitOfEnergy,
-    UnitOfPower,
     UnitOfTemperature,
     UnitOfTime,
 )
@@ -25,15 +21,13 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from . import BTBmsConfigEntry
 from .const import (
     ATTR_CURRENT,
-    ATTR_CYCLE_CAP,
     ATTR_CYCLES,
-    ATTR_DELTA_VOLTAGE,
     ATTR_LQ,
-    ATTR_POWER,
     ATTR_RSSI,
     ATTR_RUNTIME,
     DOMAIN,
@@ -47,8 +41,8 @@ PARALLEL_UPDATES = 0
 class BmsEntityDescription(SensorEntityDescription, frozen_or_thawed=True):
     """Describes BMS sensor entity."""
 
-    value_fn: Callable[[BMSsample], float | int | None]
-    attr_fn: Callable[[BMSsample], dict[str, list[int | float]]] | None = None
+    value_fn: Callable[[BMSsample], float | int | datetime | None]
+    attr_fn: Callable[[BMSsample], dict[str, list[int | float] | int]] | None = None
 
 
 
@@ -113,7 +107,9 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
         native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
-        value_fn=lambda data: None,
+        value_fn=lambda data: (
+            round(data["pump_energy"], 2) if "pump_energy" in data else None
+        ),
     ),
     BmsEntityDescription(
         key=ATTR_CYCLES,
@@ -132,6 +128,39 @@ SENSOR_TYPES: Final[list[BmsEntityDescription]] = [
         device_class=SensorDeviceClass.DURATION,
         value_fn=lambda data: data.get("runtime"),
     ),
+    BmsEntityDescription(
+        key="current_trend",
+        translation_key="current_trend",
+        name="tendance intensité pompe",
+        native_unit_of_measurement="mA/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        suggested_display_precision=2,
+        value_fn=lambda data: data.get("current_trend"),
+    ),
+    BmsEntityDescription(
+        key="pump_health",
+        translation_key="pump_health",
+        name="santé pompe",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.get("pump_health"),
+    ),
+    BmsEntityDescription(
+        key="sample_time",
+        translation_key="sample_time",
+        name="dernière mesure",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: (
+            dt_util.utc_from_timestamp(data["timestamp"]) if "timestamp" in data else None
+        ),
+        attr_fn=lambda data: (
+            {"sequence": data["sequence"]} if "sequence" in data else {}
+        ),
+    ),
     BmsEntityDescription(
         key=ATTR_RSSI,
         translation_key=ATTR_RSSI,
@@ -164,60 +193,17 @@ async def async_setup_entry(
 
     bms: Final[BTBmsCoordinator] = config_entry.runtime_data
     mac: Final[str] = format_mac(config_entry.unique_id)
+    entities: list[SensorEntity] = []
     for descr in SENSOR_TYPES:
         if descr.key == ATTR_RSSI:
-            async_add_entities([RSSISensor(bms, descr, mac)])
-            continue
-        if descr.key == ATTR_LQ:
-            async_add_entities([LQSensor(bms, descr, mac)])
-            continue
-        if descr.key == "pump_power":
-            async_add_entities([AsysEnergySensor(bms, descr, mac)])
-            continue
-        async_add_entities([BMSSensor(bms, descr, mac)])
-
-
-
-class AsysEnergySensor(RestoreEntity,SensorEntity):  # type: ignore[reportIncompatibleMethodOverride]
-
-    _attr_has_entity_name = True
-    entity_description: BmsEntityDescription
-
-    def __init__(
-        self, bms: BTBmsCoordinator, descr: BmsEntityDescription, unique_id: str
-    ) -> None:
-        """Intitialize the BMS sensor."""
-        self._attr_unique_id = f"{DOMAIN}-{unique_id}-{descr.key}-{descr.name}"
-        self._attr_device_info = bms.device_info
-        self.entity_description = descr  # type: ignore[reportIncompatibleVariableOverride]
-        self._last_update = None
-        self._bms: Final[BTBmsCoordinator] = bms
-        self._last_state = None
-        self._energy_wh = 0.0
-
-    async def async_added_to_hass(self):
-        self._last_state= await self.async_get_last_state()
-        try:
-            self._energy_wh = float(self._last_state.state)
-        except ValueError:
-            self._energy_wh = 0.0
-
-
-
-    async def async_update(self) -> None:
-
-        intensity = self._bms.data.get("current")
-        power_w = intensity * 230
-        now_time = datetime.now()
-        if self._last_update is not None:
-            delta = (now_time - self._last_update).total_seconds() / 3600  # en heures
-            energy_added = power_w * delta  # P * t = Wh
-            self._energy_wh += energy_added
-        self._last_update = now_time
-        self._attr_native_value = round(self._energy_wh, 2)
-        self._attr_available = True
-        self.async_write_ha_state()
-
+            entities.append(RSSISensor(bms, descr, mac))
+        elif descr.key == ATTR_LQ:
+            entities.append(LQSensor(bms, descr, mac))
+        elif descr.key == "pump_power":
+            entities.append(AsysEnergySensor(bms, descr, mac))
+        else:
+            entities.append(BMSSensor(bms, descr, mac))
+    async_add_entities(entities)
 
 
 
@@ -237,7 +223,7 @@ class BMSSensor(CoordinatorEntity[BTBmsCoordinator], SensorEntity):  # type: ign
         super().__init__(bms)
 
     @property
-    def extra_state_attributes(self) -> dict[str, list[int | float]] | None:  # type: ignore[reportIncompatibleVariableOverride]
+    def extra_state_attributes(self) -> dict[str, list[int | float] | int] | None:  # type: ignore[reportIncompatibleVariableOverride]
         """Return entity specific state attributes, e.g. cell voltages."""
         if self.entity_description.attr_fn:
             return self.entity_description.attr_fn(self.coordinator.data)
@@ -245,11 +231,39 @@ class BMSSensor(CoordinatorEntity[BTBmsCoordinator], SensorEntity):  # type: ign
         return None
 
     @property
-    def native_value(self) -> int | float | None:  # type: ignore[reportIncompatibleVariableOverride]
+    def assumed_state(self) -> bool:
+        """Return True while the value is restored from the previous run."""
+        return self.coordinator.restored
+
+    @property
+    def available(self) -> bool:
+        """Return True if the last update succeeded or the value is restored."""
+        return super().available or self.coordinator.restored
+
+    @property
+    def native_value(self) -> int | float | datetime | None:  # type: ignore[reportIncompatibleVariableOverride]
         """Return the sensor value."""
         return self.entity_description.value_fn(self.coordinator.data)
 
 
+class AsysEnergySensor(BMSSensor, RestoreEntity):  # type: ignore[reportIncompatibleMethodOverride]
+    """Pump energy, integrated by the sample pipeline of the BMS."""
+
+    async def async_added_to_hass(self) -> None:
+        """Seed the energy integration with the last known value."""
+        await super().async_added_to_hass()
+        energy: float = 0.0
+        if last_state := await self.async_get_last_state():
+            try:
+                energy = float(last_state.state)
+            except ValueError:
+                pass
+        # the persisted sample may lag behind, the total must never decrease
+        known: Final[float | None] = (self.coordinator.data or {}).get("pump_energy")
+        if known is None or energy > known:
+            self.coordinator.bms.pipeline.seed({"pump_energy": energy})
+
+
 class RSSISensor(SensorEntity):
     """The Bluetooth RSSI sensor."""
 
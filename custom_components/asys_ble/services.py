@@ -0,0 +1,253 @@
+"""Services of the BLE Battery Management System integration."""
+
+from pathlib import Path
+from typing import Any, Final
+
+import voluptuous as vol
+
+from bleak.exc import BleakError
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.json import save_json
+
+from .const import (
+    ATTR_DURATION,
+    ATTR_FILE,
+    ATTR_FILTRATION_MODE,
+    ATTR_FILTRATION_STATE,
+    ATTR_FORMAT,
+    ATTR_LIGHT,
+    ATTR_LIGHT_COLOR_STEP,
+    ATTR_MAX_AGE,
+    ATTR_TIER,
+    DEFAULT_RELEASE_DURATION,
+    DOMAIN,
+    LOGGER,
+    OPTIONS_FILTRATION_MODE,
+    OPTIONS_FILTRATION_STATE_MODE,
+    SERVICE_EXPORT_HISTORY,
+    SERVICE_FLEET_REPORT,
+    SERVICE_REFRESH,
+    SERVICE_RELEASE_CONNECTION,
+    SERVICE_SET_CONTROL,
+    TIER_FULL,
+    TIER_STATUS,
+)
+from .coordinator import BTBmsCoordinator
+from .report import fleet_report
+
+SET_CONTROL_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_FILTRATION_MODE): vol.In(OPTIONS_FILTRATION_MODE),
+        vol.Optional(ATTR_FILTRATION_STATE): vol.In(OPTIONS_FILTRATION_STATE_MODE),
+        vol.Optional(ATTR_LIGHT): cv.boolean,
+        vol.Optional(ATTR_LIGHT_COLOR_STEP, default=False): cv.boolean,
+    }
+)
+
+RELEASE_CONNECTION_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_DURATION, default=DEFAULT_RELEASE_DURATION): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=240)
+        ),
+    }
+)
+
+EXPORT_HISTORY_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_FORMAT, default="csv"): vol.In(["csv", "npy"]),
+    }
+)
+
+REFRESH_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_MAX_AGE, default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_TIER, default=TIER_STATUS): vol.In([TIER_STATUS, TIER_FULL]),
+    }
+)
+
+FLEET_REPORT_SCHEMA: Final = vol.Schema(
+    {
+        vol.Optional(ATTR_FILE, default=False): cv.boolean,
+    }
+)
+
+
+def _coordinator(hass: HomeAssistant, device_id: str) -> BTBmsCoordinator:
+    """Return the coordinator of a device, raise if it is not loaded."""
+    if device := dr.async_get(hass).async_get(device_id):
+        for entry_id in device.config_entries:
+            entry = hass.config_entries.async_get_entry(entry_id)
+            if (
+                entry
+                and entry.domain == DOMAIN
+                and entry.state == ConfigEntryState.LOADED
+            ):
+                return entry.runtime_data
+    raise ServiceValidationError(
+        translation_domain=DOMAIN,
+        translation_key="device_not_loaded",
+        translation_placeholders={"device_id": device_id},
+    )
+
+
+async def _async_set_control(call: ServiceCall) -> None:
+    """Set multiple control register fields with a single write."""
+    coordinator: Final[BTBmsCoordinator] = _coordinator(
+        call.hass, call.data[ATTR_DEVICE_ID]
+    )
+    filtration_mode: Final[int | None] = (
+        OPTIONS_FILTRATION_MODE.index(call.data[ATTR_FILTRATION_MODE])
+        if ATTR_FILTRATION_MODE in call.data
+        else None
+    )
+    control: Final[dict[str, Any]] = {
+        "filtration_mode": filtration_mode,
+        "filtration_state": call.data.get(ATTR_FILTRATION_STATE),
+        "light": call.data.get(ATTR_LIGHT),
+        "light_color_step": call.data[ATTR_LIGHT_COLOR_STEP],
+    }
+    LOGGER.debug("%s: set control %s", coordinator.name, call.data)
+    try:
+        async with coordinator.bms.session() as bms:
+            await bms.set_control(**control)
+    except (BleakError, TimeoutError, EOFError) as err:
+        if not coordinator.bms.is_connected:
+            # device unreachable, apply the command on the next connection
+            await coordinator.bms.set_control(**control)
+            return
+        raise HomeAssistantError(
+            translation_domain=DOMAIN,
+            translation_key="command_failed",
+            translation_placeholders={"error": f"{err!s} ({type(err).__name__})"},
+        ) from err
+
+    if filtration_mode is not None:
+        coordinator.data["filtration_mode"] = filtration_mode
+    if ATTR_FILTRATION_STATE in call.data:
+        coordinator.data["filtration_mode_state"] = OPTIONS_FILTRATION_STATE_MODE.index(
+            call.data[ATTR_FILTRATION_STATE]
+        )
+    if ATTR_LIGHT in call.data:
+        coordinator.data["light_state"] = call.data[ATTR_LIGHT]
+    coordinator.async_update_listeners()
+    coordinator.async_schedule_command_refresh()
+
+
+async def _async_refresh(call: ServiceCall) -> None:
+    """Refresh device data unless it is younger than max_age."""
+    coordinator: Final[BTBmsCoordinator] = _coordinator(
+        call.hass, call.data[ATTR_DEVICE_ID]
+    )
+    if not await coordinator.async_refresh_max_age(
+        call.data[ATTR_MAX_AGE], call.data[ATTR_TIER]
+    ):
+        raise HomeAssistantError(
+            translation_domain=DOMAIN,
+            translation_key="refresh_failed",
+            translation_placeholders={"error": str(coordinator.last_exception)},
+        )
+
+
+async def _async_release_connection(call: ServiceCall) -> None:
+    """Leave the device to other centrals (vendor app) for some minutes."""
+    await _coordinator(call.hass, call.data[ATTR_DEVICE_ID]).async_release(
+        call.data[ATTR_DURATION] * 60
+    )
+
+
+async def _async_export_history(call: ServiceCall) -> ServiceResponse:
+    """Export the sample history of a device to a file in the configuration folder."""
+    coordinator: Final[BTBmsCoordinator] = _coordinator(
+        call.hass, call.data[ATTR_DEVICE_ID]
+    )
+    if (history := coordinator.history) is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="history_disabled",
+            translation_placeholders={"device_id": call.data[ATTR_DEVICE_ID]},
+        )
+    path: Final[Path] = Path(
+        call.hass.config.path(
+            DOMAIN,
+            f"history_{coordinator.name.replace(':', '').lower()}.{call.data[ATTR_FORMAT]}",
+        )
+    )
+
+    def export() -> int:
+        path.parent.mkdir(exist_ok=True)
+        if call.data[ATTR_FORMAT] == "npy":
+            return history.export_npy(path)
+        return history.export_csv(path)
+
+    records: Final[int] = await call.hass.async_add_executor_job(export)
+    LOGGER.debug("%s: exported %i samples to %s", coordinator.name, records, path)
+    return {"path": str(path), "records": records}
+
+
+async def _async_fleet_report(call: ServiceCall) -> ServiceResponse:
+    """Report the performance of all loaded devices, optionally to a file."""
+    report: Final[dict[str, Any]] = fleet_report(
+        [
+            entry
+            for entry in call.hass.config_entries.async_entries(DOMAIN)
+            if entry.state == ConfigEntryState.LOADED
+        ]
+    )
+    if not call.data[ATTR_FILE]:
+        return report
+    path: Final[Path] = Path(call.hass.config.path(DOMAIN, "fleet_report.json"))
+
+    def write() -> None:
+        path.parent.mkdir(exist_ok=True)
+        save_json(str(path), report)
+
+    await call.hass.async_add_executor_job(write)
+    LOGGER.debug("fleet report of %i devices written to %s", len(report["devices"]), path)
+    return report | {"path": str(path)}
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_CONTROL, _async_set_control, schema=SET_CONTROL_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, _async_refresh, schema=REFRESH_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RELEASE_CONNECTION,
+        _async_release_connection,
+        schema=RELEASE_CONNECTION_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        _async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FLEET_REPORT,
+        _async_fleet_report,
+        schema=FLEET_REPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,100 @@
+"""Incremental pump trend estimators for the BLE Battery Management System integration."""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Final
+
+from .const import (
+    TREND_BASELINE_ALPHA,
+    TREND_MIN_SAMPLES,
+    TREND_RECENT_ALPHA,
+)
+from .plugins.basebms import BMSsample
+
+
+@dataclass
+class ModeTrend:
+    """Running pump current statistics for one filtration mode."""
+
+    count: int = 0  # [#] samples, one per operating hour
+    mean_x: float = 0.0  # [h] mean runtime
+    mean_y: float = 0.0  # [A] mean current
+    m2_x: float = 0.0  # sum of squared runtime deviations
+    c_xy: float = 0.0  # sum of runtime/current co-deviations
+    baseline: float = 0.0  # [A] slow EWMA of the current
+    recent: float = 0.0  # [A] fast EWMA of the current
+
+    def add(self, runtime: float, current: float) -> None:
+        """Add a sample, least squares are updated with Welford's method."""
+        self.count += 1
+        dx: Final[float] = runtime - self.mean_x
+        self.mean_x += dx / self.count
+        self.mean_y += (current - self.mean_y) / self.count
+        self.m2_x += dx * (runtime - self.mean_x)
+        self.c_xy += dx * (current - self.mean_y)
+        if self.count == 1:
+            self.baseline = self.recent = current
+        self.baseline += TREND_BASELINE_ALPHA * (current - self.baseline)
+        self.recent += TREND_RECENT_ALPHA * (current - self.recent)
+
+    @property
+    def slope(self) -> float | None:
+        """Return the drift of the current over runtime in A/h."""
+        if self.count < TREND_MIN_SAMPLES or not self.m2_x:
+            return None
+        return self.c_xy / self.m2_x
+
+    @property
+    def health(self) -> float | None:
+        """Return 100% while the recent current matches its long-term baseline."""
+        if self.count < TREND_MIN_SAMPLES or not self.baseline:
+            return None
+        return max(0.0, 100 * (1 - abs(self.recent - self.baseline) / self.baseline))
+
+
+class PumpTrends:
+    """Pump current trends per filtration mode, updated once per operating hour."""
+
+    def __init__(self) -> None:
+        """Initialize without any statistics."""
+        self._modes: Final[dict[str, ModeTrend]] = {}
+        self._runtime: int | None = None  # [h] runtime of the last added sample
+
+    def update(self, sample: BMSsample) -> bool:
+        """Add a sample of the running pump, return True if statistics changed."""
+        if (
+            not sample.get("filtration_state")
+            or not sample.get("current")
+            or (runtime := sample.get("runtime")) is None
+            or runtime == self._runtime
+        ):
+            return False
+        self._runtime = runtime
+        self._modes.setdefault(
+            str(sample.get("filtration_mode", 0)), ModeTrend()
+        ).add(runtime, sample["current"])
+        return True
+
+    def values(self, mode: int | None) -> BMSsample:
+        """Return trend values of a filtration mode as sample fields."""
+        values: BMSsample = {}
+        if (trend := self._modes.get(str(mode))) is None:
+            return values
+        if (slope := trend.slope) is not None:
+            values["current_trend"] = slope * 1000  # [mA/h]
+        if (health := trend.health) is not None:
+            values["pump_health"] = health
+        return values
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state to persist."""
+        return {
+            "runtime": self._runtime,
+            "modes": {mode: asdict(trend) for mode, trend in self._modes.items()},
+        }
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Restore a persisted state."""
+        self._runtime = data.get("runtime")
+        self._modes.clear()
+        for mode, trend in data.get("modes", {}).items():
+            self._modes[mode] = ModeTrend(**trend)
@@ -0,0 +1,231 @@
+"""Backtest underload-protection settings on recorded samples.
+
+Usage: python scripts/backtest_underload.py <history.csv|history.npy|recorder.csv> [options]
+
+Replays the underload detection of the BMS sample pipeline over a grid of
+current thresholds and periods, vectorized with NumPy. Input is a history
+export of the asys_ble.export_history service (CSV or NumPy) or a CSV
+download of the Home Assistant history holding the pump current and the
+filtration entities, which is resampled to the poll interval.
+
+An alert is a false positive if the current recovers within --confirm
+seconds after it dropped, a confirmed underload without alert is missed.
+Requires numpy, but not Home Assistant.
+"""
+
+import argparse
+from collections.abc import Callable
+import csv
+from datetime import datetime
+from pathlib import Path
+import sys
+from time import perf_counter
+from typing import Final
+import warnings
+
+import numpy as np
+
+# state flag bits of history records, see FLAGS in custom_components/asys_ble/history.py
+FILTRATION_BIT: Final[int] = 1 << 0
+PAIRING_BIT: Final[int] = 1 << 6
+NO_CURRENT: Final[int] = 0xFFFF
+
+
+def _moving_mean(current: np.ndarray, window: int) -> np.ndarray:
+    """Return the mean of the last window samples (fewer at the start)."""
+    acc: Final[np.ndarray] = np.cumsum(np.insert(current, 0, 0.0))
+    mean: Final[np.ndarray] = np.empty_like(current)
+    mean[window - 1 :] = (acc[window:] - acc[:-window]) / window
+    mean[: window - 1] = acc[1:window] / np.arange(1, min(window, len(current) + 1))
+    return mean
+
+
+# detector name -> signal compared against the threshold
+DETECTORS: Final[dict[str, Callable[[np.ndarray], np.ndarray]]] = {
+    "exact": lambda current: current,  # logic of BaseBMS._detect_underload
+    "mean5": lambda current: _moving_mean(current, 5),  # ignores short dips
+}
+
+
+def _hold(times: np.ndarray, values: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """Return the last value at or before each time (NaN before the first)."""
+    idx: Final[np.ndarray] = np.searchsorted(times, at, side="right") - 1
+    return np.where(idx >= 0, values[np.maximum(idx, 0)], np.nan)
+
+
+def _guess(
+    entities: set[str], domain: str, words: tuple[str, ...], exclude: tuple[str, ...] = ()
+) -> str:
+    for entity in sorted(entities):
+        if (
+            entity.startswith(domain)
+            and any(word in entity for word in words)
+            and not any(word in entity for word in exclude)
+        ):
+            return entity
+    raise SystemExit(f"no {domain} entity matching {words}, use the entity options")
+
+
+def _load_recorder(
+    rows: list[dict[str, str]], args: argparse.Namespace
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    entities: Final[set[str]] = {row["entity_id"] for row in rows}
+    current_entity: Final[str] = args.current_entity or _guess(
+        entities, "sensor.", ("current", "intensit")
+    )
+    filtration_entity: Final[str] = args.filtration_entity or _guess(
+        entities, "binary_sensor.", ("filtration",), ("gel", "24")
+    )
+
+    def series(entity: str, parse: Callable[[str], float]) -> tuple[np.ndarray, np.ndarray]:
+        points = sorted(
+            (
+                datetime.fromisoformat(row["last_changed"].replace("Z", "+00:00")).timestamp(),
+                parse(row["state"]),
+            )
+            for row in rows
+            if row["entity_id"] == entity
+        )
+        return np.array([p[0] for p in points]), np.array([p[1] for p in points])
+
+    def number(state: str) -> float:
+        try:
+            return float(state)
+        except ValueError:
+            return np.nan
+
+    cur_t, cur_v = series(current_entity, number)
+    filt_t, filt_v = series(filtration_entity, {"on": 1.0, "off": 0.0}.get)  # type: ignore[arg-type]
+    filt_v = np.array([np.nan if value is None else value for value in filt_v], dtype=float)
+    times: Final[np.ndarray] = np.arange(
+        max(cur_t[0], filt_t[0]), max(cur_t[-1], filt_t[-1]), args.interval
+    )
+    current: Final[np.ndarray] = _hold(cur_t, cur_v, times)
+    filtration: Final[np.ndarray] = _hold(filt_t, filt_v, times)
+    valid: Final[np.ndarray] = ~np.isnan(current) & ~np.isnan(filtration)
+    print(f"{current_entity}, {filtration_entity}", file=sys.stderr)
+    return times[valid], filtration[valid] == 1, current[valid]
+
+
+def load(
+    path: Path, args: argparse.Namespace
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return sample times, filtration states and currents of polls with data."""
+    if path.suffix == ".npy":
+        rec = np.load(path)
+        current = np.where(rec["current"] == NO_CURRENT, np.nan, rec["current"] / 10)
+        valid = (rec["flags"] & PAIRING_BIT == 0) & ~np.isnan(current)
+        return rec["time"][valid], (rec["flags"][valid] & FILTRATION_BIT) > 0, current[valid]
+
+    with path.open(newline="", encoding="utf-8") as file:
+        rows: Final[list[dict[str, str]]] = list(csv.DictReader(file))
+    if not rows:
+        raise SystemExit("no samples")
+    if "entity_id" in rows[0]:
+        return _load_recorder(rows, args)
+    polls: Final[list[dict[str, str]]] = [
+        row for row in rows if row["current"] and row["pairing_state"] != "True"
+    ]
+    return (
+        np.array([float(row["time"]) for row in polls]),
+        np.array([row["filtration_state"] == "True" for row in polls]),
+        np.array([float(row["current"]) for row in polls]),
+    )
+
+
+def backtest(
+    times: np.ndarray,
+    low: np.ndarray,
+    periods: np.ndarray,
+    confirm: float,
+) -> dict[str, np.ndarray]:
+    """Evaluate all periods for the low-current mask of one threshold.
+
+    An alert is raised at the first poll of a low-current run that is more
+    than the period after the first poll of the run, as the pipeline does.
+    """
+    edges: Final[np.ndarray] = np.diff(np.concatenate(([0], low.astype(np.int8), [0])))
+    starts: Final[np.ndarray] = np.flatnonzero(edges == 1)
+    ends: Final[np.ndarray] = np.flatnonzero(edges == -1) - 1  # last low poll
+    # the run lasts until the next poll, if any
+    recovered: Final[np.ndarray] = times[np.minimum(ends + 1, len(times) - 1)]
+    confirmed: Final[np.ndarray] = (recovered - times[starts] >= confirm)[:, None]
+
+    first: Final[np.ndarray] = np.searchsorted(
+        times, times[starts][:, None] + periods[None, :], side="right"
+    )  # (runs, periods) index of the first poll beyond the period
+    alerted: Final[np.ndarray] = first <= ends[:, None]
+    delay: Final[np.ndarray] = np.where(
+        alerted, times[np.minimum(first, len(times) - 1)] - times[starts][:, None], np.nan
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        return {
+            "alerts": alerted.sum(axis=0),
+            "true": (alerted & confirmed).sum(axis=0),
+            "false": (alerted & ~confirmed).sum(axis=0),
+            "missed": (~alerted & confirmed).sum(axis=0),
+            "median_delay": np.nanmedian(delay, axis=0) if len(starts) else np.full(len(periods), np.nan),
+            "max_delay": np.nanmax(delay, axis=0) if len(starts) else np.full(len(periods), np.nan),
+        }
+
+
+def _grid(spec: str) -> np.ndarray:
+    """Parse 'start:stop:step' (inclusive) or a comma separated list."""
+    if ":" in spec:
+        start, stop, step = (float(value) for value in spec.split(":"))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(value) for value in spec.split(",")])
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("samples", type=Path)
+    parser.add_argument("-t", "--thresholds", default="0.5:4:0.5", help="[A]")
+    parser.add_argument("-p", "--periods", default="60:900:60", help="[s]")
+    parser.add_argument("--confirm", type=float, default=1800, help="[s] real underload")
+    parser.add_argument("--interval", type=float, default=30, help="[s] poll interval")
+    parser.add_argument("--current-entity", help="recorder entity of the pump current")
+    parser.add_argument("--filtration-entity", help="recorder entity of the filtration")
+    parser.add_argument("-d", "--detector", action="append", choices=DETECTORS)
+    parser.add_argument("--csv", action="store_true", help="print results as CSV")
+    args = parser.parse_args()
+
+    times, filtration, current = load(args.samples, args)
+    thresholds: Final[np.ndarray] = _grid(args.thresholds)
+    periods: Final[np.ndarray] = _grid(args.periods)
+
+    start: Final[float] = perf_counter()
+    results: list[tuple[str, float, float, dict[str, float]]] = []
+    for name in args.detector or list(DETECTORS):
+        signal = DETECTORS[name](current)
+        for threshold in thresholds:
+            stats = backtest(times, filtration & (signal < threshold), periods, args.confirm)
+            results.extend(
+                (name, threshold, period, {key: value[idx] for key, value in stats.items()})
+                for idx, period in enumerate(periods)
+            )
+    elapsed: Final[float] = perf_counter() - start
+
+    columns: Final[list[str]] = list(results[0][3]) if results else []
+    writer = csv.writer(sys.stdout) if args.csv else None
+    header: Final[list[str]] = ["detector", "threshold", "period", *columns]
+    if writer:
+        writer.writerow(header)
+    else:
+        print("".join(f"{col:>13}" for col in header))
+    for name, threshold, period, stats in results:
+        row = [name, f"{threshold:g}", f"{period:g}", *(f"{stats[col]:g}" for col in columns)]
+        if writer:
+            writer.writerow(row)
+        else:
+            print("".join(f"{value:>13}" for value in row))
+    print(
+        f"{len(times)} samples, {len(results)} settings evaluated in {elapsed * 1000:.1f} ms",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
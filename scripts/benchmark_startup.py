@@ -0,0 +1,134 @@
+"""Benchmark import and entity setup cost of the asys_ble integration.
+
+Usage: python scripts/benchmark_startup.py [--runs N] [--json]
+
+Import time is measured in a fresh interpreter per module, after the
+Home Assistant modules that are already loaded in a running instance
+have been imported, so only the cost added by the integration is
+reported. Setup time measures the platform `async_setup_entry` calls.
+Must be run from the repository root with the requirements installed.
+"""
+
+import argparse
+import asyncio
+import json
+from statistics import median
+import subprocess
+import sys
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any
+
+PACKAGE = "custom_components.asys_ble"
+MODULES = [
+    PACKAGE,
+    f"{PACKAGE}.coordinator",
+    f"{PACKAGE}.plugins.preciseo",
+    f"{PACKAGE}.plugins.preciseob",
+    f"{PACKAGE}.binary_sensor",
+    f"{PACKAGE}.button",
+    f"{PACKAGE}.light",
+    f"{PACKAGE}.select",
+    f"{PACKAGE}.sensor",
+]
+PLATFORMS = ["binary_sensor", "button", "light", "select", "sensor"]
+# modules a running Home Assistant instance has loaded before the integration
+PRELOAD = [
+    "homeassistant.core",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.helpers.storage",
+    "homeassistant.components.bluetooth",
+    *(f"homeassistant.components.{platform}" for platform in PLATFORMS),
+]
+# must not be loaded before a device connects
+LAZY = ["Crypto.Cipher.AES", "bleak_retry_connector"]
+
+_IMPORT_PROBE = """
+import importlib, json, sys, time
+for name in {preload!r}:
+    importlib.import_module(name)
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in {lazy!r} if m in sys.modules]]))
+"""
+
+
+def bench_imports(runs: int) -> dict[str, Any]:
+    """Return median import time per module and eagerly loaded lazy modules."""
+    result: dict[str, Any] = {}
+    for module in MODULES:
+        times: list[float] = []
+        eager: list[str] = []
+        for _ in range(runs):
+            out = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    _IMPORT_PROBE.format(preload=PRELOAD, module=module, lazy=LAZY),
+                ],
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout
+            elapsed, eager = json.loads(out)
+            times.append(elapsed)
+        result[module] = {"import_ms": round(median(times) * 1000, 2), "eager": eager}
+    return result
+
+
+async def bench_setup(runs: int) -> dict[str, Any]:
+    """Return median platform setup time and number of entity registrations."""
+    result: dict[str, Any] = {}
+    coordinator = SimpleNamespace(
+        device_info=None, data={}, name="bench", rssi=None, restored=False
+    )
+    entry = SimpleNamespace(runtime_data=coordinator, unique_id="cc:cc:cc:cc:cc:cc")
+    for platform in PLATFORMS:
+        module = __import__(f"{PACKAGE}.{platform}", fromlist=["async_setup_entry"])
+        calls: list[int] = []
+        times: list[float] = []
+        for _ in range(runs):
+            calls.clear()
+            start = perf_counter()
+            await module.async_setup_entry(
+                None,
+                entry,
+                lambda entities, *_, calls=calls: calls.append(len(list(entities))),
+            )
+            times.append(perf_counter() - start)
+        result[platform] = {
+            "setup_ms": round(median(times) * 1000, 3),
+            "add_entities_calls": len(calls),
+            "entities": sum(calls),
+        }
+    return result
+
+
+def main() -> int:
+    """Run the benchmarks and print the report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print JSON report")
+    args = parser.parse_args()
+
+    report: dict[str, Any] = {
+        "imports": bench_imports(args.runs),
+        "setup": asyncio.run(bench_setup(args.runs)),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    for module, res in report["imports"].items():
+        print(f"{module:45} {res['import_ms']:8.2f} ms  {' '.join(res['eager'])}")
+    for platform, res in report["setup"].items():
+        print(
+            f"{platform:45} {res['setup_ms']:8.3f} ms  "
+            f"{res['entities']} entities, {res['add_entities_calls']} call(s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
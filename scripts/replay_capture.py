@@ -0,0 +1,57 @@
+"""Replay a raw GATT capture through an asys_ble plugin decoder.
+
+Usage: python scripts/replay_capture.py <capture.bin|diagnostics.json> [plugin]
+
+The input is either a capture file or a diagnostics download of a device,
+in which case the embedded capture is used. Must be run from the
+repository root with the Home Assistant requirements installed.
+"""
+
+import argparse
+import asyncio
+from base64 import b64decode
+import json
+from pathlib import Path
+import sys
+from time import perf_counter
+
+from custom_components.asys_ble.const import ASYS_DEVICE_TYPES
+from custom_components.asys_ble.plugins.capture import loads, replay
+
+
+def _load_frames(path: Path) -> bytes:
+    raw: bytes = path.read_bytes()
+    if path.suffix == ".json":
+        diag = json.loads(raw)
+        raw = b64decode(diag.get("data", diag)["capture"])
+    return raw
+
+
+async def _main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("plugin", nargs="?", default="preciseob", choices=ASYS_DEVICE_TYPES)
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print timing")
+    args = parser.parse_args()
+
+    frames = loads(_load_frames(args.capture))
+    plugin = __import__(
+        f"custom_components.asys_ble.plugins.{args.plugin}", fromlist=["BMS"]
+    )
+
+    start: float = perf_counter()
+    samples = await replay(plugin.BMS, frames)
+    elapsed: float = perf_counter() - start
+
+    if not args.quiet:
+        for sample in samples:
+            print(sample)
+    print(
+        f"{len(frames)} frames, {len(samples)} samples decoded in {elapsed * 1000:.2f} ms",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
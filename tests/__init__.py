@@ -0,0 +1 @@
+"""Tests for the Asys BLE integration."""
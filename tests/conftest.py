@@ -0,0 +1,260 @@
+"""Common fixtures for the Asys BLE tests."""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import json
+from typing import Any, Final
+
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.asys_ble import coordinator as coordinator_module
+from custom_components.asys_ble.const import DOMAIN
+from custom_components.asys_ble.coordinator import BTBmsCoordinator
+from custom_components.asys_ble.plugins import basebms, preciseob
+
+MAC: Final[str] = "CC:CC:CC:CC:CC:CC"
+CONTROL: Final[str] = preciseob.BMS.CONTROL_UUID.lower()
+STATUS: Final[str] = preciseob.BMS.STATUS_UUID.lower()
+RANDOM_KEY: Final[str] = basebms.BaseBMS.CHARACTERISTIC_SYSTEM_RANDOMKEY_UUID.lower()
+SHARED_KEY: Final[str] = basebms.BaseBMS.CHARACTERISTIC_SYSTEM_SHAREDKEY_UUID.lower()
+ENCRYPT_KEY: Final[str] = basebms.BaseBMS.CHARACTERISTIC_SYSTEM_ENCRYPTKEY_UUID.lower()
+# filtration on, 1.2 A, 25 °C water, -3 °C air
+STATUS_BLOCK: Final[bytes] = bytes(
+    [0, 0, 1, 0, 0x10, 0, 0, 0, 5, 0, 0, 0, 12, 0, 25, 0, 0xFD, 0, 0, 0]
+)
+
+
+@dataclass
+class MockCharacteristic:
+    """GATT characteristic as listed by service discovery."""
+
+    uuid: str
+    handle: int
+    properties: list[str]
+
+
+@dataclass
+class MockService:
+    """GATT service with its characteristics."""
+
+    characteristics: list[MockCharacteristic] = field(default_factory=list)
+
+
+class MockBleakClient:
+    """Connected Asys controller serving reads and writes from its registers."""
+
+    def __init__(
+        self,
+        *_args: Any,
+        disconnected_callback: Callable[[Any], None] | None = None,
+        **_kwargs: Any,
+    ) -> None:
+        """Initialize the registers of a paired controller."""
+        self.is_connected: bool = False
+        self._disconnected_callback = disconnected_callback
+        self.registers: dict[str, bytearray] = {
+            CONTROL: bytearray([1, 2, 0, 0]),
+            STATUS: bytearray(STATUS_BLOCK),
+            RANDOM_KEY: bytearray(range(16)),
+            SHARED_KEY: bytearray(range(1, 17)),
+            ENCRYPT_KEY: bytearray(16),
+        }
+        self.registers |= {
+            char: bytearray(b"\x2a")
+            for char in (*preciseob.BMS.TEST_CHARS.values(), *preciseob.BMS.UNKNOWN_CHARS.values())
+        }
+        self.registers |= {
+            char: bytearray(key.encode())
+            for key, char in basebms.DEVICE_INFO_CHARS.items()
+        }
+        self.properties: dict[str, list[str]] = {
+            CONTROL: ["read", "write", "write-without-response"],
+            ENCRYPT_KEY: ["write"],
+        }
+        self.unreadable: set[str] = set()  # reads fail with an error
+        self.lose_unacknowledged: bool = False  # writes without response get lost
+        self.read_delays: dict[str, float] = {}  # [s] per characteristic
+        self.write_delays: dict[str, float] = {}  # [s] per characteristic
+        self.reads: list[str] = []
+        self.writes: list[tuple[str, bytes, bool | None]] = []
+        self.color_steps: int = 0
+        self.cache_clears: int = 0
+
+    @property
+    def services(self) -> list[MockService]:
+        """Return the discovered services, a single one holding all characteristics."""
+        return [
+            MockService(
+                [
+                    MockCharacteristic(uuid, handle, self.properties.get(uuid, ["read"]))
+                    for handle, uuid in enumerate(self.registers, start=10)
+                ]
+            )
+        ]
+
+    @staticmethod
+    def _uuid(char: Any) -> str:
+        return str(getattr(char, "uuid", char)).lower()
+
+    async def read_gatt_char(self, char: Any, **_kwargs: Any) -> bytearray:
+        """Return the content of a register."""
+        uuid: Final[str] = self._uuid(char)
+        self.reads.append(uuid)
+        await asyncio.sleep(self.read_delays.get(uuid, 0))
+        if uuid in self.unreadable or uuid not in self.registers:
+            raise BleakError(f"read of {uuid} not permitted")
+        return bytearray(self.registers[uuid])
+
+    async def write_gatt_char(
+        self, char: Any, data: bytes | bytearray, response: bool | None = None
+    ) -> None:
+        """Update a register, the device resets the color step trigger once applied."""
+        uuid: Final[str] = self._uuid(char)
+        self.writes.append((uuid, bytes(data), response))
+        await asyncio.sleep(self.write_delays.get(uuid, 0))
+        if not response and self.lose_unacknowledged:
+            return
+        self.registers[uuid][:] = data
+        if uuid == CONTROL and data[basebms.CTRL_LIGHT_COLOR]:
+            self.color_steps += 1
+            self.registers[uuid][basebms.CTRL_LIGHT_COLOR] = 0
+
+    async def disconnect(self) -> bool:
+        """Close the connection."""
+        if self.is_connected:
+            self.is_connected = False
+            if self._disconnected_callback:
+                self._disconnected_callback(self)
+        return True
+
+    async def clear_cache(self) -> bool:
+        """Drop the cached services."""
+        self.cache_clears += 1
+        return True
+
+    def control_writes(self) -> list[tuple[bytes, bool | None]]:
+        """Return the frames written to the control register with their mode."""
+        return [(data, mode) for uuid, data, mode in self.writes if uuid == CONTROL]
+
+
+class MockStore:
+    """Store keeping a JSON copy of the saved data, like the file on disk."""
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        """Initialize the store, optionally with persisted data."""
+        self.content: str | None = None if data is None else json.dumps(data)
+        self.saves: int = 0
+
+    @property
+    def data(self) -> dict[str, Any] | None:
+        """Return the persisted data."""
+        return None if self.content is None else json.loads(self.content)
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Load the persisted data."""
+        return self.data
+
+    async def async_save(self, data: dict[str, Any]) -> None:
+        """Persist the data."""
+        self.saves += 1
+        self.content = json.dumps(data)
+
+    def async_delay_save(self, data_func: Callable[[], Any], _delay: float = 0) -> None:
+        """Persist the data at once."""
+        self.content = json.dumps(data_func())
+
+
+@pytest.fixture
+def ble_device() -> BLEDevice:
+    """Return the Bleak device of a controller."""
+    return BLEDevice(MAC, "Preciseo", {"path": "/org/bluez/hci0/dev_CC_CC_CC_CC_CC_CC"}, -60)
+
+
+@pytest.fixture
+def mock_client(monkeypatch: pytest.MonkeyPatch) -> MockBleakClient:
+    """Return the client every connection of a BMS gets."""
+    client: Final[MockBleakClient] = MockBleakClient()
+
+    async def establish(
+        bms: basebms.BaseBMS, _brc: Any, _device: BLEDevice
+    ) -> MockBleakClient:
+        client.is_connected = True
+        client._disconnected_callback = bms._on_disconnect  # noqa: SLF001
+        return client
+
+    monkeypatch.setattr(basebms, "BleakClient", MockBleakClient)
+    monkeypatch.setattr(basebms.BaseBMS, "_establish", establish)
+    # write modes learned for the model must not leak between tests
+    monkeypatch.setattr(basebms.BaseBMS, "_model_write_modes", {})
+    return client
+
+
+@pytest.fixture
+def mock_store() -> MockStore:
+    """Return an empty store."""
+    return MockStore()
+
+
+@pytest.fixture
+def bms(
+    ble_device: BLEDevice, mock_client: MockBleakClient, mock_store: MockStore
+) -> preciseob.BMS:
+    """Return a BMS connecting to the mock client."""
+    return preciseob.BMS(ble_device, mock_store)  # type: ignore[arg-type]
+
+
+@dataclass
+class MockBluetooth:
+    """Bluetooth state of the controller as seen by Home Assistant."""
+
+    present: bool = True  # advertisements received recently
+    scanners: list[Any] = field(default_factory=list)  # devices as seen per scanner
+    service_info: Any = None  # last advertisement
+
+
+@pytest.fixture
+def mock_bluetooth(monkeypatch: pytest.MonkeyPatch) -> MockBluetooth:
+    """Return the Bluetooth state the coordinator sees."""
+    bluetooth: Final[MockBluetooth] = MockBluetooth()
+    monkeypatch.setattr(
+        coordinator_module, "async_address_present", lambda *_args, **_kw: bluetooth.present
+    )
+    monkeypatch.setattr(
+        coordinator_module, "async_last_service_info", lambda *_args, **_kw: bluetooth.service_info
+    )
+    monkeypatch.setattr(
+        coordinator_module,
+        "async_scanner_devices_by_address",
+        lambda *_args, **_kw: bluetooth.scanners,
+    )
+    return bluetooth
+
+
+@pytest.fixture
+def mock_config_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Return the config entry of the controller, added to Home Assistant."""
+    entry: Final[MockConfigEntry] = MockConfigEntry(
+        domain=DOMAIN,
+        title="Preciseo",
+        unique_id=MAC,
+        data={"type": "custom_components.asys_ble.plugins.preciseob"},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def coordinator(
+    hass: HomeAssistant,
+    ble_device: BLEDevice,
+    bms: preciseob.BMS,
+    mock_config_entry: MockConfigEntry,
+    mock_bluetooth: MockBluetooth,
+) -> BTBmsCoordinator:
+    """Return the coordinator of the controller."""
+    return BTBmsCoordinator(hass, ble_device, bms, mock_config_entry)
@@ -0,0 +1,129 @@
+"""Tests for the offline backtest of the underload-protection settings."""
+
+from argparse import Namespace
+import importlib.util
+from pathlib import Path
+import random
+from types import ModuleType
+
+import pytest
+
+from custom_components.asys_ble.history import SampleHistory
+
+np = pytest.importorskip("numpy")
+
+SCRIPT = Path(__file__).parents[1] / "scripts" / "backtest_underload.py"
+
+
+@pytest.fixture(scope="module")
+def backtest() -> ModuleType:
+    """Return the backtest script as module."""
+    spec = importlib.util.spec_from_file_location("backtest_underload", SCRIPT)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _polls(count: int = 3000) -> list[tuple[float, dict[str, object]]]:
+    """Return polls of a pump with short dips and a few long underloads."""
+    rnd = random.Random(1)
+    polls: list[tuple[float, dict[str, object]]] = []
+    now = 0.0
+    for idx in range(count):
+        now += 30 + rnd.uniform(-3, 3)
+        current = 1.0 if rnd.random() < 0.03 or 800 < idx < 900 or 2000 < idx < 2004 else 5.0
+        polls.append((now, {"current": current, "filtration_state": (idx // 400) % 3 != 0}))
+    return polls
+
+
+def _replay(
+    polls: list[tuple[float, dict[str, object]]], threshold: float, period: float
+) -> int:
+    """Return the number of alerts of a poll by poll replay of the pipeline logic."""
+    since: float | None = None
+    alerts = 0
+    alerting = False
+    for now, sample in polls:
+        alert = False
+        if sample["filtration_state"] and sample["current"] < threshold:  # type: ignore[operator]
+            if since is None:
+                since = now
+            elif now - since > period:
+                alert = True
+        else:
+            since = None
+        alerts += alert and not alerting
+        alerting = alert
+    return alerts
+
+
+@pytest.mark.parametrize("suffix", ["csv", "npy"])
+def test_matches_replay(backtest: ModuleType, tmp_path: Path, suffix: str) -> None:
+    """Test the vectorized backtest of an export matches a poll by poll replay."""
+    polls = _polls()
+    history = SampleHistory(tmp_path / "history.bin", capacity=len(polls))
+    history.open()
+    for now, sample in polls:
+        history.append(sample, now)  # type: ignore[arg-type]
+    export = tmp_path / f"history.{suffix}"
+    getattr(history, f"export_{suffix}")(export)
+    history.close()
+
+    times, filtration, current = backtest.load(export, Namespace())
+    periods = np.array([0, 60, 300, 1200])
+    assert len(times) == len(polls)
+
+    for threshold in (1.5, 3):
+        stats = backtest.backtest(times, filtration & (current < threshold), periods, 1800)
+        assert stats["alerts"].tolist() == [
+            _replay(polls, threshold, period) for period in periods
+        ]
+        assert (stats["true"] + stats["false"]).tolist() == stats["alerts"].tolist()
+
+
+def test_confirmed(backtest: ModuleType) -> None:
+    """Test alerts are classified by the recovery of the current, delays measured."""
+    times = np.arange(0.0, 600.0, 30.0)
+    low = np.zeros(len(times), dtype=bool)
+    low[2:5] = True  # dip of 90 s
+    low[10:20] = True  # underload until the end of the samples
+
+    stats = backtest.backtest(times, low, np.array([30, 120, 400]), 240)
+
+    assert stats["alerts"].tolist() == [2, 1, 0]
+    assert stats["true"].tolist() == [1, 1, 0]
+    assert stats["false"].tolist() == [1, 0, 0]
+    assert stats["missed"].tolist() == [0, 0, 1]
+    assert stats["max_delay"][:2].tolist() == [60, 150]
+    assert np.isnan(stats["median_delay"][2])
+
+
+def test_no_samples(backtest: ModuleType) -> None:
+    """Test an empty series yields no alerts."""
+    stats = backtest.backtest(np.array([]), np.array([], dtype=bool), np.array([60]), 1800)
+
+    assert stats["alerts"].tolist() == [0]
+    assert np.isnan(stats["median_delay"][0])
+
+
+def test_recorder_csv(backtest: ModuleType, tmp_path: Path) -> None:
+    """Test a Home Assistant history download is resampled to the poll interval."""
+    export = tmp_path / "history.csv"
+    export.write_text(
+        "entity_id,state,last_changed\n"
+        "sensor.pool_intensite_pompe,5.0,2026-06-01T10:00:00.000Z\n"
+        "sensor.pool_intensite_pompe,unavailable,2026-06-01T10:01:00.000Z\n"
+        "sensor.pool_intensite_pompe,1.0,2026-06-01T10:02:00.000Z\n"
+        "binary_sensor.pool_filtration,on,2026-06-01T10:00:00.000Z\n"
+        "binary_sensor.pool_filtration_hors_gel,off,2026-06-01T10:00:00.000Z\n"
+        "binary_sensor.pool_filtration,off,2026-06-01T10:03:00.000Z\n",
+        encoding="utf-8",
+    )
+    args = Namespace(current_entity=None, filtration_entity=None, interval=30)
+
+    times, filtration, current = backtest.load(export, args)
+
+    assert (times - times[0]).tolist() == [0, 30, 120, 150]
+    assert current.tolist() == [5.0, 5.0, 1.0, 1.0]
+    assert filtration.tolist() == [True] * 4
@@ -0,0 +1,574 @@
+"""Tests for the base class of the BMS plugins."""
+
+import asyncio
+import json
+import sys
+from time import monotonic, time
+from typing import Any
+from unittest.mock import MagicMock
+
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+import pytest
+
+from custom_components.asys_ble.const import UNREADABLE_FAILURES
+from custom_components.asys_ble.plugins import basebms, preciseob
+
+from .conftest import MAC, CONTROL, ENCRYPT_KEY, SHARED_KEY, STATUS, MockBleakClient, MockStore
+
+STORE_KEY = "bms_test"
+
+
+@pytest.fixture
+def no_spacing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Write queued control changes without waiting."""
+    monkeypatch.setattr(basebms, "CONTROL_COALESCE_WINDOW", 0)
+    monkeypatch.setattr(basebms, "CONTROL_MIN_SPACING", 0)
+
+
+async def _async_stored_gatt(hass: HomeAssistant) -> dict[str, Any]:
+    """Return the GATT section as persisted, read by a new store."""
+    return (await Store(hass, 1, STORE_KEY).async_load() or {}).get("gatt", {})
+
+
+async def test_write_mode_persisted(
+    hass: HomeAssistant, ble_device: BLEDevice, mock_client: MockBleakClient
+) -> None:
+    """Test a learned write mode is saved and reused after a restart."""
+    bms = preciseob.BMS(ble_device, Store(hass, 1, STORE_KEY))
+    await bms.async_update()
+    assert (await _async_stored_gatt(hass))["write"] == {}
+
+    await bms.set_filtration_mode(3)
+
+    assert bms.write_modes == {CONTROL: False}
+    assert (await _async_stored_gatt(hass))["write"] == {CONTROL: False}
+
+    await bms.disconnect()
+    mock_client.writes.clear()
+    mock_client.reads.clear()
+    restarted = preciseob.BMS(ble_device, Store(hass, 1, STORE_KEY))
+    await restarted.async_update()
+    await restarted.set_filtration_mode(4)
+
+    assert mock_client.control_writes() == [(bytes([4, 2, 0, 0]), False)]
+    assert mock_client.reads.count(CONTROL) == 2  # update and read-modify-write
+
+
+async def test_unreadable_persisted(
+    hass: HomeAssistant, ble_device: BLEDevice, mock_client: MockBleakClient
+) -> None:
+    """Test characteristics failing while associated are skipped, also after a restart."""
+    char = preciseob.BMS.TEST_CHARS["day"]
+    mock_client.unreadable.add(char)
+    bms = preciseob.BMS(ble_device, Store(hass, 1, STORE_KEY))
+
+    for failures in range(1, UNREADABLE_FAILURES + 1):
+        await bms.async_update()
+        assert (await _async_stored_gatt(hass))["unreadable"] == {char: failures}
+    mock_client.reads.clear()
+    await bms.async_update()
+    assert char not in mock_client.reads
+
+    await bms.disconnect()
+    restarted = preciseob.BMS(ble_device, Store(hass, 1, STORE_KEY))
+    await restarted.async_update()
+
+    assert char not in mock_client.reads
+    assert restarted.unreadable == {char: UNREADABLE_FAILURES}
+
+
+async def test_unreadable_recovers(
+    hass: HomeAssistant, ble_device: BLEDevice, mock_client: MockBleakClient
+) -> None:
+    """Test a successful read resets the failure count of a characteristic."""
+    char = preciseob.BMS.TEST_CHARS["day"]
+    mock_client.unreadable.add(char)
+    bms = preciseob.BMS(ble_device, Store(hass, 1, STORE_KEY))
+    await bms.async_update()
+    assert bms.unreadable == {char: 1}
+
+    mock_client.unreadable.clear()
+    await bms.async_update()
+
+    assert bms.unreadable == {}
+    assert (await _async_stored_gatt(hass))["unreadable"] == {}
+
+
+@pytest.mark.usefixtures("no_spacing")
+async def test_write_mode_fallback(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test a write without response that is not applied falls back to acknowledged writes."""
+    mock_client.lose_unacknowledged = True
+    await bms.async_update()
+
+    assert await bms.set_control(filtration_mode=3) is True
+
+    assert mock_client.control_writes() == [
+        (bytes([3, 2, 0, 0]), False),
+        (bytes([3, 2, 0, 0]), True),
+    ]
+    assert mock_client.registers[CONTROL][basebms.CTRL_FILTRATION_MODE] == 3
+    assert bms.write_modes == {CONTROL: True}
+
+
+@pytest.mark.usefixtures("no_spacing")
+async def test_write_mode_trigger_not_probed(
+    bms: preciseob.BMS, mock_client: MockBleakClient
+) -> None:
+    """Test a frame with a trigger is written once, never probed."""
+    mock_client.lose_unacknowledged = True
+    await bms.async_update()
+
+    assert await bms.set_control(light=True, light_color_step=True) is True
+
+    assert mock_client.control_writes() == [(bytes([1, 2, 1, 1]), True)]
+    assert mock_client.color_steps == 1
+    assert bms.write_modes == {CONTROL: True}
+
+
+async def test_import_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a module imported before is returned without an executor job."""
+    loop = asyncio.get_running_loop()
+    monkeypatch.setattr(loop, "run_in_executor", MagicMock(side_effect=AssertionError))
+
+    assert await basebms._async_import("json") is json  # noqa: SLF001
+
+
+async def test_import_executor(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a module not imported yet is loaded in the executor."""
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    loop = asyncio.get_running_loop()
+    run_in_executor = MagicMock(wraps=loop.run_in_executor)
+    monkeypatch.setattr(loop, "run_in_executor", run_in_executor)
+
+    module = await basebms._async_import("colorsys")  # noqa: SLF001
+
+    assert module.__name__ == "colorsys"
+    run_in_executor.assert_called_once()
+
+
+async def test_gatt_cache_unchanged(
+    bms: preciseob.BMS, mock_client: MockBleakClient, mock_store: MockStore
+) -> None:
+    """Test the handle table is persisted once and reused on reconnect."""
+    await bms.async_update()
+    saves = mock_store.saves
+    gatt = (mock_store.data or {})["gatt"]
+    assert gatt["handles"][CONTROL] == 10
+    assert gatt["fw"] == "sw_version"
+
+    await bms.disconnect()
+    await bms.async_update()
+
+    assert mock_store.saves == saves
+    assert mock_client.cache_clears == 0
+
+
+async def test_gatt_handles_changed(
+    ble_device: BLEDevice, mock_client: MockBleakClient
+) -> None:
+    """Test a changed handle layout drops the service cache and the learned modes."""
+    store = MockStore(
+        {"gatt": {"handles": {CONTROL: 3}, "fw": "sw_version", "write": {CONTROL: False}}}
+    )
+    bms = preciseob.BMS(ble_device, store)  # type: ignore[arg-type]
+
+    with pytest.raises(BleakError, match="GATT services changed"):
+        await bms.async_update()
+
+    assert mock_client.cache_clears == 1
+    assert not mock_client.is_connected
+    assert (store.data or {})["gatt"] == {}
+
+    await bms.async_update()
+
+    assert (store.data or {})["gatt"]["handles"][CONTROL] == 10
+    assert bms.write_modes == {}
+
+
+async def test_firmware_changed(
+    bms: preciseob.BMS, mock_client: MockBleakClient, mock_store: MockStore
+) -> None:
+    """Test a firmware update invalidates the GATT cache."""
+    await bms.async_update()
+    mock_client.registers[basebms.DEVICE_INFO_CHARS["sw_version"]][:] = b"2.0"
+
+    data = await bms.async_update()
+
+    assert data["sw_version"] == "2.0"
+    assert mock_client.cache_clears == 1
+    assert not mock_client.is_connected
+    assert (mock_store.data or {})["gatt"] == {}
+
+    await bms.async_update()
+
+    assert (mock_store.data or {})["gatt"]["fw"] == "2.0"
+    assert mock_client.cache_clears == 1
+
+
+@pytest.fixture
+def coalescing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Merge control changes queued within a short window, write without spacing."""
+    monkeypatch.setattr(basebms, "CONTROL_COALESCE_WINDOW", 0.01)
+    monkeypatch.setattr(basebms, "CONTROL_MIN_SPACING", 0)
+
+
+@pytest.mark.usefixtures("coalescing")
+async def test_control_coalesced(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test changes arriving together become a single write, later values win."""
+    await bms.async_update()
+
+    await asyncio.gather(
+        bms.set_filtration_mode(2),
+        bms.set_filtration_mode(3),
+        bms.turn_on_off_light(True),
+    )
+
+    assert mock_client.control_writes() == [(bytes([3, 2, 1, 0]), False)]
+    assert bms.commands == {"written": 1}
+
+
+@pytest.mark.usefixtures("coalescing")
+async def test_control_triggers_not_merged(
+    bms: preciseob.BMS, mock_client: MockBleakClient
+) -> None:
+    """Test each color step is written on its own."""
+    await bms.async_update()
+
+    await asyncio.gather(bms.change_light_color(), bms.change_light_color())
+
+    assert mock_client.color_steps == 2
+    assert bms.commands == {"written": 2}
+
+
+@pytest.mark.usefixtures("coalescing")
+async def test_control_error(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test all waiters of a failed write get its error."""
+    await bms.async_update()
+    mock_client.unreadable.add(CONTROL)
+
+    results = await asyncio.gather(
+        bms.set_filtration_mode(3), bms.turn_on_off_light(True), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [BleakError, BleakError]
+    assert not mock_client.control_writes()
+    assert bms.commands == {"failed": 1}
+
+
+async def test_control_spacing(
+    bms: preciseob.BMS, mock_client: MockBleakClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test consecutive writes keep the minimum spacing."""
+    monkeypatch.setattr(basebms, "CONTROL_COALESCE_WINDOW", 0)
+    monkeypatch.setattr(basebms, "CONTROL_MIN_SPACING", 0.05)
+    await bms.async_update()
+    await bms.set_filtration_mode(3)
+    start = monotonic()
+
+    await bms.set_filtration_mode(4)
+
+    assert monotonic() - start >= 0.04
+    assert len(mock_client.control_writes()) == 2
+
+
+@pytest.mark.usefixtures("no_spacing")
+async def test_control_waits_for_link(
+    bms: preciseob.BMS, mock_client: MockBleakClient
+) -> None:
+    """Test a control write waits until the task holding the link is done."""
+    await bms.async_update()
+    released = asyncio.Event()
+
+    async def hold_link() -> None:
+        async with bms._exclusive():  # noqa: SLF001
+            await released.wait()
+
+    holder = asyncio.create_task(hold_link())
+    await asyncio.sleep(0)
+    write = asyncio.create_task(bms.set_control(filtration_mode=3))
+    await asyncio.sleep(0.01)
+
+    assert not write.done()
+    assert not mock_client.control_writes()
+
+    released.set()
+    assert await write is True
+    await holder
+    assert len(mock_client.control_writes()) == 1
+
+
+async def test_session(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test a session holds one associated connection, updates wait for it."""
+    async with bms.session():
+        assert mock_client.is_connected
+        assert mock_client.writes[0][0] == ENCRYPT_KEY  # associated
+        update = asyncio.create_task(bms.async_update())
+        assert await bms.set_control(filtration_mode=3, light=True) is True
+        await asyncio.sleep(0.01)
+        assert not update.done()
+
+    await update
+    assert mock_client.control_writes() == [(bytes([3, 2, 1, 0]), False)]
+
+
+async def test_session_not_associated(
+    bms: preciseob.BMS, mock_client: MockBleakClient
+) -> None:
+    """Test a session fails if the controller is not paired."""
+    mock_client.registers[SHARED_KEY][:] = bytes(16)
+
+    with pytest.raises(BleakError, match="association failed"):
+        async with bms.session():
+            pytest.fail("session entered without association")
+
+
+async def test_deferred_applied(
+    ble_device: BLEDevice, mock_client: MockBleakClient, mock_store: MockStore
+) -> None:
+    """Test commands issued offline survive a restart and are applied before publishing."""
+    offline = preciseob.BMS(ble_device, mock_store)  # type: ignore[arg-type]
+    assert await offline.set_control(filtration_mode=3, light=True) is False
+    assert await offline.set_control(filtration_mode=4) is False
+    assert {
+        idx: cmd["value"] for idx, cmd in (mock_store.data or {})["pending"].items()
+    } == {"0": 4, "2": 1}
+    assert offline.commands == {"deferred": 2}
+
+    bms = preciseob.BMS(ble_device, mock_store)  # type: ignore[arg-type]
+    results: list[tuple[str, dict[str, int]]] = []
+    bms.set_command_listener(lambda result, fields: results.append((result, fields)))
+    data = await bms.async_update()
+
+    assert mock_client.control_writes() == [(bytes([4, 2, 1, 0]), False)]
+    assert data["filtration_mode"] == 4
+    assert data["light_state"] is True
+    assert results == [("applied", {"filtration_mode": 4, "light": 1})]
+    assert (mock_store.data or {})["pending"] == {}
+
+
+async def test_deferred_expired(ble_device: BLEDevice, mock_client: MockBleakClient) -> None:
+    """Test commands deferred for too long are dropped and reported."""
+    store = MockStore({"pending": {"0": {"value": 3, "expires": time() - 1}}})
+    bms = preciseob.BMS(ble_device, store)  # type: ignore[arg-type]
+    results: list[tuple[str, dict[str, int]]] = []
+    bms.set_command_listener(lambda result, fields: results.append((result, fields)))
+
+    data = await bms.async_update()
+
+    assert not mock_client.control_writes()
+    assert data["filtration_mode"] == 1
+    assert results == [("expired", {"filtration_mode": 3})]
+    assert (store.data or {})["pending"] == {}
+
+
+async def test_deferred_kept(
+    bms: preciseob.BMS, mock_store: MockStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test deferred commands failing to apply are kept with their expiry."""
+    assert await bms.set_control(filtration_mode=3) is False
+    pending = (mock_store.data or {})["pending"]
+
+    async def write_control(_fields: dict[int, int]) -> None:
+        raise BleakError("write failed")
+
+    monkeypatch.setattr(bms, "_write_control", write_control)
+    data = await bms.async_update()
+
+    assert data["filtration_mode"] == 1
+    assert (mock_store.data or {})["pending"] == pending
+    assert bms.commands == {"deferred": 1, "failed": 1}
+
+
+async def test_establish_hedged(
+    bms: preciseob.BMS, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the first path to connect wins, surplus connections are closed."""
+    fast, slow, failing = (
+        BLEDevice(MAC, "Preciseo", {"source": source}, -60)
+        for source in ("fast", "slow", "failing")
+    )
+    clients: list[tuple[BLEDevice, MockBleakClient]] = []
+
+    async def establish(
+        _bms: basebms.BaseBMS, _brc: Any, device: BLEDevice
+    ) -> MockBleakClient:
+        if device is failing:
+            raise BleakError("connection failed")
+        await asyncio.sleep(0.01 if device is slow else 0)
+        client = MockBleakClient()
+        client.is_connected = True
+        clients.append((device, client))
+        return client
+
+    monkeypatch.setattr(basebms.BaseBMS, "_establish", establish)
+
+    client, device = await bms._establish_hedged(None, [failing, slow, fast])  # type: ignore[arg-type]  # noqa: SLF001
+
+    assert device is fast
+    assert clients == [(fast, client)]  # the slow attempt was cancelled
+    assert client.is_connected
+
+    clients.clear()
+    client, device = await bms._establish_hedged(None, [fast, fast])  # type: ignore[arg-type]  # noqa: SLF001
+
+    assert len(clients) == 2  # both connected at once
+    assert [dev_client.is_connected for _dev, dev_client in clients].count(True) == 1
+    assert client.is_connected
+
+    with pytest.raises(BleakError, match="connection failed"):
+        await bms._establish_hedged(None, [failing, failing])  # type: ignore[arg-type]  # noqa: SLF001
+
+
+async def test_budget_overrun(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test an update is cut at the end of its budget and the operation is recorded."""
+    mock_client.read_delays[STATUS] = 1
+
+    with pytest.raises(TimeoutError):
+        await bms.async_update(0.2)
+
+    assert bms.budget is not None
+    assert bms.budget.overruns == [f"read {preciseob.BMS.STATUS_UUID}"]
+
+
+async def test_budget_optional_skipped(
+    bms: preciseob.BMS, mock_client: MockBleakClient
+) -> None:
+    """Test optional reads are skipped when running low, decoded fields are kept."""
+    mock_client.read_delays[STATUS] = 0.2
+
+    data = await bms.async_update(0.25)
+
+    assert data["water_temperature"] == 25
+    assert "sw_version" not in data
+    assert bms.budget is not None
+    assert basebms.DEVICE_INFO_CHARS["sw_version"] in bms.budget.skipped
+    assert not bms.budget.overruns
+
+
+async def test_budget_commands(
+    ble_device: BLEDevice, mock_client: MockBleakClient, mock_store: MockStore
+) -> None:
+    """Test commands applied during an update do not spend its budget."""
+    offline = preciseob.BMS(ble_device, mock_store)  # type: ignore[arg-type]
+    assert await offline.set_control(filtration_mode=3) is False
+    mock_client.write_delays[CONTROL] = 0.2
+    bms = preciseob.BMS(ble_device, mock_store)  # type: ignore[arg-type]
+
+    data = await bms.async_update(0.1)
+
+    assert data["filtration_mode"] == 3
+    assert bms.budget is not None
+    assert not bms.budget.overruns
+
+
+@pytest.mark.usefixtures("coalescing")
+async def test_release_after_writes(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test a release disconnects only once queued control writes are done."""
+    await bms.async_update()
+    write = asyncio.create_task(bms.set_control(filtration_mode=3))
+    await asyncio.sleep(0)
+
+    await bms.release()
+
+    assert write.done()
+    assert await write is True
+    assert mock_client.control_writes() == [(bytes([3, 2, 0, 0]), False)]
+    assert not mock_client.is_connected
+
+
+@pytest.mark.usefixtures("no_spacing")
+async def test_write_mode_model_seed(
+    ble_device: BLEDevice, mock_client: MockBleakClient
+) -> None:
+    """Test a mode learned by one device is tried first by others of the same model."""
+    mock_client.lose_unacknowledged = True
+    first = preciseob.BMS(ble_device, MockStore())  # type: ignore[arg-type]
+    await first.async_update()
+    await first.set_control(filtration_mode=3)
+    assert first.write_modes == {CONTROL: True}
+    await first.disconnect()
+    mock_client.writes.clear()
+
+    second = preciseob.BMS(ble_device, MockStore())  # type: ignore[arg-type]
+    await second.async_update()
+    await second.set_control(filtration_mode=4)
+
+    assert mock_client.control_writes() == [(bytes([4, 2, 0, 0]), True)]
+    assert second.write_modes == {CONTROL: True}
+
+
+@pytest.mark.usefixtures("no_spacing")
+async def test_write_mode_reset(
+    bms: preciseob.BMS, mock_client: MockBleakClient, mock_store: MockStore
+) -> None:
+    """Test a stale link reset probes the write modes again."""
+    await bms.async_update()
+    await bms.set_control(filtration_mode=3)
+    assert bms.write_modes == {CONTROL: False}
+
+    await bms.release(reset=True)
+
+    assert bms.write_modes == {}
+    assert (mock_store.data or {})["gatt"]["write"] == {}
+    mock_client.lose_unacknowledged = True
+    mock_client.writes.clear()
+    await bms.async_update()
+    await bms.set_control(filtration_mode=4)
+
+    assert mock_client.control_writes() == [
+        (bytes([4, 2, 0, 0]), False),
+        (bytes([4, 2, 0, 0]), True),
+    ]
+    assert mock_client.registers[CONTROL][basebms.CTRL_FILTRATION_MODE] == 4
+
+
+async def test_sample_stamps(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test samples are numbered and stamped with the times they were read."""
+    mock_client.read_delays[STATUS] = 0.05
+    before = time()
+
+    first = await bms.async_update()
+    second = await bms.async_update()
+
+    assert (first["sequence"], second["sequence"]) == (1, 2)
+    for sample in (first, second):
+        assert sample["read_end"] - sample["read_start"] >= 0.05
+        assert before <= sample["timestamp"] <= time()
+    assert second["read_start"] >= first["read_end"]
+
+
+async def test_underload_from_read_times(bms: preciseob.BMS) -> None:
+    """Test the pump underload period is measured between sample reads."""
+    bms.set_pump_underload_settings(True, 5, 0)
+
+    first = await bms.async_update()
+    second = await bms.async_update()
+
+    assert first["underload_protection_state"] is False
+    assert second["underload_protection_state"] is True
+
+    bms.set_pump_underload_settings(False, 5, 0)
+    assert "underload_protection_state" not in await bms.async_update()
+
+
+@pytest.mark.usefixtures("no_spacing")
+async def test_tracing(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test updates and control writes are traced once the buffer is on."""
+    await bms.async_update()
+    assert bms.tracer.spans() == []
+
+    bms.tracer.set_buffer(100)
+    await bms.async_update()
+    await bms.set_control(filtration_mode=3)
+
+    spans = bms.tracer.spans()
+    assert {"span": "read", "target": preciseob.BMS.STATUS_UUID} in [
+        {key: span.get(key) for key in ("span", "target")} for span in spans
+    ]
+    assert any(span.get("span") == "update" for span in spans)
+    assert any(span.get("event") == "test_char" for span in spans)
+    (event,) = (span for span in spans if span.get("event") == "write_control")
+    assert event["control"] == mock_client.control_writes()[-1][0].hex()
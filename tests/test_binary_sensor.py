@@ -0,0 +1,33 @@
+"""Tests for the binary sensor platform."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.asys_ble.binary_sensor import (
+    BINARY_SENSOR_TYPES,
+    BMSBinarySensor,
+)
+
+DESCRIPTION = next(
+    descr for descr in BINARY_SENSOR_TYPES if descr.key == "filtration_state"
+)
+
+
+@pytest.mark.parametrize(
+    ("last_update_success", "restored", "available"),
+    [(True, False, True), (False, True, True), (False, False, False)],
+    ids=["live", "restored", "failed"],
+)
+def test_available(last_update_success: bool, restored: bool, available: bool) -> None:
+    """Test restored values stay available while the device cannot be reached."""
+    coordinator = MagicMock(
+        data={"filtration_state": True},
+        last_update_success=last_update_success,
+        restored=restored,
+    )
+    sensor = BMSBinarySensor(coordinator, DESCRIPTION, "cc:cc:cc:cc:cc:cc")
+
+    assert sensor.available is available
+    assert sensor.assumed_state is restored
+    assert sensor.is_on is True
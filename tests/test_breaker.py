@@ -0,0 +1,79 @@
+"""Tests for the connection circuit breaker."""
+
+import pytest
+
+from custom_components.asys_ble import breaker
+from custom_components.asys_ble.breaker import BreakerState, ConnectionBreaker
+
+
+class MockClock:
+    """Monotonic clock advanced by the test."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> MockClock:
+    """Return the clock of the breaker, backoff without jitter."""
+    mock_clock = MockClock()
+    monkeypatch.setattr(breaker, "monotonic", mock_clock)
+    monkeypatch.setattr(breaker, "uniform", lambda _low, high: high)
+    return mock_clock
+
+
+def test_opens_after_threshold(clock: MockClock) -> None:
+    """Test connection attempts are suspended after consecutive failures."""
+    cb = ConnectionBreaker(threshold=3, base_delay=30, max_delay=1800)
+
+    for _ in range(2):
+        cb.record_failure()
+        assert cb.allow() is True
+    cb.record_failure()
+
+    assert cb.state == BreakerState.OPEN
+    assert cb.allow() is False
+    assert cb.retry_in == 30
+    assert cb.as_dict() == {"state": "open", "failures": 3, "retry_in": 30}
+
+
+def test_half_open_trial(clock: MockClock) -> None:
+    """Test a single trial after the backoff, failing doubles the backoff."""
+    cb = ConnectionBreaker(threshold=1, base_delay=30, max_delay=100)
+    cb.record_failure()
+
+    clock.now += 30
+    assert cb.allow() is True
+    assert cb.state == BreakerState.HALF_OPEN
+
+    cb.record_failure()
+    assert cb.state == BreakerState.OPEN
+    assert cb.retry_in == 60
+
+    clock.now += 60
+    assert cb.allow() is True
+    cb.record_failure()
+    assert cb.retry_in == 100  # limited to the maximum delay
+
+
+def test_success_closes(clock: MockClock) -> None:
+    """Test a successful trial closes the breaker and resets the backoff."""
+    cb = ConnectionBreaker(threshold=2, base_delay=30, max_delay=1800)
+    cb.record_failure()
+    cb.record_failure()
+    clock.now += 30
+    assert cb.allow() is True
+
+    cb.record_success()
+
+    assert cb.state == BreakerState.CLOSED
+    assert cb.as_dict() == {"state": "closed", "failures": 0, "retry_in": 0}
+    cb.record_failure()
+    assert cb.state == BreakerState.CLOSED  # failure count restarted
+    cb.record_failure()
+    assert cb.retry_in == 30  # backoff restarted
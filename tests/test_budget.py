@@ -0,0 +1,25 @@
+"""Tests for the deadline budget of an update cycle."""
+
+import pytest
+
+from custom_components.asys_ble.plugins import budget
+from custom_components.asys_ble.plugins.budget import UpdateBudget
+
+
+def test_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the remaining time is shared and optional operations stop at the reserve."""
+    now = 100.0
+    monkeypatch.setattr(budget, "monotonic", lambda: now)
+    cycle = UpdateBudget(10, 2.5)
+
+    assert cycle.total == 10
+    assert cycle.remaining() == 10
+    assert cycle.remaining(0.5) == 5
+    assert cycle.allows_optional()
+
+    now += 8
+    assert cycle.remaining() == 2
+    assert not cycle.allows_optional()
+
+    now += 5
+    assert cycle.remaining() == 0.01  # minimal slice, the operation fails fast
@@ -0,0 +1,96 @@
+"""Tests for the raw GATT frame capture and its replay."""
+
+import pytest
+
+from custom_components.asys_ble.plugins import preciseob
+from custom_components.asys_ble.plugins.capture import (
+    FrameCapture,
+    FrameKind,
+    dumps,
+    loads,
+    replay,
+)
+
+from .conftest import (
+    CONTROL,
+    ENCRYPT_KEY,
+    RANDOM_KEY,
+    SHARED_KEY,
+    STATUS,
+    STATUS_BLOCK,
+    MockBleakClient,
+)
+
+
+def test_ring_buffer() -> None:
+    """Test the capture keeps the newest frames only."""
+    capture = FrameCapture(maxlen=3)
+    for idx in range(5):
+        capture.record(FrameKind.READ, CONTROL.upper(), bytes([idx]))
+
+    assert len(capture) == 3
+    assert [frame.data for frame in capture] == [b"\x02", b"\x03", b"\x04"]
+    assert {frame.char for frame in capture} == {CONTROL}
+
+    capture.clear()
+    assert not len(capture)
+
+
+def test_file_format() -> None:
+    """Test frames survive the capture file format."""
+    capture = FrameCapture()
+    capture.record(FrameKind.READ, STATUS, STATUS_BLOCK)
+    capture.record(FrameKind.WRITE, CONTROL, b"\x01\x02\x00\x00")
+    capture.record(FrameKind.NOTIFY, STATUS, b"")
+
+    frames = loads(capture.dump())
+
+    assert [(frame.kind, frame.char, frame.data) for frame in frames] == [
+        (FrameKind.READ, STATUS, STATUS_BLOCK),
+        (FrameKind.WRITE, CONTROL, b"\x01\x02\x00\x00"),
+        (FrameKind.NOTIFY, STATUS, b""),
+    ]
+    for original, restored in zip(capture, frames, strict=True):
+        assert restored.timestamp == pytest.approx(original.timestamp, abs=1e-3)
+    assert loads(dumps([])) == []
+
+
+def test_file_format_rejected() -> None:
+    """Test files of another format are refused."""
+    with pytest.raises(ValueError, match="not a supported capture file"):
+        loads(b"NOTACAP" + bytes(16))
+
+
+async def test_replay() -> None:
+    """Test a capture replays through the plugin decoder, one sample per status read."""
+    capture = FrameCapture()
+    for water_temperature in (24, 26):
+        capture.record(FrameKind.READ, RANDOM_KEY, bytes(16))  # redacted key material
+        capture.record(FrameKind.READ, SHARED_KEY, bytes(16))
+        capture.record(FrameKind.READ, CONTROL, b"\x01\x02\x00\x00")
+        status = bytearray(STATUS_BLOCK)
+        status[14] = water_temperature
+        capture.record(FrameKind.READ, STATUS, status)
+
+    samples = await replay(preciseob.BMS, loads(capture.dump()))
+
+    assert [sample["water_temperature"] for sample in samples] == [24, 26]
+    assert all(sample["filtration_mode"] == 1 for sample in samples)
+    assert all(sample["air_temperature"] == -3 for sample in samples)
+
+
+async def test_bms_capture(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test a BMS captures its frames with the key material zeroed, ready for replay."""
+    sample = await bms.async_update()
+
+    frames = loads(bms.capture.dump())
+    chars = {frame.char: frame for frame in frames}
+    for char in (RANDOM_KEY, SHARED_KEY, ENCRYPT_KEY):
+        assert chars[char].data == bytes(len(chars[char].data))
+    assert mock_client.registers[RANDOM_KEY] != bytes(16)
+    assert chars[STATUS].kind == FrameKind.READ
+    assert chars[STATUS].data == STATUS_BLOCK
+    assert chars[ENCRYPT_KEY].kind == FrameKind.WRITE
+
+    (replayed,) = await replay(preciseob.BMS, frames)
+    assert replayed["water_temperature"] == sample["water_temperature"]
@@ -0,0 +1,124 @@
+"""Tests for the connections kept across config entry reloads."""
+
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+from unittest.mock import MagicMock
+
+from bleak.backends.device import BLEDevice
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.asys_ble import connections
+from custom_components.asys_ble.connections import ConnectionRegistry
+from custom_components.asys_ble.const import CONNECTION_GRACE
+from custom_components.asys_ble.plugins import preciseob
+
+from .conftest import MAC, MockBleakClient
+
+
+@pytest.fixture
+def delayed(monkeypatch: pytest.MonkeyPatch) -> list[tuple[Callable[[datetime], Any], MagicMock]]:
+    """Return the actions scheduled after the grace period and their cancel callbacks."""
+    actions: list[tuple[Callable[[datetime], Any], MagicMock]] = []
+
+    def call_later(
+        _hass: HomeAssistant, delay: float, action: Callable[[datetime], Any]
+    ) -> MagicMock:
+        assert delay == CONNECTION_GRACE
+        actions.append((action, MagicMock()))
+        return actions[-1][1]
+
+    monkeypatch.setattr(connections, "async_call_later", call_later)
+    return actions
+
+
+async def _connected(
+    registry: ConnectionRegistry, entry_id: str, bms: preciseob.BMS, ble_device: BLEDevice
+) -> preciseob.BMS:
+    """Acquire the BMS for a config entry and connect it."""
+    acquired = await registry.async_acquire(entry_id, ble_device, lambda: bms)
+    await acquired.async_update()
+    return acquired  # type: ignore[return-value]
+
+
+async def test_reattach(
+    hass: HomeAssistant,
+    ble_device: BLEDevice,
+    bms: preciseob.BMS,
+    mock_client: MockBleakClient,
+    delayed: list[tuple[Callable[[datetime], Any], MagicMock]],
+) -> None:
+    """Test a reloaded config entry gets its connected BMS back."""
+    registry = ConnectionRegistry(hass)
+    await _connected(registry, "entry", bms, ble_device)
+    registry.release(MAC)
+    ((_expire, cancel),) = delayed
+
+    other_path = BLEDevice(MAC, "Preciseo", {"path": "/org/bluez/hci1/dev_CC"}, -50)
+    factory = MagicMock()
+    assert await registry.async_acquire("entry", other_path, factory) is bms
+
+    factory.assert_not_called()
+    cancel.assert_called_once()
+    assert bms._ble_device is other_path  # noqa: SLF001
+    assert mock_client.is_connected
+
+
+async def test_grace_expired(
+    hass: HomeAssistant,
+    ble_device: BLEDevice,
+    bms: preciseob.BMS,
+    mock_client: MockBleakClient,
+    delayed: list[tuple[Callable[[datetime], Any], MagicMock]],
+) -> None:
+    """Test the connection is closed once the grace period expired."""
+    registry = ConnectionRegistry(hass)
+    await _connected(registry, "entry", bms, ble_device)
+    registry.release(MAC)
+
+    await delayed[0][0](datetime.now())
+
+    assert not mock_client.is_connected
+    new_bms = MagicMock()
+    assert await registry.async_acquire("entry", ble_device, lambda: new_bms) is new_bms
+
+
+async def test_entry_replaced(
+    hass: HomeAssistant,
+    ble_device: BLEDevice,
+    bms: preciseob.BMS,
+    mock_client: MockBleakClient,
+    delayed: list[tuple[Callable[[datetime], Any], MagicMock]],
+) -> None:
+    """Test the BMS of a removed config entry is closed for a new entry of the device."""
+    registry = ConnectionRegistry(hass)
+    await _connected(registry, "old", bms, ble_device)
+    registry.release(MAC)
+
+    new_bms = MagicMock()
+    assert await registry.async_acquire("new", ble_device, lambda: new_bms) is new_bms
+    assert not mock_client.is_connected
+
+
+async def test_release_unknown(
+    hass: HomeAssistant, delayed: list[tuple[Callable[[datetime], Any], MagicMock]]
+) -> None:
+    """Test releasing a device without a BMS schedules nothing."""
+    ConnectionRegistry(hass).release(MAC)
+
+    assert delayed == []
+
+
+async def test_stop(
+    hass: HomeAssistant, ble_device: BLEDevice, bms: preciseob.BMS, mock_client: MockBleakClient
+) -> None:
+    """Test all connections are closed when Home Assistant stops."""
+    registry = ConnectionRegistry(hass)
+    await _connected(registry, "entry", bms, ble_device)
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+
+    assert not mock_client.is_connected
@@ -0,0 +1,440 @@
+"""Tests for the update coordinator."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from custom_components.asys_ble import coordinator as coordinator_module
+from custom_components.asys_ble.breaker import BreakerState
+from custom_components.asys_ble.const import (
+    BREAKER_FAILURE_THRESHOLD,
+    DOMAIN,
+    EVENT_COMMAND,
+    FOREIGN_CENTRAL_BACKOFF,
+    FOREIGN_CENTRAL_SILENCE,
+    PAIRING_SCAN_INTERVAL,
+    TIER_FULL,
+    TIER_STATUS,
+    TREND_MIN_SAMPLES,
+)
+from custom_components.asys_ble.coordinator import (
+    BTBmsCoordinator,
+    sample_store_key,
+    trend_store_key,
+)
+from custom_components.asys_ble.history import history_file_name
+from custom_components.asys_ble.plugins import basebms, preciseob
+from custom_components.asys_ble.trends import PumpTrends
+
+from .conftest import MAC, RANDOM_KEY, STATUS, MockBleakClient, MockBluetooth
+
+RESTORED = {
+    "water_temperature": 19,
+    "filtration_mode": 4,
+    "sequence": 812,
+    "read_start": 5021.2,
+    "read_end": 5021.9,
+    "timestamp": 1760000000.0,
+}
+
+
+async def test_restore_sample(
+    hass: HomeAssistant,
+    coordinator: BTBmsCoordinator,
+    mock_config_entry: MockConfigEntry,
+    mock_bluetooth: MockBluetooth,
+) -> None:
+    """Test the persisted sample is shown until the device is reached."""
+    await Store(hass, 1, sample_store_key(mock_config_entry.entry_id)).async_save(RESTORED)
+    mock_bluetooth.present = False
+
+    assert await coordinator.async_restore_sample() is True
+    assert coordinator.restored is True
+    # monotonic stamps of the previous run are meaningless now
+    assert coordinator.data == {
+        "water_temperature": 19,
+        "filtration_mode": 4,
+        "sequence": 812,
+        "timestamp": 1760000000.0,
+    }
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is False
+    assert coordinator.restored is True
+    assert coordinator.data["water_temperature"] == 19
+    assert coordinator.failures == {"not_seen": 1}
+
+    mock_bluetooth.present = True
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert coordinator.restored is False
+    assert coordinator.data["water_temperature"] == 25
+    assert "read_start" in coordinator.data
+
+
+async def test_restore_nothing_persisted(coordinator: BTBmsCoordinator) -> None:
+    """Test nothing is restored on the first start."""
+    assert await coordinator.async_restore_sample() is False
+    assert coordinator.restored is False
+    assert coordinator.data is None
+
+
+async def test_breaker_suspends(
+    coordinator: BTBmsCoordinator, mock_bluetooth: MockBluetooth
+) -> None:
+    """Test connection attempts stop after repeated failures."""
+    mock_bluetooth.present = False
+
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        await coordinator.async_refresh()
+    assert coordinator.breaker.state == BreakerState.OPEN
+
+    mock_bluetooth.present = True
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is False
+    assert coordinator.failures == {
+        "not_seen": BREAKER_FAILURE_THRESHOLD,
+        "suspended": 1,
+    }
+
+
+async def test_pairing_cadence(
+    coordinator: BTBmsCoordinator,
+    mock_client: MockBleakClient,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test an unpaired device is polled slowly and its failure logged once."""
+    caplog.set_level(logging.DEBUG)
+    mock_client.unreadable.add(RANDOM_KEY)
+
+    for _ in range(2):
+        await coordinator.async_refresh()
+        assert coordinator.data["pairing_state"] is True
+        assert coordinator.update_interval == timedelta(seconds=PAIRING_SCAN_INTERVAL)
+
+    assert coordinator.breaker.state == BreakerState.CLOSED
+    assert [
+        record.levelno for record in caplog.records if "association failed" in record.message
+    ] == [logging.WARNING, logging.DEBUG]
+
+    mock_client.unreadable.clear()
+    await coordinator.async_refresh()
+
+    assert coordinator.data["pairing_state"] is False
+    assert coordinator.update_interval < timedelta(seconds=PAIRING_SCAN_INTERVAL)
+
+
+async def test_deferred_command_event(
+    hass: HomeAssistant, coordinator: BTBmsCoordinator
+) -> None:
+    """Test an event reports a command deferred while offline once it is applied."""
+    assert await coordinator.bms.set_control(filtration_mode=3) is False
+    events = async_capture_events(hass, EVENT_COMMAND)
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.data["filtration_mode"] == 3
+    assert [event.data for event in events] == [
+        {"address": MAC, "result": "applied", "fields": {"filtration_mode": 3}}
+    ]
+
+
+async def test_scanner_selection(
+    coordinator: BTBmsCoordinator, mock_bluetooth: MockBluetooth
+) -> None:
+    """Test a new connection goes via the best scanner and its outcome is learned."""
+    mock_bluetooth.scanners = [
+        SimpleNamespace(
+            scanner=SimpleNamespace(source=source),
+            advertisement=SimpleNamespace(rssi=rssi),
+            ble_device=BLEDevice(MAC, "Preciseo", {"source": source}, rssi),
+        )
+        for source, rssi in (("proxy", -85), ("hci0", -65))
+    ]
+
+    await coordinator.async_refresh()
+
+    assert coordinator.bms.ble_device.details == {"source": "hci0"}
+    assert coordinator.scanner == "hci0"
+    assert coordinator.scanners.as_dict()["hci0"]["successes"] == 1
+    assert "proxy" not in coordinator.scanners.as_dict()
+
+
+async def test_update_options(
+    coordinator: BTBmsCoordinator, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test changed options apply to the running device and reschedule the next poll."""
+    schedule_refresh = MagicMock()
+    monkeypatch.setattr(coordinator, "_schedule_refresh", schedule_refresh)
+    remove_listener = coordinator.async_add_listener(lambda: None)
+    schedule_refresh.reset_mock()
+
+    assert coordinator.async_update_options(
+        {
+            "scan_interval": 120,
+            "pump_underload_protection": True,
+            "underload_intensity_threshold": 0.5,
+            "tracing": True,
+        }
+    )
+
+    assert coordinator.update_interval == timedelta(seconds=120)
+    schedule_refresh.assert_called_once()
+    assert coordinator.bms.is_pump_underload_protection_enabled is True
+    assert coordinator.bms.underload_intensity_threshold == 0.5
+    assert coordinator.bms.tracer.enabled is True
+    remove_listener()
+
+
+async def test_update_options_reload(coordinator: BTBmsCoordinator) -> None:
+    """Test options that cannot change live request a reload."""
+    interval = coordinator.update_interval
+
+    assert coordinator.async_update_options({"scan_interval": 120, "history": True}) is False
+
+    assert coordinator.update_interval == interval
+
+
+async def test_release(
+    coordinator: BTBmsCoordinator,
+    mock_client: MockBleakClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a released device is not polled and keeps its values until resumed."""
+    await coordinator.async_refresh()
+    await coordinator.async_release(600)
+
+    assert not mock_client.is_connected
+    assert coordinator.released is True
+    mock_client.reads.clear()
+    await coordinator.async_refresh()
+    assert not mock_client.reads
+    assert coordinator.last_update_success is True
+    assert coordinator.data["water_temperature"] == 25
+
+    request_refresh = AsyncMock()
+    monkeypatch.setattr(coordinator, "async_request_refresh", request_refresh)
+    await coordinator.async_release(0)
+
+    assert coordinator.released is False
+    request_refresh.assert_awaited_once()
+
+
+async def test_release_between_polls(
+    coordinator: BTBmsCoordinator, mock_client: MockBleakClient
+) -> None:
+    """Test the connection is closed after every update if configured."""
+    assert coordinator.async_update_options({"release_between_polls": True})
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert not mock_client.is_connected
+
+
+async def test_free_window(
+    coordinator: BTBmsCoordinator,
+    mock_client: MockBleakClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the device is left alone during the first minutes of every hour."""
+    minute = 5
+    monkeypatch.setattr(
+        coordinator_module.dt_util, "now", lambda *_args: datetime(2026, 6, 1, 14, minute, tzinfo=UTC)
+    )
+    assert coordinator.async_update_options({"free_window": 10})
+    assert coordinator.released is True
+
+    await coordinator.async_refresh()
+    assert not mock_client.reads
+
+    minute = 10
+    assert coordinator.released is False
+    await coordinator.async_refresh()
+    assert coordinator.data["water_temperature"] == 25
+
+
+async def test_foreign_central(
+    coordinator: BTBmsCoordinator,
+    mock_bluetooth: MockBluetooth,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test polling pauses if another central holds the device instead of tripping the breaker."""
+    now = 1000.0
+    monkeypatch.setattr(coordinator_module, "monotonic", lambda: now)
+
+    async def establish(*_args: Any) -> MockBleakClient:
+        raise BleakError("device busy")
+
+    monkeypatch.setattr(basebms.BaseBMS, "_establish", establish)
+    mock_bluetooth.service_info = SimpleNamespace(time=now, rssi=-70)
+
+    await coordinator.async_refresh()  # advertisements still seen
+    assert coordinator.breaker.as_dict()["failures"] == 1
+    assert coordinator.released is False
+
+    now += FOREIGN_CENTRAL_SILENCE + 1
+    await coordinator.async_refresh()
+
+    assert coordinator.breaker.as_dict()["failures"] == 1
+    assert coordinator.release_remaining == FOREIGN_CENTRAL_BACKOFF
+
+
+async def test_history(
+    hass: HomeAssistant,
+    ble_device: BLEDevice,
+    bms: preciseob.BMS,
+    mock_bluetooth: MockBluetooth,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Test samples are appended to the history if enabled."""
+    monkeypatch.setattr(hass.config, "path", lambda *parts: str(tmp_path.joinpath(*parts)))
+    entry = MockConfigEntry(domain=DOMAIN, unique_id=MAC, options={"history": True})
+    entry.add_to_hass(hass)
+    coordinator = BTBmsCoordinator(hass, ble_device, bms, entry)
+    await coordinator.async_open_history()
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    assert coordinator.history is not None
+    assert [record["water_temperature"] for record in coordinator.history.records()] == [25, 25]
+    await coordinator.async_shutdown()
+    assert coordinator.history is None
+    assert (tmp_path / ".storage" / history_file_name(entry.entry_id)).is_file()
+
+
+async def test_trends(
+    hass: HomeAssistant, coordinator: BTBmsCoordinator, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test persisted pump trends are continued and added to the samples."""
+    trends = PumpTrends()
+    for hour in range(TREND_MIN_SAMPLES - 1):
+        trends.update(
+            {"filtration_state": True, "filtration_mode": 1, "runtime": hour, "current": 1.2}
+        )
+    await Store(hass, 1, trend_store_key(mock_config_entry.entry_id)).async_save(
+        trends.as_dict()
+    )
+    await coordinator.async_load_trends()
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data["current_trend"] == pytest.approx(0)
+    assert coordinator.data["pump_health"] == pytest.approx(100)
+
+
+async def test_refresh_max_age(coordinator: BTBmsCoordinator) -> None:
+    """Test the device is only read if the data is older than requested."""
+    assert await coordinator.async_refresh_max_age(60, TIER_FULL) is True
+    assert coordinator.polls == 1
+
+    assert await coordinator.async_refresh_max_age(60, TIER_FULL) is True
+    assert await coordinator.async_refresh_max_age(60, TIER_STATUS) is True
+    assert coordinator.polls == 1
+
+    assert await coordinator.async_refresh_max_age(0) is True
+    assert coordinator.polls == 2
+
+
+async def test_refresh_tiers(
+    coordinator: BTBmsCoordinator, mock_client: MockBleakClient
+) -> None:
+    """Test a status refresh skips optional reads and does not count as full."""
+    sw_version = basebms.DEVICE_INFO_CHARS["sw_version"]
+
+    assert await coordinator.async_refresh_max_age(60, TIER_STATUS) is True
+    assert sw_version not in mock_client.reads
+
+    assert await coordinator.async_refresh_max_age(60, TIER_FULL) is True
+    assert coordinator.polls == 2
+    assert sw_version in mock_client.reads
+
+
+async def test_refresh_joined(coordinator: BTBmsCoordinator) -> None:
+    """Test concurrent callers share one refresh, a full refresh serves status callers."""
+    results = await asyncio.gather(
+        coordinator.async_refresh_max_age(0, TIER_FULL),
+        coordinator.async_refresh_max_age(0, TIER_STATUS),
+        coordinator.async_refresh_max_age(0, TIER_STATUS),
+    )
+
+    assert results == [True, True, True]
+    assert coordinator.polls == 1
+
+
+async def test_refresh_released(coordinator: BTBmsCoordinator) -> None:
+    """Test a refresh fails while the connection is released."""
+    await coordinator.async_refresh()
+    await coordinator.async_release(600)
+
+    assert await coordinator.async_refresh_max_age(0) is False
+
+
+async def test_refresh_budget_cut(
+    coordinator: BTBmsCoordinator, mock_client: MockBleakClient
+) -> None:
+    """Test a full refresh whose optional reads were cut only counts as fresh status."""
+    assert coordinator.async_update_options({"scan_interval": 0.5})
+    mock_client.read_delays[STATUS] = 0.35
+
+    assert await coordinator.async_refresh_max_age(0, TIER_FULL) is True
+    assert coordinator.bms.budget is not None
+    assert coordinator.bms.budget.skipped
+
+    mock_client.read_delays.clear()
+    assert await coordinator.async_refresh_max_age(60, TIER_STATUS) is True
+    assert coordinator.polls == 1
+    assert await coordinator.async_refresh_max_age(60, TIER_FULL) is True
+    assert coordinator.polls == 2
+
+
+async def test_poll_aligned(coordinator: BTBmsCoordinator) -> None:
+    """Test status reads feed the phase tracker, which places the next poll."""
+    interval = coordinator.update_interval.total_seconds()
+
+    for _ in range(3):
+        await coordinator.async_refresh()
+
+    assert coordinator.phase.as_dict()["polls"] == 2
+    assert coordinator.phase.period is None
+    assert (
+        0.75 * interval
+        <= coordinator.update_interval.total_seconds()
+        <= 1.25 * interval
+    )
+
+
+async def test_latency(coordinator: BTBmsCoordinator, mock_client: MockBleakClient) -> None:
+    """Test read time and latency to the states are recorded once per sample."""
+    mock_client.read_delays[STATUS] = 0.05
+
+    await coordinator.async_refresh()
+    coordinator.async_update_listeners()
+
+    assert coordinator.read_time.count == coordinator.latency.count == 1
+    assert coordinator.read_time.max >= 0.05
+    assert coordinator.latency.max < coordinator.read_time.max
+
+    await coordinator.async_refresh()
+
+    assert coordinator.read_time.count == coordinator.latency.count == 2
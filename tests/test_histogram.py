@@ -0,0 +1,63 @@
+"""Tests for the latency histograms."""
+
+import pytest
+
+from custom_components.asys_ble.histogram import LatencyHistogram
+
+
+def test_empty() -> None:
+    """Test an empty histogram has no statistics."""
+    histogram = LatencyHistogram((0.1, 1))
+
+    assert histogram.quantile(0.5) is None
+    assert histogram.as_dict() == {
+        "count": 0,
+        "mean_ms": None,
+        "p50_ms": None,
+        "p95_ms": None,
+        "max_ms": 0,
+        "buckets": {"<=100": 0, "<=1000": 0, ">1000": 0},
+    }
+
+
+def test_record() -> None:
+    """Test latencies are counted in their buckets, bounds included."""
+    histogram = LatencyHistogram((0.1, 1))
+    for latency in (0.05, 0.1, 0.5, 0.7, 2.5):
+        histogram.record(latency)
+
+    stats = histogram.as_dict()
+
+    assert stats["count"] == 5
+    assert stats["mean_ms"] == pytest.approx(770)
+    assert stats["max_ms"] == 2500
+    assert stats["buckets"] == {"<=100": 2, "<=1000": 2, ">1000": 1}
+
+
+@pytest.mark.parametrize(
+    ("quantile", "expected"), [(0.2, 0.1), (0.4, 0.1), (0.5, 1), (0.8, 1), (0.95, 2.5)]
+)
+def test_quantile(quantile: float, expected: float) -> None:
+    """Test quantiles are the upper bound of their bucket, the maximum beyond."""
+    histogram = LatencyHistogram((0.1, 1))
+    for latency in (0.05, 0.1, 0.5, 0.7, 2.5):
+        histogram.record(latency)
+
+    assert histogram.quantile(quantile) == expected
+
+
+def test_merge() -> None:
+    """Test histograms with the same buckets merge, others are refused."""
+    histogram = LatencyHistogram((0.1, 1))
+    histogram.record(0.05)
+    other = LatencyHistogram((0.1, 1))
+    other.record(0.5)
+    other.record(2.5)
+
+    histogram.merge(other)
+
+    assert histogram.count == 3
+    assert histogram.max == 2.5
+    assert histogram.as_dict()["buckets"] == {"<=100": 1, "<=1000": 1, ">1000": 1}
+    with pytest.raises(ValueError, match="buckets differ"):
+        histogram.merge(LatencyHistogram((0.1,)))
@@ -0,0 +1,116 @@
+"""Tests for the memory-mapped sample history."""
+
+import csv
+from pathlib import Path
+
+import pytest
+
+from custom_components.asys_ble.history import FLAGS, SampleHistory, history_file_name
+
+SAMPLE = {
+    "water_temperature": 25.3,
+    "air_temperature": -3,
+    "current": 1.2,
+    "filtration_state": True,
+    "light_state": True,
+    "filtration_mode": 4,
+    "filtration_mode_state": 2,
+}
+
+
+@pytest.fixture
+def history_path(tmp_path: Path) -> Path:
+    """Return the path of the history file."""
+    return tmp_path / "asys_ble" / history_file_name("entry")
+
+
+def test_records(history_path: Path) -> None:
+    """Test samples are stored as fixed-width records, missing values kept apart."""
+    history = SampleHistory(history_path, capacity=4)
+    history.open()
+    history.append(SAMPLE, 1000.0)  # type: ignore[arg-type]
+    history.append({"pairing_state": True}, 1030.0)
+
+    first, second = history.records()
+
+    assert first == {
+        "time": 1000.0,
+        "water_temperature": 25.3,
+        "air_temperature": -3,
+        "current": 1.2,
+        "cycles": 0,
+        "runtime": 0,
+        **{key: key in ("filtration_state", "light_state") for key in FLAGS},
+        "filtration_mode": 4,
+        "filtration_mode_state": 2,
+    }
+    assert second["water_temperature"] is None
+    assert second["current"] is None
+    assert second["pairing_state"] is True
+    history.close()
+
+
+def test_ring(history_path: Path) -> None:
+    """Test the oldest records are overwritten and the history survives a restart."""
+    history = SampleHistory(history_path, capacity=3)
+    history.open()
+    for idx in range(5):
+        history.append({"filtration_mode": idx}, 1000.0 + idx)
+    history.close()
+
+    reopened = SampleHistory(history_path, capacity=3)
+    reopened.open()
+
+    assert len(reopened) == 3
+    assert [record["filtration_mode"] for record in reopened.records()] == [2, 3, 4]
+    reopened.close()
+
+    resized = SampleHistory(history_path, capacity=8)
+    resized.open()
+    assert not len(resized)
+    resized.close()
+
+
+def test_append_closed(history_path: Path) -> None:
+    """Test appending to a closed history is ignored."""
+    history = SampleHistory(history_path)
+
+    history.append(SAMPLE)  # type: ignore[arg-type]
+
+    assert not len(history)
+    assert not list(history.records())
+
+
+def test_export_csv(history_path: Path, tmp_path: Path) -> None:
+    """Test the CSV export holds a header and one row per record."""
+    history = SampleHistory(history_path, capacity=2)
+    history.open()
+    for timestamp in (1000.0, 1030.0, 1060.0):
+        history.append({"current": 1.2}, timestamp)
+
+    assert history.export_csv(tmp_path / "history.csv") == 2
+
+    with (tmp_path / "history.csv").open(encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["time"] for row in rows] == ["1030.0", "1060.0"]
+    assert rows[0]["current"] == "1.2"
+    assert rows[0]["water_temperature"] == ""
+    history.close()
+
+
+def test_export_npy(history_path: Path, tmp_path: Path) -> None:
+    """Test the NumPy export holds the raw records of a wrapped ring."""
+    np = pytest.importorskip("numpy")
+    history = SampleHistory(history_path, capacity=2)
+    history.open()
+    for timestamp in (1000.0, 1030.0, 1060.0):
+        history.append(SAMPLE | {"filtration_mode": int(timestamp) % 7}, timestamp)  # type: ignore[arg-type]
+
+    assert history.export_npy(tmp_path / "history.npy") == 2
+
+    records = np.load(tmp_path / "history.npy")
+    assert records["time"].tolist() == [1030.0, 1060.0]
+    assert records["water_temperature"].tolist() == [253, 253]
+    assert records["air_temperature"].tolist() == [-30, -30]
+    assert records["filtration_mode"].tolist() == [1030 % 7, 1060 % 7]
+    history.close()
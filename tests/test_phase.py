@@ -0,0 +1,74 @@
+"""Tests for the alignment of polls to the status refresh of the device."""
+
+import random
+
+import pytest
+
+from custom_components.asys_ble.const import ALIGN_HISTORY
+from custom_components.asys_ble.phase import PhaseTracker
+
+INTERVAL = 30.0  # [s] poll interval
+READ_TIME = 0.3  # [s] from the status read to scheduling the next poll
+
+
+def _poll(
+    tracker: PhaseTracker, period: float, polls: int, jitter: float = 0.2
+) -> list[float]:
+    """Poll a device refreshing its status every period, return the poll delays."""
+    rng = random.Random(3)
+    time = 1000.0
+    delays: list[float] = []
+    for _ in range(polls):
+        read = time + rng.uniform(0, jitter)
+        tracker.observe(read, int((read - 5.0) // period).to_bytes(8, "little"))
+        delays.append(tracker.next_poll(read + READ_TIME, INTERVAL))
+        time = read + READ_TIME + delays[-1]
+    return delays
+
+
+def test_dither_while_learning() -> None:
+    """Test poll delays are spread around the interval while the period is unknown."""
+    tracker = PhaseTracker()
+    delays = _poll(tracker, 20.0, ALIGN_HISTORY - 1)
+
+    assert tracker.period is None
+    assert all(0.75 * INTERVAL <= delay <= 1.25 * INTERVAL for delay in delays)
+    assert max(delays) - min(delays) > 0.4 * INTERVAL
+
+
+@pytest.mark.parametrize("period", [37.0, 60.0, 120.0])
+def test_learn_period(period: float) -> None:
+    """Test the refresh period is learned and most aligned polls read a fresh status."""
+    tracker = PhaseTracker()
+    delays = _poll(tracker, period, 400)
+
+    assert tracker.period == pytest.approx(period, rel=0.005)
+    assert tracker.hits > 10 * tracker.misses
+    # alignment stretches polls to the refresh period, never beyond
+    assert sum(delays[-200:]) / 200 <= max(INTERVAL, period) * 1.05
+
+    stats = tracker.as_dict()
+    assert stats["polls"] == ALIGN_HISTORY
+    assert (stats["hits"], stats["misses"]) == (tracker.hits, tracker.misses)
+    low, high = stats["bracket"]
+    assert 0 <= low <= high < period
+
+
+def test_refresh_faster_than_polls() -> None:
+    """Test no period is claimed when every poll sees a fresh status."""
+    tracker = PhaseTracker()
+    _poll(tracker, 20.0, 200)
+
+    assert tracker.period is None
+    assert tracker.as_dict()["period"] is None
+    assert (tracker.hits, tracker.misses) == (0, 0)
+
+
+def test_repeated_observation() -> None:
+    """Test a status read observed twice does not count as an interval."""
+    tracker = PhaseTracker()
+    tracker.observe(10.0, b"\x00")
+    tracker.observe(10.0, b"\x01")
+    tracker.observe(5.0, b"\x01")
+
+    assert tracker.as_dict()["polls"] == 0
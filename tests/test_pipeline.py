@@ -0,0 +1,98 @@
+"""Tests for the sample processing pipeline."""
+
+import asyncio
+from typing import Any
+
+from custom_components.asys_ble.plugins.pipeline import STREAM_QUEUE_SIZE, SamplePipeline
+
+
+def _decoder(*samples: dict[str, Any]) -> Any:
+    """Return a decode function returning copies of the samples in turn."""
+    pending = list(samples)
+
+    async def decode() -> dict[str, Any]:
+        return dict(pending.pop(0))
+
+    return decode
+
+
+async def test_stages() -> None:
+    """Test stages run in order and see the previous sample."""
+    pipeline = SamplePipeline()
+    pipeline.seed({"total": 10})
+    pipeline.register("double", lambda data, _prev: data.update(value=data["value"] * 2))
+    pipeline.register(
+        "sum", lambda data, prev: data.update(total=prev.get("total", 0) + data["value"])
+    )
+    decode = _decoder({"value": 1}, {"value": 2})
+
+    assert await pipeline.run(decode) == {"value": 2, "total": 12}
+    assert await pipeline.run(decode) == {"value": 4, "total": 16}
+    assert list(pipeline.as_dict()) == ["decode", "double", "sum"]
+    assert pipeline.as_dict()["sum"]["runs"] == 2
+
+
+async def test_register_replaces() -> None:
+    """Test a stage registered again keeps its position."""
+    pipeline = SamplePipeline()
+    for name, label in (("first", "a"), ("second", "b"), ("first", "c")):
+        pipeline.register(
+            name, lambda data, _prev, label=label: data.setdefault("order", []).append(label)
+        )
+
+    assert (await pipeline.run(_decoder({"value": 1})))["order"] == ["c", "b"]
+    assert list(pipeline.as_dict()) == ["decode", "first", "second"]
+
+
+async def test_stage_skipped() -> None:
+    """Test a stage is skipped while its inputs are unchanged, its outputs reapplied."""
+    calls: list[int] = []
+
+    def limit(data: dict[str, Any], _prev: dict[str, Any]) -> None:
+        calls.append(data["value"])
+        if data["value"] > 5:
+            data.pop("value")
+            data["clipped"] = True
+
+    pipeline = SamplePipeline()
+    pipeline.register("limit", limit, ["value"])
+    decode = _decoder({"value": 9}, {"value": 9, "other": 1}, {"value": 3})
+
+    assert await pipeline.run(decode) == {"clipped": True}
+    assert await pipeline.run(decode) == {"other": 1, "clipped": True}
+    assert await pipeline.run(decode) == {"value": 3}
+    assert calls == [9, 3]
+    assert pipeline.as_dict()["limit"] | {"duration_ms": 0} == {
+        "runs": 2,
+        "skips": 1,
+        "duration_ms": 0,
+    }
+
+
+async def test_empty_sample() -> None:
+    """Test an empty sample is returned without running the stages."""
+    pipeline = SamplePipeline()
+    pipeline.register("fail", lambda _data, _prev: (_ for _ in ()).throw(AssertionError))
+
+    assert await pipeline.run(_decoder({})) == {}
+    assert pipeline.as_dict()["decode"]["runs"] == 1
+
+
+async def test_stream() -> None:
+    """Test consumers get every sample, a slow consumer loses the oldest ones."""
+    pipeline = SamplePipeline()
+    stream = pipeline.stream()
+    first = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+
+    await pipeline.run(_decoder({"value": 0}))
+    assert await first == {"value": 0}
+
+    total = STREAM_QUEUE_SIZE + 2
+    decode = _decoder(*({"value": idx} for idx in range(1, total + 1)))
+    for _ in range(total):
+        await pipeline.run(decode)
+
+    received = [(await anext(stream))["value"] for _ in range(STREAM_QUEUE_SIZE)]
+    assert received == list(range(3, total + 1))
+    await stream.aclose()
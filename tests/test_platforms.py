@@ -0,0 +1,34 @@
+"""Tests for the entity platforms."""
+
+from types import ModuleType
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.asys_ble import binary_sensor, button, light, select, sensor
+
+from .conftest import MAC
+
+
+@pytest.mark.parametrize(
+    ("platform", "count"),
+    [
+        (binary_sensor, len(binary_sensor.BINARY_SENSOR_TYPES)),
+        (button, len(button.BUTTON_TYPES)),
+        (light, len(light.LIGHT_TYPES)),
+        (select, 2),
+        (sensor, len(sensor.SENSOR_TYPES)),
+    ],
+    ids=["binary_sensor", "button", "light", "select", "sensor"],
+)
+async def test_setup_entry(platform: ModuleType, count: int) -> None:
+    """Test each platform registers all its entities with a single call."""
+    config_entry = MagicMock(runtime_data=MagicMock(data={}), unique_id=MAC)
+    async_add_entities = MagicMock()
+
+    await platform.async_setup_entry(MagicMock(), config_entry, async_add_entities)
+
+    async_add_entities.assert_called_once()
+    entities = list(async_add_entities.call_args.args[0])
+    assert len(entities) == count
+    assert len({entity._attr_unique_id for entity in entities}) == count  # noqa: SLF001
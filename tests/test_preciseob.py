@@ -0,0 +1,106 @@
+"""Tests for the Preciseo B plugin."""
+
+import logging
+
+import pytest
+
+from custom_components.asys_ble.const import PUMP_VOLTAGE
+from custom_components.asys_ble.plugins import basebms, preciseob
+
+from .conftest import STATUS, MockBleakClient
+
+
+@pytest.mark.parametrize("tracing", [False, True], ids=["tracing_off", "tracing_on"])
+async def test_update(
+    bms: preciseob.BMS,
+    mock_client: MockBleakClient,
+    caplog: pytest.LogCaptureFixture,
+    tracing: bool,
+) -> None:
+    """Test an update decodes the controller registers, whether traced or not."""
+    caplog.set_level(logging.DEBUG if tracing else logging.INFO)
+    bms.tracer.set_buffer(50 if tracing else 0)
+    assert bms.tracer.enabled is tracing
+
+    data = await bms.async_update()
+
+    assert data["pairing_state"] is False
+    assert data["filtration_mode"] == 1
+    assert data["filtration_mode_state"] == 2
+    assert data["filtration_state"] is True
+    assert data["current"] == 1.2
+    assert data["water_temperature"] == 25
+    assert data["air_temperature"] == -3
+    assert data["sw_version"] == "sw_version"
+    events = {
+        (span["event"], span["char"]): span["value"]
+        for span in bms.tracer.spans()
+        if span.get("event") in ("test_char", "unknown_char")
+    }
+    if tracing:
+        assert events == {
+            **{("test_char", name): "2a" for name in preciseob.BMS.TEST_CHARS},
+            **{("unknown_char", name): "2a" for name in preciseob.BMS.UNKNOWN_CHARS},
+        }
+    else:
+        assert not bms.tracer.spans()
+
+
+async def test_update_not_paired(bms: preciseob.BMS, mock_client: MockBleakClient) -> None:
+    """Test a controller refusing the association reports its pairing state."""
+    mock_client.unreadable.add(preciseob.BMS.CHARACTERISTIC_SYSTEM_RANDOMKEY_UUID.lower())
+
+    data = await bms.async_update()
+
+    assert data["pairing_state"] is True
+    assert "filtration_mode" not in data
+
+
+@pytest.mark.parametrize(
+    ("raw", "water_temperature", "air_temperature"),
+    [((25, 0xFD), 25, -3), ((0xC8, 0xB0), None, None)],
+    ids=["valid", "implausible"],
+)
+async def test_update_limits(
+    bms: preciseob.BMS,
+    mock_client: MockBleakClient,
+    raw: tuple[int, int],
+    water_temperature: int | None,
+    air_temperature: int | None,
+) -> None:
+    """Test temperatures outside their physical range are dropped."""
+    mock_client.registers[STATUS][14] = raw[0]
+    mock_client.registers[STATUS][16] = raw[1]
+
+    data = await bms.async_update()
+
+    assert data.get("water_temperature") == water_temperature
+    assert data.get("air_temperature") == air_temperature
+    assert data["current"] == 1.2
+
+
+async def test_update_carries_device_info(
+    bms: preciseob.BMS, mock_client: MockBleakClient
+) -> None:
+    """Test device information of the previous sample is kept if it was not read."""
+    await bms.async_update()
+
+    data = await bms.async_update(status_only=True)
+
+    assert data["sw_version"] == "sw_version"
+    assert mock_client.reads.count(basebms.DEVICE_INFO_CHARS["sw_version"]) == 1
+
+
+async def test_update_pump_energy(bms: preciseob.BMS) -> None:
+    """Test the pump energy is integrated from its current once seeded."""
+    assert "pump_energy" not in await bms.async_update()
+    bms.pipeline.seed({"pump_energy": 100.0})
+
+    first = await bms.async_update()
+    second = await bms.async_update()
+
+    assert first["pump_energy"] > 100.0
+    assert second["pump_energy"] == pytest.approx(
+        first["pump_energy"]
+        + 1.2 * PUMP_VOLTAGE * (second["read_start"] - first["read_start"]) / 3600
+    )
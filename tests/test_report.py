@@ -0,0 +1,101 @@
+"""Tests for the fleet-wide performance report."""
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+from bleak.backends.device import BLEDevice
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.asys_ble import services
+from custom_components.asys_ble.const import ATTR_FILE, DOMAIN
+from custom_components.asys_ble.coordinator import BTBmsCoordinator
+from custom_components.asys_ble.plugins import preciseob
+from custom_components.asys_ble.report import fleet_report
+
+from .conftest import MockBluetooth, MockStore
+
+MAC_2 = "DD:DD:DD:DD:DD:DD"
+
+
+@pytest.fixture
+async def fleet(
+    hass: HomeAssistant,
+    coordinator: BTBmsCoordinator,
+    mock_config_entry: MockConfigEntry,
+    mock_bluetooth: MockBluetooth,
+) -> list[MockConfigEntry]:
+    """Return the loaded entries of two devices, the second one out of range."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Preciseo 2",
+        unique_id=MAC_2,
+        data=mock_config_entry.data,
+        state=ConfigEntryState.LOADED,
+    )
+    entry.add_to_hass(hass)
+    device = BLEDevice(MAC_2, "Preciseo", {"path": "/org/bluez/hci0/dev_DD"}, -80)
+    second = BTBmsCoordinator(
+        hass, device, preciseob.BMS(device, MockStore()), entry  # type: ignore[arg-type]
+    )
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    mock_bluetooth.present = False
+    await second.async_refresh()
+
+    mock_config_entry.runtime_data = coordinator
+    mock_config_entry.state = ConfigEntryState.LOADED  # type: ignore[misc]
+    entry.runtime_data = second
+    return [mock_config_entry, entry]
+
+
+async def test_fleet_report(fleet: list[MockConfigEntry]) -> None:
+    """Test the report merges the devices and ranks them by link quality."""
+    report: dict[str, Any] = fleet_report(fleet)
+
+    good, bad = report["devices"]
+    assert (good["title"], good["polls"], good["failures"]) == ("Preciseo", 2, {})
+    assert bad["title"] == "Preciseo 2"
+    assert bad["failures"] == {"not_seen": 1}
+    assert bad["link_quality"] < good["link_quality"]
+    assert good["read_time"]["count"] == 2
+
+    totals = report["fleet"]
+    assert totals["devices"] == 2
+    assert totals["polls"] == good["polls"] + bad["polls"]
+    assert totals["failures"] == bad["failures"]
+    assert totals["read_time"]["count"] == good["read_time"]["count"]
+    assert totals["worst_link_quality"] == [bad["address"], good["address"]]
+
+
+async def test_fleet_report_empty() -> None:
+    """Test the report of no loaded devices."""
+    report: dict[str, Any] = fleet_report([])
+
+    assert report["fleet"]["devices"] == 0
+    assert report["fleet"]["worst_link_quality"] == []
+    assert report["devices"] == []
+
+
+@pytest.mark.parametrize("file", [False, True])
+async def test_fleet_report_service(
+    hass: HomeAssistant,
+    fleet: list[MockConfigEntry],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    file: bool,
+) -> None:
+    """Test the service reports the loaded entries, optionally to a file."""
+    monkeypatch.setattr(hass.config, "path", lambda *parts: str(tmp_path.joinpath(*parts)))
+    fleet[1].state = ConfigEntryState.NOT_LOADED  # type: ignore[misc]
+
+    response: Any = await services._async_fleet_report(  # noqa: SLF001
+        MagicMock(hass=hass, data={ATTR_FILE: file})
+    )
+
+    assert [device["title"] for device in response["devices"]] == ["Preciseo"]
+    assert ("path" in response) is file
+    assert (tmp_path / DOMAIN / "fleet_report.json").is_file() is file
@@ -0,0 +1,50 @@
+"""Tests for the per-scanner connection statistics."""
+
+from types import SimpleNamespace
+from typing import Any
+
+from custom_components.asys_ble.const import SCANNER_PRIOR_LATENCY
+from custom_components.asys_ble.scanners import ScannerSelector
+
+
+def _candidate(source: str, rssi: int) -> Any:
+    """Return a device as seen by a scanner."""
+    return SimpleNamespace(
+        scanner=SimpleNamespace(source=source),
+        advertisement=SimpleNamespace(rssi=rssi),
+        ble_device=SimpleNamespace(address=source),
+    )
+
+
+def _sources(ranked: list[Any]) -> list[str]:
+    return [dev.scanner.source for dev in ranked]
+
+
+def test_rank_rssi() -> None:
+    """Test scanners without statistics are ordered by RSSI."""
+    selector = ScannerSelector()
+
+    ranked = selector.rank([_candidate("proxy", -80), _candidate("hci0", -60)])
+
+    assert _sources(ranked) == ["hci0", "proxy"]
+
+
+def test_rank_learned() -> None:
+    """Test fast, reliable scanners are preferred over a stronger signal."""
+    selector = ScannerSelector()
+    for _ in range(3):
+        selector.record("hci0", success=False)
+        selector.record("proxy", success=True, latency=1.0)
+
+    ranked = selector.rank([_candidate("hci0", -50), _candidate("proxy", -90)])
+
+    assert _sources(ranked) == ["proxy", "hci0"]
+    stats = selector.as_dict()
+    assert stats["hci0"] == {
+        "attempts": 3,
+        "successes": 0,
+        "success_rate": 0.2,
+        "latency": SCANNER_PRIOR_LATENCY,
+    }
+    assert stats["proxy"]["success_rate"] == 0.8
+    assert 1.0 < stats["proxy"]["latency"] < SCANNER_PRIOR_LATENCY
@@ -0,0 +1,34 @@
+"""Tests for the select platform."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.asys_ble.const import OPTIONS_FILTRATION_MODE
+from custom_components.asys_ble.select import (
+    AsysSelectFiltrationModeEntity,
+    AsysSelectFiltrationModeStateEntity,
+    filtrationModeEntityDescription,
+    filtrationStateModeEntityDescription,
+)
+
+from .conftest import MAC
+
+
+async def test_select_option() -> None:
+    """Test selecting options writes them and schedules a single refresh afterwards."""
+    coordinator = MagicMock(data={"pairing_state": False}, _device=AsyncMock())
+    mode = AsysSelectFiltrationModeEntity(coordinator, filtrationModeEntityDescription, MAC)
+    state = AsysSelectFiltrationModeStateEntity(
+        coordinator, filtrationStateModeEntityDescription, MAC
+    )
+    for entity in (mode, state):
+        entity.async_write_ha_state = MagicMock()
+
+    await mode.async_select_option(OPTIONS_FILTRATION_MODE[2])
+    await state.async_select_option("ON")
+
+    coordinator._device.set_filtration_mode.assert_awaited_once_with(2)  # noqa: SLF001
+    coordinator._device.set_filtration_mode_state.assert_awaited_once_with("ON")  # noqa: SLF001
+    assert mode.current_option == OPTIONS_FILTRATION_MODE[2]
+    assert state.current_option == "ON"
+    assert coordinator.async_schedule_command_refresh.call_count == 2
+    coordinator.async_request_refresh.assert_not_called()
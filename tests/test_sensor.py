@@ -0,0 +1,30 @@
+"""Tests for the sensor platform."""
+
+from unittest.mock import MagicMock
+
+from homeassistant.const import ATTR_TEMPERATURE
+import pytest
+
+from custom_components.asys_ble.sensor import SENSOR_TYPES, BMSSensor
+
+# water temperature, listed before the air temperature
+DESCRIPTION = next(descr for descr in SENSOR_TYPES if descr.key == ATTR_TEMPERATURE)
+
+
+@pytest.mark.parametrize(
+    ("last_update_success", "restored", "available"),
+    [(True, False, True), (False, True, True), (False, False, False)],
+    ids=["live", "restored", "failed"],
+)
+def test_available(last_update_success: bool, restored: bool, available: bool) -> None:
+    """Test restored values stay available while the device cannot be reached."""
+    coordinator = MagicMock(
+        data={"water_temperature": 25},
+        last_update_success=last_update_success,
+        restored=restored,
+    )
+    sensor = BMSSensor(coordinator, DESCRIPTION, "cc:cc:cc:cc:cc:cc")
+
+    assert sensor.available is available
+    assert sensor.assumed_state is restored
+    assert sensor.native_value == 25
@@ -0,0 +1,109 @@
+"""Tests for the integration services."""
+
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from bleak.exc import BleakError
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.exceptions import HomeAssistantError
+import pytest
+
+from custom_components.asys_ble import services
+from custom_components.asys_ble.const import (
+    ATTR_FILTRATION_MODE,
+    ATTR_FILTRATION_STATE,
+    ATTR_LIGHT,
+    ATTR_LIGHT_COLOR_STEP,
+    ATTR_MAX_AGE,
+    ATTR_TIER,
+    OPTIONS_FILTRATION_MODE,
+    TIER_FULL,
+)
+from custom_components.asys_ble.plugins import basebms, preciseob
+
+from .conftest import CONTROL, MockBleakClient
+
+SET_CONTROL = {
+    ATTR_DEVICE_ID: "device",
+    ATTR_FILTRATION_MODE: OPTIONS_FILTRATION_MODE[3],
+    ATTR_FILTRATION_STATE: "ON",
+    ATTR_LIGHT: True,
+    ATTR_LIGHT_COLOR_STEP: False,
+}
+
+
+@pytest.fixture
+def coordinator(monkeypatch: pytest.MonkeyPatch, bms: preciseob.BMS) -> MagicMock:
+    """Return the coordinator the services find for the device."""
+    coordinator = MagicMock(bms=bms, data={})
+    monkeypatch.setattr(services, "_coordinator", lambda *_args: coordinator)
+    return coordinator
+
+
+def _call(data: dict[str, Any]) -> MagicMock:
+    """Return a service call with already validated data."""
+    return MagicMock(data=data)
+
+
+async def test_set_control(
+    bms: preciseob.BMS, mock_client: MockBleakClient, coordinator: MagicMock
+) -> None:
+    """Test the service sets all fields with a single write and updates the entities."""
+    await services._async_set_control(_call(SET_CONTROL))  # noqa: SLF001
+
+    assert mock_client.control_writes() == [(bytes([3, 1, 1, 0]), False)]
+    assert coordinator.data == {
+        "filtration_mode": 3,
+        "filtration_mode_state": 1,
+        "light_state": True,
+    }
+    coordinator.async_update_listeners.assert_called_once()
+    coordinator.async_schedule_command_refresh.assert_called_once()
+
+
+async def test_set_control_unreachable(
+    bms: preciseob.BMS,
+    mock_client: MockBleakClient,
+    coordinator: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the command is deferred if the device cannot be reached."""
+
+    async def establish(*_args: Any) -> MockBleakClient:
+        raise BleakError("device not found")
+
+    monkeypatch.setattr(basebms.BaseBMS, "_establish", establish)
+
+    await services._async_set_control(_call(SET_CONTROL))  # noqa: SLF001
+
+    assert not mock_client.writes
+    assert bms.commands == {"deferred": 1}
+    coordinator.async_schedule_command_refresh.assert_not_called()
+
+
+async def test_set_control_failed(mock_client: MockBleakClient, coordinator: MagicMock) -> None:
+    """Test a failed write of a connected device is reported."""
+    mock_client.unreadable.add(CONTROL)
+
+    with pytest.raises(HomeAssistantError) as exc_info:
+        await services._async_set_control(_call(SET_CONTROL))  # noqa: SLF001
+
+    assert exc_info.value.translation_key == "command_failed"
+
+    assert not mock_client.control_writes()
+    assert coordinator.data == {}
+
+
+@pytest.mark.parametrize("success", [True, False])
+async def test_refresh(coordinator: MagicMock, success: bool) -> None:
+    """Test the refresh service passes max_age and tier and reports failures."""
+    coordinator.async_refresh_max_age = AsyncMock(return_value=success)
+    call = _call({ATTR_DEVICE_ID: "device", ATTR_MAX_AGE: 60.0, ATTR_TIER: TIER_FULL})
+
+    if success:
+        await services._async_refresh(call)  # noqa: SLF001
+    else:
+        with pytest.raises(HomeAssistantError):
+            await services._async_refresh(call)  # noqa: SLF001
+
+    coordinator.async_refresh_max_age.assert_awaited_once_with(60.0, TIER_FULL)
@@ -0,0 +1,83 @@
+"""Tests for the tracing of BMS operations."""
+
+import logging
+
+import pytest
+
+from custom_components.asys_ble.plugins.tracing import Tracer
+
+LOGGER = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def tracer() -> Tracer:
+    """Return a tracer logging above debug level."""
+    LOGGER.setLevel(logging.INFO)
+    return Tracer(LOGGER)
+
+
+def test_disabled(tracer: Tracer) -> None:
+    """Test nothing is recorded while debug logging and the buffer are off."""
+    assert not tracer.enabled
+    assert tracer.span("read") is tracer.span("write")  # shared no-op
+
+    with tracer.span("read", "status"):
+        pass
+    tracer.event("write_control", control=b"\x01")
+
+    assert tracer.spans() == []
+
+
+def test_buffer(tracer: Tracer) -> None:
+    """Test spans and events are kept in the buffer, bytes as hex."""
+    tracer.set_buffer(10)
+    assert tracer.enabled
+
+    with tracer.span("read", "status"):
+        pass
+    tracer.event("write_control", control=b"\x01\x02", mode=True)
+
+    span, event = tracer.spans()
+    assert span["span"] == "read"
+    assert span["target"] == "status"
+    assert span["duration_ms"] >= 0
+    assert "error" not in span
+    assert event["event"] == "write_control"
+    assert (event["control"], event["mode"]) == ("0102", True)
+
+
+def test_span_error(tracer: Tracer) -> None:
+    """Test a failing operation is recorded with its error and the error passed on."""
+    tracer.set_buffer(10)
+
+    with pytest.raises(TimeoutError), tracer.span("read", "status"):
+        raise TimeoutError
+
+    assert tracer.spans()[0]["error"] == "TimeoutError"
+
+
+def test_buffer_resize(tracer: Tracer) -> None:
+    """Test the buffer keeps the newest entries and is dropped when disabled."""
+    tracer.set_buffer(10)
+    for idx in range(5):
+        tracer.event("poll", idx=idx)
+
+    tracer.set_buffer(2)
+    assert [entry["idx"] for entry in tracer.spans()] == [3, 4]
+
+    tracer.set_buffer(0)
+    assert not tracer.enabled
+    assert tracer.spans() == []
+
+
+def test_debug_logging(tracer: Tracer, caplog: pytest.LogCaptureFixture) -> None:
+    """Test spans and events are logged at debug level without a buffer."""
+    LOGGER.setLevel(logging.DEBUG)
+    assert tracer.enabled
+
+    with caplog.at_level(logging.DEBUG, LOGGER.name), tracer.span("read", "status"):
+        tracer.event("write_control", control=b"\xff")
+
+    assert "event write_control {'control': 'ff'}" in caplog.text
+    assert "span read status:" in caplog.text
+    assert tracer.spans() == []
@@ -0,0 +1,69 @@
+"""Tests for the pump current trends."""
+
+import json
+
+import pytest
+
+from custom_components.asys_ble.const import TREND_MIN_SAMPLES
+from custom_components.asys_ble.trends import PumpTrends
+
+
+def _running(runtime: int, current: float, mode: int = 1) -> dict[str, object]:
+    """Return a sample of the running pump."""
+    return {
+        "filtration_state": True,
+        "filtration_mode": mode,
+        "runtime": runtime,
+        "current": current,
+    }
+
+
+def test_drift() -> None:
+    """Test a current rising with runtime is reported in mA/h once enough hours passed."""
+    trends = PumpTrends()
+    for hour in range(TREND_MIN_SAMPLES - 1):
+        assert trends.update(_running(hour, 1.0 + 0.01 * hour))  # type: ignore[arg-type]
+    assert trends.values(1) == {}
+
+    trends.update(_running(TREND_MIN_SAMPLES - 1, 1.0 + 0.01 * (TREND_MIN_SAMPLES - 1)))  # type: ignore[arg-type]
+
+    values = trends.values(1)
+    assert values["current_trend"] == pytest.approx(10)
+    assert 0 < values["pump_health"] < 100
+    assert trends.values(2) == {}
+
+
+def test_ignored_samples() -> None:
+    """Test only new operating hours of the running pump count."""
+    trends = PumpTrends()
+    assert trends.update(_running(5, 1.2))  # type: ignore[arg-type]
+
+    assert not trends.update(_running(5, 1.3))  # type: ignore[arg-type]
+    assert not trends.update(_running(6, 1.2) | {"filtration_state": False})  # type: ignore[arg-type]
+    assert not trends.update(_running(6, 0))  # type: ignore[arg-type]
+    assert not trends.update({"filtration_state": True, "current": 1.2})
+    assert trends.as_dict()["modes"]["1"]["count"] == 1
+
+
+def test_modes() -> None:
+    """Test each filtration mode keeps its own statistics."""
+    trends = PumpTrends()
+    for hour in range(2 * TREND_MIN_SAMPLES):
+        trends.update(_running(hour, 1.0 if hour % 2 else 2.0, mode=hour % 2))  # type: ignore[arg-type]
+
+    assert trends.values(0)["current_trend"] == pytest.approx(0)
+    assert trends.values(1)["current_trend"] == pytest.approx(0)
+    assert trends.values(0)["pump_health"] == pytest.approx(100)
+
+
+def test_persist() -> None:
+    """Test the trends survive a JSON round trip."""
+    trends = PumpTrends()
+    for hour in range(TREND_MIN_SAMPLES):
+        trends.update(_running(hour, 1.0 + 0.02 * hour))  # type: ignore[arg-type]
+
+    restored = PumpTrends()
+    restored.load(json.loads(json.dumps(trends.as_dict())))
+
+    assert restored.values(1) == trends.values(1)
+    assert not restored.update(_running(TREND_MIN_SAMPLES - 1, 2.0))  # type: ignore[arg-type]